@@ -1,92 +1,237 @@
 # algorithms/balance.py
-from typing import List
+from itertools import repeat
+from typing import List, Optional
 
-def balance_transport_problem(supply: List[int], demand: List[int], costs: List[List[float]]) -> dict:
+import numpy as np
+
+class _PaddedRow:
+    """Fila de costos con la celda de la columna ficticia agregada de forma virtual"""
+    __slots__ = ("_row", "_n")
+
+    def __init__(self, row: List[float]):
+        self._row = row
+        self._n = len(row)
+
+    def __getitem__(self, j: int) -> float:
+        if j < 0:
+            j += self._n + 1
+        if j == self._n:
+            return 0
+        return self._row[j]
+
+    def __len__(self) -> int:
+        return self._n + 1
+
+    def __iter__(self):
+        yield from self._row
+        yield 0
+
+
+class _ZeroRow:
+    """Fila ficticia de costos 0 que no ocupa memoria por celda"""
+    __slots__ = ("_n",)
+
+    def __init__(self, n: int):
+        self._n = n
+
+    def __getitem__(self, j: int) -> float:
+        if not -self._n <= j < self._n:
+            raise IndexError("índice de columna fuera de rango")
+        return 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __iter__(self):
+        return repeat(0, self._n)
+
+
+class PaddedCostView:
     """
-    Balancea un problema de transporte agregando fila/columna ficticia
+    Vista de solo lectura de la matriz de costos balanceada.
+    Se indexa como una lista de listas, pero la fila/columna ficticia no se copia.
+    Las búsquedas de los métodos no recorren la vista celda por celda: usan
+    submatrix, que lee el arreglo de NumPy de los costos originales (cost_array si
+    ya se tiene, para no volver a armarlo desde las listas).
     """
-    total_supply = sum(supply)
-    total_demand = sum(demand)
-    
-    balanced_supply = supply.copy()
-    balanced_demand = demand.copy()
-    balanced_costs = [row.copy() for row in costs]
+    __slots__ = ("_rows", "_costs", "_source", "_array")
+
+    def __init__(self, costs: List[List[float]], ficticious_row: Optional[int], ficticious_col: Optional[int],
+                 cost_array: Optional[np.ndarray] = None):
+        if ficticious_col is not None:
+            rows = [_PaddedRow(row) for row in costs]
+        else:
+            rows = list(costs)
+        if ficticious_row is not None:
+            rows.append(_ZeroRow(len(costs[0])))
+        self._rows = rows
+        self._costs = costs
+        self._source = cost_array
+        self._array = None
+
+    def __getitem__(self, i: int):
+        return self._rows[i]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    @property
+    def array(self) -> np.ndarray:
+        """Costos originales (sin la fila/columna ficticia) como arreglo float64; se arma al primer uso"""
+        if self._array is None:
+            # Sin copia si cost_array ya es float64; un arreglo entero se convierte en C
+            source = self._costs if self._source is None else self._source
+            self._array = np.asarray(source, dtype=np.float64)
+        return self._array
+
+    def submatrix(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """
+        Costos de las filas y columnas dadas (índices crecientes de la matriz balanceada).
+        Las celdas de la fila/columna ficticia, que siempre es la última, valen 0.
+        """
+        array = self.array
+        real_rows = rows[:np.searchsorted(rows, array.shape[0])]
+        real_cols = cols[:np.searchsorted(cols, array.shape[1])]
+        if len(real_rows) == len(rows) and len(real_cols) == len(cols):
+            return array[np.ix_(rows, cols)]
+        values = np.zeros((len(rows), len(cols)))
+        values[:len(real_rows), :len(real_cols)] = array[np.ix_(real_rows, real_cols)]
+        return values
+
+
+def ficticious_mask(balance_info: Optional[dict], m: int, n: int) -> List[List[bool]]:
+    """
+    Máscara booleana de celdas ficticias: mask[i][j] es True si (i, j) está en la
+    fila o columna ficticia. Las filas reales comparten la misma lista de columnas,
+    así que ocupa O(m + n) y la consulta es un solo acceso.
+    """
+    ficticious_row = ficticious_col = None
+    if balance_info and balance_info.get("balanced", False):
+        ficticious_row = balance_info.get("ficticious_row")
+        ficticious_col = balance_info.get("ficticious_col")
     
-    balance_info = {
+    col_mask = [j == ficticious_col for j in range(n)]
+    all_ficticious = [True] * n
+    return [all_ficticious if i == ficticious_row else col_mask for i in range(m)]
+
+
+class BalancedProblem:
+    """
+    Problema de transporte balanceado e inmutable.
+
+    Se calcula una sola vez (al crear el problema) y se pasa a todos los métodos.
+    La fila/columna ficticia es virtual: sus costos 0 se reportan sin copiar la matriz.
+
+    balance_info describe el balanceo (se guarda con el problema). analysis_info es el
+    de la matriz ya balanceada: el análisis, los pasos y la conclusión la tratan como un
+    problema balanceado común, con la línea ficticia como una fila/columna más de costo 0.
+    """
+    __slots__ = ("original_supply", "original_demand", "original_costs", "supply", "demand",
+                 "costs", "ficticious_row", "ficticious_col", "balance_info", "analysis_info")
+
+    def __init__(self, supply: List[int], demand: List[int], costs: List[List[float]], balance_info: dict,
+                 cost_array: Optional[np.ndarray] = None):
+        ficticious_row = balance_info.get("ficticious_row")
+        ficticious_col = balance_info.get("ficticious_col")
+        object.__setattr__(self, "original_supply", tuple(supply))
+        object.__setattr__(self, "original_demand", tuple(demand))
+        object.__setattr__(self, "original_costs", costs)
+        object.__setattr__(self, "supply", tuple(balance_info["balanced_supply"]))
+        object.__setattr__(self, "demand", tuple(balance_info["balanced_demand"]))
+        object.__setattr__(self, "costs", PaddedCostView(costs, ficticious_row, ficticious_col, cost_array))
+        object.__setattr__(self, "ficticious_row", ficticious_row)
+        object.__setattr__(self, "ficticious_col", ficticious_col)
+        object.__setattr__(self, "balance_info", balance_info)
+        object.__setattr__(self, "analysis_info", _unbalanced_info(self.supply, self.demand))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("BalancedProblem es inmutable")
+
+    @property
+    def m(self) -> int:
+        return len(self.supply)
+
+    @property
+    def n(self) -> int:
+        return len(self.demand)
+
+
+def _unbalanced_info(supply: List[int], demand: List[int]) -> dict:
+    """balance_info de un problema al que no se le agrega fila ni columna ficticia"""
+    return {
         "balanced": False,
-        "original_supply": supply.copy(),
-        "original_demand": demand.copy(),
-        "balanced_supply": supply.copy(),
-        "balanced_demand": demand.copy(),
+        "original_supply": list(supply),
+        "original_demand": list(demand),
+        "balanced_supply": list(supply),
+        "balanced_demand": list(demand),
         "ficticious_row": None,
         "ficticious_col": None,
+        "balance_type": None,
+        "difference": abs(sum(supply) - sum(demand)),
         "explanation": "No se requirió balanceo"
     }
+
+
+def balance_problem(supply: List[int], demand: List[int], costs: List[List[float]],
+                    cost_array: Optional[np.ndarray] = None) -> BalancedProblem:
+    """
+    Balancea un problema de transporte sin copiar la matriz de costos.
+    cost_array es la misma matriz como arreglo de NumPy, si ya se tiene.
+    """
+    total_supply = sum(supply)
+    total_demand = sum(demand)
+    
+    balance_info = _unbalanced_info(supply, demand)
     
     # Caso 1: Oferta > Demanda (agregar columna ficticia)
     if total_supply > total_demand:
         difference = total_supply - total_demand
-        balanced_demand.append(difference)  # Columna ficticia
-        
-        # Agregar costos 0 para la nueva columna
-        for i in range(len(balanced_costs)):
-            balanced_costs[i].append(0)
-        
         balance_info.update({
             "balanced": True,
-            "balanced_demand": balanced_demand.copy(),
-            "ficticious_col": len(balanced_demand) - 1,
+            "balanced_demand": list(demand) + [difference],
+            "ficticious_col": len(demand),
+            "balance_type": "columna_ficticia",
             "explanation": f"Oferta ({total_supply}) > Demanda ({total_demand}). Se agregó columna ficticia con demanda {difference} y costos 0"
         })
     
     # Caso 2: Demanda > Oferta (agregar fila ficticia)
     elif total_demand > total_supply:
         difference = total_demand - total_supply
-        balanced_supply.append(difference)  # Fila ficticia
-        
-        # Agregar fila de costos 0
-        new_row = [0] * len(balanced_costs[0])
-        balanced_costs.append(new_row)
-        
         balance_info.update({
             "balanced": True,
-            "balanced_supply": balanced_supply.copy(),
-            "ficticious_row": len(balanced_supply) - 1,
+            "balanced_supply": list(supply) + [difference],
+            "ficticious_row": len(supply),
+            "balance_type": "fila_ficticia",
             "explanation": f"Demanda ({total_demand}) > Oferta ({total_supply}). Se agregó fila ficticia con oferta {difference} y costos 0"
         })
     
-    return {
-        "supply": balanced_supply,
-        "demand": balanced_demand,
-        "costs": balanced_costs,
-        "balance_info": balance_info
-    }
+    return BalancedProblem(supply, demand, costs, balance_info, cost_array)
 
 
-# algorithms/balance_utils.py (crear este archivo)
-def is_ficticious_cell(i: int, j: int, balance_info: dict) -> bool:
+def load_balanced_problem(supply: List[int], demand: List[int], costs: List[List[float]],
+                          balance_info: Optional[dict], cost_array: Optional[np.ndarray] = None) -> BalancedProblem:
     """
-    Verifica si una celda es ficticia (fila o columna agregada para balanceo)
-    
-    Args:
-        i: Índice de fila
-        j: Índice de columna 
-        balance_info: Información del balanceo del problema
-    
-    Returns:
-        bool: True si la celda es ficticia
+    Reconstruye el problema balanceado a partir del balance_info guardado.
+    Si el registro es antiguo o no es consistente, se vuelve a balancear.
     """
-    if not balance_info or not balance_info.get("balanced", False):
+    if balance_info and _is_stored_balance_valid(supply, demand, balance_info):
+        return BalancedProblem(supply, demand, costs, balance_info, cost_array)
+    return balance_problem(supply, demand, costs, cost_array)
+
+
+def _is_stored_balance_valid(supply: List[int], demand: List[int], balance_info: dict) -> bool:
+    """Verifica que el balance_info guardado corresponda a estos datos"""
+    balanced_supply = balance_info.get("balanced_supply")
+    balanced_demand = balance_info.get("balanced_demand")
+    if balanced_supply is None or balanced_demand is None:
         return False
-    
-    # Verificar si es fila ficticia
-    ficticious_row = balance_info.get("ficticious_row")
-    if ficticious_row is not None and i == ficticious_row:
-        return True
-    
-    # Verificar si es columna ficticia
-    ficticious_col = balance_info.get("ficticious_col") 
-    if ficticious_col is not None and j == ficticious_col:
-        return True
-    
-    return False
\ No newline at end of file
+    if sum(balanced_supply) != sum(balanced_demand):
+        return False
+    expected_row = len(supply) if len(balanced_supply) == len(supply) + 1 else None
+    expected_col = len(demand) if len(balanced_demand) == len(demand) + 1 else None
+    return (balance_info.get("ficticious_row") == expected_row and
+            balance_info.get("ficticious_col") == expected_col)
+
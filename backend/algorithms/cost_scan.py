@@ -0,0 +1,70 @@
+# algorithms/cost_scan.py
+"""
+Búsquedas de costos mínimos de los métodos de Costo Mínimo y Vogel.
+
+Cada iteración trabaja sobre la submatriz disponible (filas con oferta y columnas
+con demanda restante) leída de una vez como arreglo de NumPy, en lugar de recorrer
+la matriz celda por celda en Python. Estas funciones solo eligen índices, con el
+mismo desempate que los recorridos originales (el primero en orden de filas); los
+costos que se reportan se siguen leyendo de la matriz de costos, con su tipo.
+"""
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from algorithms.balance import PaddedCostView
+
+# (filas, columnas, costos) de la submatriz disponible
+ActiveCosts = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def active_costs(costs: PaddedCostView, remaining_supply: List[int], remaining_demand: List[int]) -> ActiveCosts:
+    """Submatriz de costos de las filas y columnas que no están agotadas"""
+    rows = np.flatnonzero(np.asarray(remaining_supply) > 0)
+    cols = np.flatnonzero(np.asarray(remaining_demand) > 0)
+    return rows, cols, costs.submatrix(rows, cols)
+
+
+def min_cost_cells(active: ActiveCosts) -> List[Tuple[int, int]]:
+    """Celdas disponibles de costo mínimo, en orden de filas; vacía si no hay celdas"""
+    rows, cols, values = active
+    if values.size == 0:
+        return []
+    cell_rows, cell_cols = np.nonzero(values == values.min())
+    return list(zip(rows[cell_rows].tolist(), cols[cell_cols].tolist()))
+
+
+def line_min_positions(active: ActiveCosts, index: int, axis: int) -> List[int]:
+    """
+    Índices de costo mínimo de la fila (axis=1) o columna (axis=0) index de la
+    matriz balanceada, dentro de la submatriz disponible
+    """
+    rows, cols, values = active
+    if axis == 1:
+        line, others = values[np.searchsorted(rows, index)], cols
+    else:
+        line, others = values[:, np.searchsorted(cols, index)], rows
+    return others[np.flatnonzero(line == line.min())].tolist()
+
+
+def two_smallest(active: ActiveCosts, axis: int) -> Tuple[List[int], List[int], Optional[List[int]]]:
+    """
+    Para cada fila (axis=1) o columna (axis=0) disponible: su índice, el índice de
+    su menor costo y el del segundo menor (None si hay una sola celda por línea).
+    Ante costos iguales va primero el de menor índice, como con sorted().
+    """
+    rows, cols, values = active
+    lines, others = (rows, cols) if axis == 1 else (cols, rows)
+    if len(others) == 0:
+        return lines.tolist(), [], None
+    first = values.argmin(axis=axis)
+    if len(others) < 2:
+        return lines.tolist(), others[first].tolist(), None
+    masked = values.copy()
+    positions = np.arange(len(first))
+    if axis == 1:
+        masked[positions, first] = np.inf
+    else:
+        masked[first, positions] = np.inf
+    second = masked.argmin(axis=axis)
+    return lines.tolist(), others[first].tolist(), others[second].tolist()
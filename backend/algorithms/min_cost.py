@@ -1,75 +1,80 @@
-from typing import List, Dict, Any, Tuple
-import copy
-from algorithms.balance import balance_transport_problem
-from algorithms.transport_analysis import analyze_solution, basic_variables_to_dict_list, fix_degeneration
-from schemas.schema_transport import BasicVariable
+import logging
+from typing import List, Dict, Any, Tuple, Optional
+from algorithms.balance import balance_problem, BalancedProblem, ficticious_mask
+from algorithms.cost_scan import active_costs, min_cost_cells
+from algorithms.transport_analysis import (
+    analyze_solution, fix_degeneration, build_solution_view,
+    BasicVariableRecord, materialize_steps
+)
+from algorithms.step_recorder import StepRecorder, NullStepRecorder, make_step_recorder
+from algorithms.phase_timer import PhaseTimer, NullPhaseTimer
 from algorithms.transport_summary import generate_transport_summary
 from algorithms.transport_conclusion import generate_final_conclusion
 
-def min_cost_method(supply: List[int], demand: List[int], costs: List[List[float]]) -> dict:
+logger = logging.getLogger(__name__)
+
+def min_cost_method(supply: List[int], demand: List[int], costs: List[List[float]],
+                    balanced: Optional[BalancedProblem] = None, detail: str = "full",
+                    recorder: Optional[StepRecorder] = None, timer: Optional[PhaseTimer] = None) -> dict:
     """
-    Método del Costo Mínimo con análisis completo y múltiples soluciones
+    Método del Costo Mínimo con análisis completo y múltiples soluciones.
+    detail controla lo que se calcula: "minimal" (solo matriz y costo), "standard"
+    (más análisis y resumen) o "full" (más pasos, alternativas y conclusión).
+    recorder recibe los pasos; por defecto se elige según el nivel de detalle.
+    timer mide cada fase (ver algorithms/phase_timer.py).
     """
-    balanced_data = balance_transport_problem(supply, demand, costs)
-    balanced_supply = balanced_data["supply"]
-    balanced_demand = balanced_data["demand"]
-    balanced_costs = balanced_data["costs"]
-    balance_info = balanced_data["balance_info"]
+    if timer is None:
+        timer = NullPhaseTimer()
+    if balanced is None:
+        with timer.phase("balance"):
+            balanced = balance_problem(supply, demand, costs)
+    balanced_supply = balanced.supply
+    balanced_demand = balanced.demand
+    balanced_costs = balanced.costs
+    balance_info = balanced.balance_info
+    # Pasos, análisis y conclusión describen la matriz balanceada (ver BalancedProblem)
+    analysis_info = balanced.analysis_info
     
     m, n = len(balanced_supply), len(balanced_demand)
+    if recorder is None:
+        recorder = make_step_recorder(detail)
     
     # Solución principal
-    main_solution, main_steps, main_cost, main_basic_vars = _solve_min_cost(
-        balanced_supply, balanced_demand, balanced_costs, balance_info, "primera_ocurrencia"
-    )
+    with timer.phase("heuristic"):
+        main_solution, main_steps, main_cost, main_basic_vars = _solve_min_cost(
+            balanced_supply, balanced_demand, balanced_costs, analysis_info, "primera_ocurrencia",
+            recorder=recorder
+        )
+
+    # Un solo recorrido de la matriz para análisis, resumen y conclusión
+    with timer.phase("solution_view"):
+        main_view = build_solution_view(main_solution, balanced_costs, analysis_info)
+
+    if detail == "minimal":
+        return {
+            'main_solution': main_solution,
+            'total_cost': float(main_view.total_cost),
+            'balance_info': balance_info
+        }
 
     # ✅ CORREGIR DEGENERACIÓN en la solución principal
-    main_solution, degenerated_cells = fix_degeneration(
-        main_solution, balanced_supply, balanced_demand, balanced_costs, balance_info
-    )
-    
-      # Buscar soluciones alternativas
-    alternative_solutions = _find_alternative_min_cost_solutions(
-        balanced_supply, balanced_demand, balanced_costs, balance_info
-    )
-    
-    # También corregir degeneración en soluciones alternativas
-    corrected_alternatives = []
-    for alt_solution in alternative_solutions:
-        corrected_alt, _ = fix_degeneration(
-            alt_solution['solution_matrix'], balanced_supply, balanced_demand, balanced_costs, balance_info
+    with timer.phase("degeneracy"):
+        main_solution, degenerated_cells = fix_degeneration(
+            main_solution, balanced_supply, balanced_demand, balanced_costs, analysis_info, view=main_view
         )
-        alt_solution['solution_matrix'] = corrected_alt
-        corrected_alternatives.append(alt_solution)
     
   
     # Análisis final de la solución
-    analysis = analyze_solution(supply, demand, costs, main_solution, balance_info)
+    with timer.phase("analysis"):
+        analysis = analyze_solution(balanced_supply, balanced_demand, balanced_costs, main_solution, analysis_info, view=main_view)
 
-    transport_summary = generate_transport_summary( supply, demand, costs, main_solution, balance_info, "min_cost", degenerated_cells )
+    with timer.phase("summary"):
+        transport_summary = generate_transport_summary( balanced_supply, balanced_demand, balanced_costs, main_solution, analysis_info, "min_cost", degenerated_cells, view=main_view )
 
-    # Generar conclusión final
-    final_conclusion = generate_final_conclusion(
-        {
-            'main_solution': main_solution,
-            'total_cost': analysis['total_cost'],
-            'transport_summary': transport_summary,
-            'basic_variables': analysis['basic_variables'],
-            'required_basic_variables': analysis['required_basic_variables']
-        },
-        alternative_solutions,
-        supply, demand, costs, balance_info,
-        "min_cost"
-    )
-
-    return {
+    result = {
         'main_solution': main_solution,
         'total_cost': analysis['total_cost'],
-        'steps': main_steps,
         'balance_info': balance_info,
-        'alternative_solutions': alternative_solutions,
-        'has_multiple_solutions': len(alternative_solutions) > 0,
-        'tie_scenarios': _get_tie_scenarios(balanced_costs),
         # Información de análisis
         'basic_variables': analysis['basic_variables'],
         'non_basic_variables': analysis['non_basic_variables'],
@@ -82,72 +87,95 @@ def min_cost_method(supply: List[int], demand: List[int], costs: List[List[float
         'required_basic_variables': analysis['required_basic_variables'],
         'actual_basic_variables': analysis['actual_basic_variables'],
         'has_degeneracy': analysis['has_degeneracy'],
-        'transport_summary': transport_summary,
+        'transport_summary': transport_summary
+    }
+    if detail == "standard":
+        return result
+
+    # Buscar soluciones alternativas (ya vienen con la degeneración corregida)
+    with timer.phase("alternatives"):
+        alternative_solutions, alternative_views = _find_alternative_min_cost_solutions(
+            balanced_supply, balanced_demand, balanced_costs, analysis_info
+        )
 
+    # Generar conclusión final
+    with timer.phase("conclusion"):
+        final_conclusion = generate_final_conclusion(
+            {
+                'main_solution': main_solution,
+                'total_cost': analysis['total_cost'],
+                'transport_summary': transport_summary,
+                'basic_variables': analysis['basic_variables'],
+                'required_basic_variables': analysis['required_basic_variables']
+            },
+            alternative_solutions,
+            balanced_supply, balanced_demand, balanced_costs, analysis_info,
+            "min_cost", solution_views=[main_view] + alternative_views
+        )
+
+    # Conversión única de las variables básicas de cada paso
+    with timer.phase("materialize_steps"):
+        materialize_steps(main_steps)
+        for alt_solution in alternative_solutions:
+            materialize_steps(alt_solution['steps'])
+
+    result.update({
+        'steps': main_steps,
+        'alternative_solutions': alternative_solutions,
+        'has_multiple_solutions': len(alternative_solutions) > 0,
+        'tie_scenarios': _get_tie_scenarios(balanced_costs),
         'final_conclusion': final_conclusion
-    }
+    })
+    return result
 
 def _solve_min_cost(supply: List[int], demand: List[int], costs: List[List[float]], 
-                   balance_info: dict, tie_break_strategy: str) -> tuple:
-    """Resuelve usando una estrategia específica para desempates"""
+                   balance_info: dict, tie_break_strategy: str,
+                   recorder: Optional[StepRecorder] = None) -> tuple:
+    """
+    Resuelve usando una estrategia específica para desempates.
+    Los pasos se envían a recorder (con NullStepRecorder no se construye historial).
+    """
     m, n = len(supply), len(demand)
+    ficticious = ficticious_mask(balance_info, m, n)
     solution = [[0] * n for _ in range(m)]
-    remaining_supply = supply.copy()
-    remaining_demand = demand.copy()
-    costs_copy = copy.deepcopy(costs)
+    # Las filas y columnas agotadas son las de oferta o demanda restante 0: se excluyen
+    # por esos valores, sin copiar la matriz (costs es la vista balanceada, solo lectura)
+    remaining_supply = list(supply)
+    remaining_demand = list(demand)
     
-    steps = []
+    if recorder is None:
+        recorder = StepRecorder()
     total_cost = 0
     step_count = 0
     basic_vars = []
     
     # Paso 0: Información inicial
-    steps.append({
-        'step_number': step_count,
-        'description': 'Inicio - Método del Costo Mínimo',
-        'current_matrix': [row.copy() for row in solution],
-        'current_cost': total_cost,
-        'explanation': f'Problema: {m} orígenes, {n} destinos. Variables básicas requeridas: {m + n - 1}',
-        'basic_variables': [],
-        'assignment': None
-    })
+    if recorder.enabled:
+        recorder.record(
+            step_count, 'Inicio - Método del Costo Mínimo', solution, total_cost,
+            f'Problema: {m} orígenes, {n} destinos. Variables básicas requeridas: {m + n - 1}'
+        )
     step_count += 1
     
     # Paso de balanceo si es necesario
-    if balance_info["balanced"]:
-        steps.append({
-            'step_number': step_count,
-            'description': 'Balanceo del problema',
-            'current_matrix': [row.copy() for row in solution],
-            'current_cost': total_cost,
-            'explanation': balance_info["explanation"],
-            'basic_variables': [],
-            'assignment': None
-        })
+    if recorder.enabled and balance_info["balanced"]:
+        recorder.record(
+            step_count, 'Balanceo del problema', solution, total_cost,
+            balance_info["explanation"]
+        )
         step_count += 1
     
     while sum(remaining_supply) > 0 and sum(remaining_demand) > 0:
         # Encontrar todas las celdas con costo mínimo
-        min_cost_val = float('inf')
-        candidate_cells = []
-        
-        for i in range(m):
-            for j in range(n):
-                if (remaining_supply[i] > 0 and remaining_demand[j] > 0 and 
-                    costs_copy[i][j] < float('inf')):
-                    if costs_copy[i][j] < min_cost_val:
-                        min_cost_val = costs_copy[i][j]
-                        candidate_cells = [(i, j)]
-                    elif costs_copy[i][j] == min_cost_val:
-                        candidate_cells.append((i, j))
+        candidate_cells = min_cost_cells(active_costs(costs, remaining_supply, remaining_demand))
         
         if not candidate_cells:
             break
+        min_cost_val = costs[candidate_cells[0][0]][candidate_cells[0][1]]
             
         # Aplicar estrategia de desempate
         if tie_break_strategy == "primera_ocurrencia":
             i, j = candidate_cells[0]
-            tie_reason = f"Se eligió la primera celda con costo mínimo {min_cost_val}"
         elif tie_break_strategy == "mayor_asignacion":
             # Elegir la celda que permite mayor asignación
             max_assign = 0
@@ -158,68 +186,51 @@ def _solve_min_cost(supply: List[int], demand: List[int], costs: List[List[float
                     max_assign = assign
                     best_cell = (cell_i, cell_j)
             i, j = best_cell
-            tie_reason = f"Se eligió celda que permite mayor asignación ({max_assign} unidades)"
         else:  # menor_indice
             i, j = sorted(candidate_cells)[0]
-            tie_reason = f"Se eligió celda con menores índices (fila {i+1}, columna {j+1})"
         
         x = min(remaining_supply[i], remaining_demand[j])
         solution[i][j] = x
         
         # Solo sumar costo si no es celda ficticia
-        if not _is_ficticious_cell(i, j, balance_info):
+        if not ficticious[i][j]:
             total_cost += x * costs[i][j]
         
         # Registrar variable básica si no es ficticia
-        if x > 0 and not _is_ficticious_cell(i, j, balance_info):
-            basic_vars.append(BasicVariable(
-                cell=f"X{i+1}{j+1}",
-                value=x,
-                cost=costs[i][j],
-                i=i,
-                j=j
-            ))
-        
-        step_description = f'Asignar {x} unidades en X{i+1}{j+1}'
-        step_explanation = (f'Costo mínimo encontrado: {min_cost_val}. '
-                          f'Asignación: min({remaining_supply[i]}, {remaining_demand[j]}) = {x}. '
-                          f'{tie_reason}')
-        
-        steps.append({
-            'step_number': step_count,
-            'description': step_description,
-            'current_matrix': [row.copy() for row in solution],
-            'current_cost': total_cost,
-            'explanation': step_explanation,
-            'basic_variables': basic_variables_to_dict_list(basic_vars),
-            'assignment': f"X{i+1}{j+1}"
-        })
+        if x > 0 and not ficticious[i][j]:
+            basic_vars.append(BasicVariableRecord(i, j, x, costs[i][j]))
+        
+        if recorder.enabled:
+            # Motivo de la elección (solo se arma si se registran pasos)
+            if tie_break_strategy == "primera_ocurrencia":
+                tie_reason = f"Se eligió la primera celda con costo mínimo {min_cost_val}"
+            elif tie_break_strategy == "mayor_asignacion":
+                tie_reason = f"Se eligió celda que permite mayor asignación ({max_assign} unidades)"
+            else:
+                tie_reason = f"Se eligió celda con menores índices (fila {i+1}, columna {j+1})"
+            step_description = f'Asignar {x} unidades en X{i+1}{j+1}'
+            step_explanation = (f'Costo mínimo encontrado: {min_cost_val}. '
+                              f'Asignación: min({remaining_supply[i]}, {remaining_demand[j]}) = {x}. '
+                              f'{tie_reason}')
+            
+            recorder.record(
+                step_count, step_description, solution, total_cost,
+                step_explanation, basic_vars, f"X{i+1}{j+1}"
+            )
         
         remaining_supply[i] -= x
         remaining_demand[j] -= x
         
-        # Marcar celdas como usadas
-        if remaining_supply[i] == 0:
-            for col in range(n):
-                costs_copy[i][col] = float('inf')
-        if remaining_demand[j] == 0:
-            for row in range(m):
-                costs_copy[row][j] = float('inf')
-        
         step_count += 1
     
     # Paso final: Resumen de la solución
-    steps.append({
-        'step_number': step_count,
-        'description': 'Solución final del Costo Mínimo',
-        'current_matrix': [row.copy() for row in solution],
-        'current_cost': total_cost,
-        'explanation': f'Solución básica factible inicial obtenida. Costo total: {total_cost}',
-        'basic_variables': basic_variables_to_dict_list(basic_vars),
-        'assignment': None
-    })
+    if recorder.enabled:
+        recorder.record(
+            step_count, 'Solución final del Costo Mínimo', solution, total_cost,
+            f'Solución básica factible inicial obtenida. Costo total: {total_cost}', basic_vars
+        )
     
-    return solution, steps, total_cost, basic_vars
+    return solution, recorder.steps, total_cost, basic_vars
 
 # def _find_alternative_min_cost_solutions(supply: List[int], demand: List[int], 
 #                                        costs: List[List[float]], balance_info: dict) -> List[Dict]:
@@ -284,24 +295,28 @@ def _solve_min_cost(supply: List[int], demand: List[int], costs: List[List[float
 
 
 def _find_alternative_min_cost_solutions(supply: List[int], demand: List[int], 
-                                       costs: List[List[float]], balance_info: dict) -> List[Dict]:
-    """Encuentra soluciones alternativas basadas en empates reales de costos mínimos"""
+                                       costs: List[List[float]], balance_info: dict) -> Tuple[List[Dict], List]:
+    """
+    Encuentra soluciones alternativas basadas en empates reales de costos mínimos.
+    Retorna también la vista de cada alternativa, en el mismo orden.
+    """
     alternative_solutions = []
+    alternative_views = []
     
-    # Primero, resolver una vez para detectar todos los empates
-    _, _, _, _, all_ties = _solve_min_cost_with_tie_detection(
-        supply, demand, costs, balance_info
+    # Primero, resolver una vez para detectar todos los empates (sin historial de pasos)
+    main_solution, _, _, _, all_ties = _solve_min_cost_with_tie_detection(
+        supply, demand, costs, balance_info, recorder=NullStepRecorder()
     )
     
-    print(f"Empates detectados: {len(all_ties)}")
+    logger.debug("Empates detectados: %d", len(all_ties))
     
     # Generar soluciones alternativas para cada empate detectado
     for tie in all_ties:
-        print(f"Procesando empate: {tie['description']}")
+        logger.debug("Procesando empate: %s", tie['description'])
         
         # Las alternativas son todas las celdas excepto la primera
         for alt_choice in tie['ties'][1:]:
-            print(f"  Probando alternativa: {alt_choice}")
+            logger.debug("  Probando alternativa: %s", alt_choice)
             
             # Resolver forzando la elección alternativa
             alt_result = _solve_min_cost_with_forced_choice(
@@ -310,23 +325,27 @@ def _find_alternative_min_cost_solutions(supply: List[int], demand: List[int],
             
             if alt_result and alt_result['solution_matrix']:
                 # Verificar que sea diferente a la solución principal
-                main_solution = _get_main_min_cost_solution(supply, demand, costs, balance_info)
                 is_different = _is_solution_different(
                     alt_result['solution_matrix'], main_solution
                 )
                 
                 if is_different:
                     # Analizar la solución alternativa
-                    alt_analysis = analyze_solution(supply, demand, costs, alt_result['solution_matrix'], balance_info)
+                    alt_view = build_solution_view(alt_result['solution_matrix'], costs, balance_info)
+                    alt_analysis = analyze_solution(supply, demand, costs, alt_result['solution_matrix'], balance_info, view=alt_view)
                     
                     # Corregir degeneración
                     fixed_solution, degenerated_cells = fix_degeneration(
-                        alt_result['solution_matrix'], supply, demand, costs, balance_info
+                        alt_result['solution_matrix'], supply, demand, costs, balance_info, view=alt_view
                     )
                     
+                    # Las alternativas de costo mínimo se presentan sin variables degeneradas
+                    # (resumen y conclusión leen la misma vista)
+                    alt_view.degenerated_cells = []
+                    
                     # Generar summary
                     alt_transport_summary = generate_transport_summary(
-                        supply, demand, costs, fixed_solution, balance_info, "min_cost"
+                        supply, demand, costs, fixed_solution, balance_info, "min_cost", view=alt_view
                     )
                     
                     # CORREGIDO: Mostrar la celda alternativa correctamente
@@ -353,58 +372,46 @@ def _find_alternative_min_cost_solutions(supply: List[int], demand: List[int],
                         'actual_basic_variables': alt_analysis['actual_basic_variables'],
                         'has_degeneracy': alt_analysis['has_degeneracy']
                     })
-                    print(f"  ✅ Alternativa encontrada con costo: {alt_result['total_cost']}")
+                    alternative_views.append(alt_view)
+                    logger.debug("  Alternativa encontrada con costo: %s", alt_result['total_cost'])
                 else:
-                    print(f"  ❌ Alternativa idéntica a la principal")
+                    logger.debug("  Alternativa idéntica a la principal")
             else:
-                print(f"  ❌ No se pudo generar solución alternativa")
+                logger.debug("  No se pudo generar solución alternativa")
     
-    return alternative_solutions
+    return alternative_solutions, alternative_views
 
 def _solve_min_cost_with_tie_detection(supply: List[int], demand: List[int], costs: List[List[float]], 
-                                      balance_info: dict) -> tuple:
+                                      balance_info: dict, recorder: Optional[StepRecorder] = None) -> tuple:
     """Resuelve el método del costo mínimo detectando todos los empates"""
     m, n = len(supply), len(demand)
+    ficticious = ficticious_mask(balance_info, m, n)
     solution = [[0] * n for _ in range(m)]
-    remaining_supply = supply.copy()
-    remaining_demand = demand.copy()
-    costs_copy = copy.deepcopy(costs)
+    remaining_supply = list(supply)
+    remaining_demand = list(demand)
     
-    steps = []
+    if recorder is None:
+        recorder = StepRecorder()
     total_cost = 0
     step_count = 0
     basic_vars = []
     all_ties = []
     
     # Paso inicial
-    steps.append({
-        'step_number': step_count,
-        'description': 'Inicio - Método del Costo Mínimo',
-        'current_matrix': [row.copy() for row in solution],
-        'current_cost': total_cost,
-        'explanation': f'Problema: {m} orígenes, {n} destinos. Variables básicas requeridas: {m + n - 1}',
-        'basic_variables': [],
-        'assignment': None
-    })
+    if recorder.enabled:
+        recorder.record(
+            step_count, 'Inicio - Método del Costo Mínimo', solution, total_cost,
+            f'Problema: {m} orígenes, {n} destinos. Variables básicas requeridas: {m + n - 1}'
+        )
     step_count += 1
     
     while sum(remaining_supply) > 0 and sum(remaining_demand) > 0:
         # Encontrar todas las celdas con costo mínimo
-        min_cost_val = float('inf')
-        candidate_cells = []
-        
-        for i in range(m):
-            for j in range(n):
-                if (remaining_supply[i] > 0 and remaining_demand[j] > 0 and 
-                    costs_copy[i][j] < float('inf')):
-                    if costs_copy[i][j] < min_cost_val:
-                        min_cost_val = costs_copy[i][j]
-                        candidate_cells = [(i, j)]
-                    elif costs_copy[i][j] == min_cost_val:
-                        candidate_cells.append((i, j))
+        candidate_cells = min_cost_cells(active_costs(costs, remaining_supply, remaining_demand))
         
         if not candidate_cells:
             break
+        min_cost_val = costs[candidate_cells[0][0]][candidate_cells[0][1]]
         
         # DETECTAR EMPATE
         if len(candidate_cells) > 1:
@@ -416,7 +423,7 @@ def _solve_min_cost_with_tie_detection(supply: List[int], demand: List[int], cos
                 'description': f"Empate en costo mínimo {min_cost_val} en {len(candidate_cells)} celdas: {['X'+str(c[0]+1)+str(c[1]+1) for c in candidate_cells]}"
             }
             all_ties.append(tie_info)
-            print(f"[Paso {step_count}] Empate detectado: {tie_info['description']}")
+            logger.debug("[Paso %d] Empate detectado: %s", step_count, tie_info['description'])
         
         # Elegir la primera celda (estrategia por defecto)
         i, j = candidate_cells[0]
@@ -424,95 +431,71 @@ def _solve_min_cost_with_tie_detection(supply: List[int], demand: List[int], cos
         x = min(remaining_supply[i], remaining_demand[j])
         solution[i][j] = x
         
-        if not _is_ficticious_cell(i, j, balance_info):
+        if not ficticious[i][j]:
             total_cost += x * costs[i][j]
         
-        if x > 0 and not _is_ficticious_cell(i, j, balance_info):
-            basic_vars.append(BasicVariable(
-                cell=f"X{i+1}{j+1}",
-                value=x,
-                cost=costs[i][j],
-                i=i,
-                j=j
-            ))
+        if x > 0 and not ficticious[i][j]:
+            basic_vars.append(BasicVariableRecord(i, j, x, costs[i][j]))
         
-        step_description = f'Asignar {x} unidades en X{i+1}{j+1}'
-        step_explanation = (f'Costo mínimo encontrado: {min_cost_val}. '
-                          f'Asignación: min({remaining_supply[i]}, {remaining_demand[j]}) = {x}. '
-                          f'Se eligió la primera celda con costo mínimo {min_cost_val}')
-        
-        if len(candidate_cells) > 1:
-            step_explanation += f" | EMPATE: {len(candidate_cells)} opciones disponibles"
-        
-        steps.append({
-            'step_number': step_count,
-            'description': step_description,
-            'current_matrix': [row.copy() for row in solution],
-            'current_cost': total_cost,
-            'explanation': step_explanation,
-            'basic_variables': basic_variables_to_dict_list(basic_vars),
-            'assignment': f"X{i+1}{j+1}"
-        })
+        if recorder.enabled:
+            step_description = f'Asignar {x} unidades en X{i+1}{j+1}'
+            step_explanation = (f'Costo mínimo encontrado: {min_cost_val}. '
+                              f'Asignación: min({remaining_supply[i]}, {remaining_demand[j]}) = {x}. '
+                              f'Se eligió la primera celda con costo mínimo {min_cost_val}')
+            
+            if len(candidate_cells) > 1:
+                step_explanation += f" | EMPATE: {len(candidate_cells)} opciones disponibles"
+            
+            recorder.record(
+                step_count, step_description, solution, total_cost,
+                step_explanation, basic_vars, f"X{i+1}{j+1}"
+            )
         
         remaining_supply[i] -= x
         remaining_demand[j] -= x
         
-        # Marcar celdas como usadas
-        if remaining_supply[i] == 0:
-            for col in range(n):
-                costs_copy[i][col] = float('inf')
-        if remaining_demand[j] == 0:
-            for row in range(m):
-                costs_copy[row][j] = float('inf')
-        
         step_count += 1
     
     # Paso final
-    steps.append({
-        'step_number': step_count,
-        'description': 'Solución final del Costo Mínimo',
-        'current_matrix': [row.copy() for row in solution],
-        'current_cost': total_cost,
-        'explanation': f'Solución básica factible inicial obtenida. Costo total: {total_cost}',
-        'basic_variables': basic_variables_to_dict_list(basic_vars),
-        'assignment': None
-    })
+    if recorder.enabled:
+        recorder.record(
+            step_count, 'Solución final del Costo Mínimo', solution, total_cost,
+            f'Solución básica factible inicial obtenida. Costo total: {total_cost}', basic_vars
+        )
     
-    return solution, steps, total_cost, basic_vars, all_ties
+    return solution, recorder.steps, total_cost, basic_vars, all_ties
 
-def _solve_min_cost_with_forced_choice(supply, demand, costs, balance_info, target_step, tie, forced_choice):
+def _solve_min_cost_with_forced_choice(supply, demand, costs, balance_info, target_step, tie, forced_choice,
+                                       recorder=None):
     """Resuelve forzando una elección específica en el paso objetivo"""
     try:
         m, n = len(supply), len(demand)
+        ficticious = ficticious_mask(balance_info, m, n)
         solution = [[0] * n for _ in range(m)]
-        remaining_supply = supply.copy()
-        remaining_demand = demand.copy()
-        costs_copy = copy.deepcopy(costs)
+        remaining_supply = list(supply)
+        remaining_demand = list(demand)
         
         state = {'total_cost': 0}
         step_count = 0
-        steps = []
+        if recorder is None:
+            recorder = StepRecorder()
         basic_vars = []
         
         # Paso inicial
-        steps.append({
-            'step_number': step_count,
-            'description': 'Inicio - Método del Costo Mínimo (Alternativa)',
-            'current_matrix': [row.copy() for row in solution],
-            'current_cost': state['total_cost'],
-            'explanation': f'Alternativa por empate: {tie["description"]}',
-            'basic_variables': [],
-            'assignment': None
-        })
+        if recorder.enabled:
+            recorder.record(
+                step_count, 'Inicio - Método del Costo Mínimo (Alternativa)', solution, state['total_cost'],
+                f'Alternativa por empate: {tie["description"]}'
+            )
         step_count += 1
         
         # Avanzar hasta el paso anterior al objetivo
         while (sum(remaining_supply) > 0 and sum(remaining_demand) > 0 and 
                step_count < target_step):
             assignment_made = _make_min_cost_assignment_with_steps(
-                remaining_supply, remaining_demand, costs_copy, 
-                solution, state, balance_info, costs,
-                steps, step_count, basic_vars
+                remaining_supply, remaining_demand,
+                solution, state, ficticious, costs,
+                recorder, step_count, basic_vars
             )
             if assignment_made:
                 step_count += 1
@@ -524,57 +507,38 @@ def _solve_min_cost_with_forced_choice(supply, demand, costs, balance_info, targ
             i, j = forced_choice  # forced_choice es una tupla (i, j)
             
             # Verificar que la celda alternativa sea válida
-            if (remaining_supply[i] > 0 and remaining_demand[j] > 0 and 
-                costs_copy[i][j] < float('inf')):
+            if remaining_supply[i] > 0 and remaining_demand[j] > 0:
                 
                 x = min(remaining_supply[i], remaining_demand[j])
                 solution[i][j] = x
                 
-                if not _is_ficticious_cell(i, j, balance_info):
+                if not ficticious[i][j]:
                     state['total_cost'] += x * costs[i][j]
                 
-                if x > 0 and not _is_ficticious_cell(i, j, balance_info):
-                    basic_vars.append(BasicVariable(
-                        cell=f"X{i+1}{j+1}",
-                        value=x,
-                        cost=costs[i][j],
-                        i=i,
-                        j=j
-                    ))
+                if x > 0 and not ficticious[i][j]:
+                    basic_vars.append(BasicVariableRecord(i, j, x, costs[i][j]))
                 
                 # Registrar el paso forzado
-                step_description = f'Asignar {x} unidades en X{i+1}{j+1} (Alternativa forzada)'
-                step_explanation = f'Alternativa por empate: {tie["description"]}. Asignación: min({remaining_supply[i]}, {remaining_demand[j]}) = {x}'
-                
-                steps.append({
-                    'step_number': step_count,
-                    'description': step_description,
-                    'current_matrix': [row.copy() for row in solution],
-                    'current_cost': state['total_cost'],
-                    'explanation': step_explanation,
-                    'basic_variables': basic_variables_to_dict_list(basic_vars),
-                    'assignment': f"X{i+1}{j+1}"
-                })
+                if recorder.enabled:
+                    step_description = f'Asignar {x} unidades en X{i+1}{j+1} (Alternativa forzada)'
+                    step_explanation = f'Alternativa por empate: {tie["description"]}. Asignación: min({remaining_supply[i]}, {remaining_demand[j]}) = {x}'
+                    
+                    recorder.record(
+                        step_count, step_description, solution, state['total_cost'],
+                        step_explanation, basic_vars, f"X{i+1}{j+1}"
+                    )
                 
                 remaining_supply[i] -= x
                 remaining_demand[j] -= x
                 
-                # Actualizar matriz de costos
-                if remaining_supply[i] == 0:
-                    for col in range(n):
-                        costs_copy[i][col] = float('inf')
-                if remaining_demand[j] == 0:
-                    for row in range(m):
-                        costs_copy[row][j] = float('inf')
-                
                 step_count += 1
                 
                 # Continuar con el resto normalmente
                 while sum(remaining_supply) > 0 and sum(remaining_demand) > 0:
                     assignment_made = _make_min_cost_assignment_with_steps(
-                        remaining_supply, remaining_demand, costs_copy, 
-                        solution, state, balance_info, costs,
-                        steps, step_count, basic_vars
+                        remaining_supply, remaining_demand,
+                        solution, state, ficticious, costs,
+                        recorder, step_count, basic_vars
                     )
                     if assignment_made:
                         step_count += 1
@@ -582,116 +546,73 @@ def _solve_min_cost_with_forced_choice(supply, demand, costs, balance_info, targ
                         break
                 
                 # Paso final
-                steps.append({
-                    'step_number': step_count,
-                    'description': 'Solución final alternativa del Costo Mínimo',
-                    'current_matrix': [row.copy() for row in solution],
-                    'current_cost': state['total_cost'],
-                    'explanation': f'Solución alternativa obtenida. Costo total: {state["total_cost"]}',
-                    'basic_variables': basic_variables_to_dict_list(basic_vars),
-                    'assignment': None
-                })
+                if recorder.enabled:
+                    recorder.record(
+                        step_count, 'Solución final alternativa del Costo Mínimo', solution, state['total_cost'],
+                        f'Solución alternativa obtenida. Costo total: {state["total_cost"]}', basic_vars
+                    )
                 
                 # Recalcular costo final para consistencia
                 final_cost = 0
                 for i in range(m):
                     for j in range(n):
-                        if solution[i][j] > 0 and not _is_ficticious_cell(i, j, balance_info):
+                        if solution[i][j] > 0 and not ficticious[i][j]:
                             final_cost += solution[i][j] * costs[i][j]
                 
                 return {
                     'solution_matrix': solution,
                     'total_cost': final_cost,
-                    'steps': steps,
+                    'steps': recorder.steps,
                     'basic_variables': basic_vars
                 }
         
         return None
         
     except Exception as e:
-        print(f"Error en solución forzada: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error en solución forzada: %s", e)
         return None
 
-# Las funciones _make_min_cost_assignment_with_steps, _get_main_min_cost_solution, 
-# _is_solution_different y _is_ficticious_cell se mantienen igual
+# Las funciones _make_min_cost_assignment_with_steps y _is_solution_different se mantienen igual
 
 
-def _make_min_cost_assignment_with_steps(remaining_supply, remaining_demand, costs_copy, 
-                                       solution, state, balance_info, original_costs,
-                                       steps, step_count, basic_vars):
-    """Realiza una asignación del costo mínimo con registro de pasos"""
-    m, n = len(remaining_supply), len(remaining_demand)
-    
+def _make_min_cost_assignment_with_steps(remaining_supply, remaining_demand,
+                                       solution, state, ficticious, costs,
+                                       recorder, step_count, basic_vars):
+    """Realiza una asignación del costo mínimo enviando el paso a recorder"""
     # Encontrar celda con costo mínimo
-    min_cost_val = float('inf')
-    candidate_cells = []
-    
-    for i in range(m):
-        for j in range(n):
-            if (remaining_supply[i] > 0 and remaining_demand[j] > 0 and 
-                costs_copy[i][j] < float('inf')):
-                if costs_copy[i][j] < min_cost_val:
-                    min_cost_val = costs_copy[i][j]
-                    candidate_cells = [(i, j)]
-                elif costs_copy[i][j] == min_cost_val:
-                    candidate_cells.append((i, j))
+    candidate_cells = min_cost_cells(active_costs(costs, remaining_supply, remaining_demand))
     
     if not candidate_cells:
         return False
     
     # Elegir la primera celda
     i, j = candidate_cells[0]
+    min_cost_val = costs[i][j]
     
     x = min(remaining_supply[i], remaining_demand[j])
     solution[i][j] = x
     
-    if not _is_ficticious_cell(i, j, balance_info):
-        state['total_cost'] += x * original_costs[i][j]
+    if not ficticious[i][j]:
+        state['total_cost'] += x * costs[i][j]
     
-    if x > 0 and not _is_ficticious_cell(i, j, balance_info):
-        basic_vars.append(BasicVariable(
-            cell=f"X{i+1}{j+1}",
-            value=x,
-            cost=original_costs[i][j],
-            i=i,
-            j=j
-        ))
+    if x > 0 and not ficticious[i][j]:
+        basic_vars.append(BasicVariableRecord(i, j, x, costs[i][j]))
     
     # Registrar el paso
-    step_description = f'Asignar {x} unidades en X{i+1}{j+1}'
-    step_explanation = f'Costo mínimo encontrado: {min_cost_val}. Asignación: min({remaining_supply[i]}, {remaining_demand[j]}) = {x}'
-    
-    steps.append({
-        'step_number': step_count,
-        'description': step_description,
-        'current_matrix': [row.copy() for row in solution],
-        'current_cost': state['total_cost'],
-        'explanation': step_explanation,
-        'basic_variables': basic_variables_to_dict_list(basic_vars),
-        'assignment': f"X{i+1}{j+1}"
-    })
+    if recorder.enabled:
+        step_description = f'Asignar {x} unidades en X{i+1}{j+1}'
+        step_explanation = f'Costo mínimo encontrado: {min_cost_val}. Asignación: min({remaining_supply[i]}, {remaining_demand[j]}) = {x}'
+        
+        recorder.record(
+            step_count, step_description, solution, state['total_cost'],
+            step_explanation, basic_vars, f"X{i+1}{j+1}"
+        )
     
     remaining_supply[i] -= x
     remaining_demand[j] -= x
     
-    if remaining_supply[i] == 0:
-        for col in range(n):
-            costs_copy[i][col] = float('inf')
-    if remaining_demand[j] == 0:
-        for row in range(m):
-            costs_copy[row][j] = float('inf')
-    
     return True
 
-def _get_main_min_cost_solution(supply, demand, costs, balance_info):
-    """Obtiene la solución principal para comparación"""
-    main_solution, _, _, _, _ = _solve_min_cost_with_tie_detection(
-        supply, demand, costs, balance_info
-    )
-    return main_solution
-
 def _is_solution_different(sol1, sol2):
     """Verifica si dos soluciones son diferentes"""
     if not sol2:
@@ -763,16 +684,3 @@ def _get_tie_scenarios(costs: List[List[float]]) -> List[str]:
             tie_scenarios.append(f"Costo {cost} aparece en {count} celdas diferentes")
     
     return tie_scenarios
-
-def _is_ficticious_cell(i: int, j: int, balance_info: dict) -> bool:
-    """Verifica si una celda es ficticia"""
-    if not balance_info.get("balanced", False):
-        return False
-    
-    if balance_info.get("ficticious_row") == i:
-        return True
-    if balance_info.get("ficticious_col") == j:
-        return True
-    
-    return False
-
@@ -1,146 +1,139 @@
 # algorithms/northwest_corner.py
-from algorithms.balance import balance_transport_problem, is_ficticious_cell
-from typing import List, Dict, Any
-from algorithms.transport_analysis import analyze_solution, basic_variables_to_dict_list, fix_degeneration
-from schemas.schema_transport import BasicVariable
+from algorithms.balance import balance_problem, BalancedProblem, ficticious_mask
+from typing import List, Dict, Any, Optional
+from algorithms.transport_analysis import (
+    analyze_solution, fix_degeneration, build_solution_view,
+    BasicVariableRecord, materialize_steps
+)
+from algorithms.step_recorder import StepRecorder, make_step_recorder
+from algorithms.phase_timer import PhaseTimer, NullPhaseTimer
 from algorithms.transport_summary import generate_transport_summary
 from algorithms.transport_conclusion import generate_final_conclusion
 
 
-def northwest_corner(supply: List[int], demand: List[int], costs: List[List[float]]) -> dict:
+def northwest_corner(supply: List[int], demand: List[int], costs: List[List[float]],
+                     balanced: Optional[BalancedProblem] = None, detail: str = "full",
+                     recorder: Optional[StepRecorder] = None, timer: Optional[PhaseTimer] = None) -> dict:
     """
-    Método de la Esquina Noroeste con análisis completo
+    Método de la Esquina Noroeste con análisis completo.
+    detail controla lo que se calcula: "minimal" (solo matriz y costo), "standard"
+    (más análisis y resumen) o "full" (más pasos y conclusión).
+    recorder recibe los pasos; por defecto se elige según el nivel de detalle.
+    timer mide cada fase (ver algorithms/phase_timer.py).
     """
-    balanced_data = balance_transport_problem(supply, demand, costs)
-    balanced_supply = balanced_data["supply"]
-    balanced_demand = balanced_data["demand"]
-    balanced_costs = balanced_data["costs"]
-    balance_info = balanced_data["balance_info"]
+    if timer is None:
+        timer = NullPhaseTimer()
+    if balanced is None:
+        with timer.phase("balance"):
+            balanced = balance_problem(supply, demand, costs)
+    balanced_supply = balanced.supply
+    balanced_demand = balanced.demand
+    balanced_costs = balanced.costs
+    balance_info = balanced.balance_info
+    # Pasos, análisis y conclusión describen la matriz balanceada (ver BalancedProblem)
+    analysis_info = balanced.analysis_info
+    ficticious = ficticious_mask(analysis_info, len(balanced_supply), len(balanced_demand))
     
     m, n = len(balanced_supply), len(balanced_demand)
     solution = [[0] * n for _ in range(m)]
-    remaining_supply = balanced_supply.copy()
-    remaining_demand = balanced_demand.copy()
+    remaining_supply = list(balanced_supply)
+    remaining_demand = list(balanced_demand)
     
-    steps = []
+    if recorder is None:
+        recorder = make_step_recorder(detail)
     total_cost = 0
     step_count = 0
     basic_vars = []
     
     # Paso 0: Información inicial
-    steps.append({
-        'step_number': step_count,
-        'description': 'Inicio - Problema de Transporte',
-        'current_matrix': [row.copy() for row in solution],
-        'current_cost': total_cost,
-        'explanation': f'Problema: {m} orígenes, {n} destinos. Variables básicas requeridas: {m + n - 1}',
-        'basic_variables': []
-    })
+    if recorder.enabled:
+        recorder.record(
+            step_count, 'Inicio - Problema de Transporte', solution, total_cost,
+            f'Problema: {m} orígenes, {n} destinos. Variables básicas requeridas: {m + n - 1}'
+        )
     step_count += 1
     
     # Paso de balanceo si es necesario
-    if balance_info["balanced"]:
-        steps.append({
-            'step_number': step_count,
-            'description': 'Balanceo del problema',
-            'current_matrix': [row.copy() for row in solution],
-            'current_cost': total_cost,
-            'explanation': balance_info["explanation"],
-            'basic_variables': []
-        })
+    if analysis_info["balanced"]:
+        recorder.record(
+            step_count, 'Balanceo del problema', solution, total_cost,
+            analysis_info["explanation"]
+        )
         step_count += 1
     
     # Algoritmo de Esquina Noroeste
     i, j = 0, 0
     
-    while i < m and j < n:
-        x = min(remaining_supply[i], remaining_demand[j])
-        solution[i][j] = x
-        
-        # Solo sumar costo si no es celda ficticia
-        if not is_ficticious_cell(i, j, balance_info):
-            total_cost += x * balanced_costs[i][j]
+    with timer.phase("heuristic"):
+        while i < m and j < n:
+            x = min(remaining_supply[i], remaining_demand[j])
+            solution[i][j] = x
         
-        # Registrar variable básica
-        if x > 0 and not is_ficticious_cell(i, j, balance_info):
-            basic_vars.append(BasicVariable(
-                cell=f"X{i+1}{j+1}",
-                value=x,
-                cost=balanced_costs[i][j],
-                i=i,
-                j=j
-            ))
+            # Solo sumar costo si no es celda ficticia
+            if not ficticious[i][j]:
+                total_cost += x * balanced_costs[i][j]
         
-        step_description = f'Asignar {x} unidades en X{i+1}{j+1}'
-        step_explanation = f'Esquina noroeste: min({remaining_supply[i]}, {remaining_demand[j]}) = {x}'
+            if recorder.enabled:
+                # Registrar variable básica
+                if x > 0 and not ficticious[i][j]:
+                    basic_vars.append(BasicVariableRecord(i, j, x, balanced_costs[i][j]))
+            
+                step_description = f'Asignar {x} unidades en X{i+1}{j+1}'
+                step_explanation = f'Esquina noroeste: min({remaining_supply[i]}, {remaining_demand[j]}) = {x}'
+            
+                recorder.record(
+                    step_count, step_description, solution, total_cost,
+                    step_explanation, basic_vars, f"X{i+1}{j+1}"
+                )
         
-        steps.append({
-            'step_number': step_count,
-            'description': step_description,
-            'current_matrix': [row.copy() for row in solution],
-            'current_cost': total_cost,
-            'explanation': step_explanation,
-            'basic_variables': basic_variables_to_dict_list(basic_vars),
-            'assignment': f"X{i+1}{j+1}"
-        })
+            remaining_supply[i] -= x
+            remaining_demand[j] -= x
         
-        remaining_supply[i] -= x
-        remaining_demand[j] -= x
+            if remaining_supply[i] == 0:
+                i += 1
+            else:
+                j += 1
         
-        if remaining_supply[i] == 0:
-            i += 1
-        else:
-            j += 1
-        
-        step_count += 1
+            step_count += 1
+
+    # Un solo recorrido de la matriz para análisis, resumen y conclusión
+    with timer.phase("solution_view"):
+        view = build_solution_view(solution, balanced_costs, analysis_info)
+
+    if detail == "minimal":
+        return {
+            'main_solution': solution,
+            'total_cost': float(view.total_cost),
+            'balance_info': balance_info
+        }
 
          # ✅ CORREGIR DEGENERACIÓN
-    solution, degenerated_cells = fix_degeneration(
-        solution, balanced_supply, balanced_demand, balanced_costs, balance_info
-    )
+    with timer.phase("degeneracy"):
+        solution, degenerated_cells = fix_degeneration(
+            solution, balanced_supply, balanced_demand, balanced_costs, analysis_info, view=view
+        )
     
     # Agregar paso de degeneración si se aplicó
     if degenerated_cells:
-        degeneration_step = {
-            'step_number': step_count,
-            'description': 'Corrección de degeneración',
-            'current_matrix': [row.copy() for row in solution],
-            'current_cost': total_cost,
-            'explanation': f'Se agregaron {len(degenerated_cells)} variables básicas degeneradas (valor 0) para completar m+n-1 = {m+n-1} variables requeridas'
-        }
-        steps.append(degeneration_step)
+        if recorder.enabled:
+            recorder.record(
+                step_count, 'Corrección de degeneración', solution, total_cost,
+                f'Se agregaron {len(degenerated_cells)} variables básicas degeneradas (valor 0) para completar m+n-1 = {m+n-1} variables requeridas',
+                basic_vars
+            )
         step_count += 1
     
     # Análisis final de la solución
-    analysis = analyze_solution(supply, demand, costs, solution, balance_info)
-
-    transport_summary = generate_transport_summary( supply, demand, costs, solution, balance_info, "northwest", degenerated_cells )
+    with timer.phase("analysis"):
+        analysis = analyze_solution(balanced_supply, balanced_demand, balanced_costs, solution, analysis_info, view=view)
 
+    with timer.phase("summary"):
+        transport_summary = generate_transport_summary( balanced_supply, balanced_demand, balanced_costs, solution, analysis_info, "northwest", degenerated_cells, view=view )
 
-    # Generar conclusión final
-        # Para Northwest: NO hay soluciones alternativas (siempre es única)
-    alternative_solutions = []
-    final_conclusion = generate_final_conclusion(
-        {
-            'main_solution': solution,
-            'total_cost': analysis['total_cost'],
-            'transport_summary': transport_summary,
-            'basic_variables': analysis['basic_variables'],
-            'required_basic_variables': analysis['required_basic_variables']
-        },
-        alternative_solutions,
-        supply, demand, costs, balance_info,
-        "northwest"
-    )
-
-    return {
+    result = {
         'main_solution': solution,
         'total_cost': analysis['total_cost'],
-        'steps': steps,
         'balance_info': balance_info,
-        'alternative_solutions': [],
-        'has_multiple_solutions': False,
-        'tie_scenarios': [],
         # Información de análisis
         'basic_variables': analysis['basic_variables'],
         'non_basic_variables': analysis['non_basic_variables'],
@@ -153,8 +146,37 @@ def northwest_corner(supply: List[int], demand: List[int], costs: List[List[floa
         'required_basic_variables': analysis['required_basic_variables'],
         'actual_basic_variables': analysis['actual_basic_variables'],
         'has_degeneracy': analysis['has_degeneracy'],
-        'transport_summary': transport_summary,
-        'final_conclusion': final_conclusion
+        'transport_summary': transport_summary
     }
+    if detail == "standard":
+        return result
 
+    # Generar conclusión final
+        # Para Northwest: NO hay soluciones alternativas (siempre es única)
+    alternative_solutions = []
+    with timer.phase("conclusion"):
+        final_conclusion = generate_final_conclusion(
+            {
+                'main_solution': solution,
+                'total_cost': analysis['total_cost'],
+                'transport_summary': transport_summary,
+                'basic_variables': analysis['basic_variables'],
+                'required_basic_variables': analysis['required_basic_variables']
+            },
+            alternative_solutions,
+            balanced_supply, balanced_demand, balanced_costs, analysis_info,
+            "northwest", solution_views=[view]
+        )
 
+    # Conversión única de las variables básicas de cada paso
+    with timer.phase("materialize_steps"):
+        steps = materialize_steps(recorder.steps)
+
+    result.update({
+        'steps': steps,
+        'alternative_solutions': [],
+        'has_multiple_solutions': False,
+        'tie_scenarios': [],
+        'final_conclusion': final_conclusion
+    })
+    return result
@@ -0,0 +1,103 @@
+# algorithms/phase_timer.py
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Dict
+
+
+class PhaseTimer:
+    """
+    Mide tiempo de reloj (perf_counter_ns) y de CPU del hilo (thread_time_ns) por fase.
+    Una fase que se repite acumula sus tiempos; las fases pueden anidarse
+    (la externa incluye el tiempo de las internas).
+    """
+    enabled = True
+
+    def __init__(self):
+        self._phases: Dict[str, list] = {}
+        # Pico de memoria por fase (solo MemoryPhaseTimer o tiempos combinados con merge)
+        self._peaks: Dict[str, int] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        wall_start = time.perf_counter_ns()
+        cpu_start = time.thread_time_ns()
+        try:
+            yield
+        finally:
+            totals = self._phases.setdefault(name, [0, 0, 0])
+            totals[0] += time.perf_counter_ns() - wall_start
+            totals[1] += time.thread_time_ns() - cpu_start
+            totals[2] += 1
+
+    def merge(self, timings: Dict[str, Dict[str, float]]) -> None:
+        """Suma tiempos medidos en otro lado (p. ej. en un proceso del pool), con el formato de as_dict"""
+        for name, timing in timings.items():
+            totals = self._phases.setdefault(name, [0, 0, 0])
+            totals[0] += round(timing['wall_ms'] * 1e6)
+            totals[1] += round(timing['cpu_ms'] * 1e6)
+            totals[2] += timing['calls']
+            if 'peak_bytes' in timing:
+                self._peaks[name] = max(self._peaks.get(name, 0), timing['peak_bytes'])
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """Tiempos en milisegundos, en el orden en que se abrió cada fase"""
+        timings = {
+            name: {
+                'wall_ms': round(wall_ns / 1e6, 3),
+                'cpu_ms': round(cpu_ns / 1e6, 3),
+                'calls': calls
+            }
+            for name, (wall_ns, cpu_ns, calls) in self._phases.items()
+        }
+        for name, peak in self._peaks.items():
+            timings[name]['peak_bytes'] = peak
+        return timings
+
+
+class NullPhaseTimer(PhaseTimer):
+    """No mide nada: las fases se ejecutan sin instrumentación"""
+    enabled = False
+    _null_phase = nullcontext()
+
+    def phase(self, name: str):
+        return self._null_phase
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        return {}
+
+
+class MemoryPhaseTimer(PhaseTimer):
+    """
+    Además de los tiempos, registra el pico de memoria (bytes sobre la memoria al
+    iniciar la fase) de cada fase que transcurre mientras tracemalloc está activo.
+    Las fases anidadas no alteran el pico de la fase externa.
+    """
+
+    def __init__(self):
+        super().__init__()
+        # Por cada fase abierta: [memoria al entrar, mayor pico visto dentro de la fase]
+        self._stack: list = []
+
+    @contextmanager
+    def phase(self, name: str):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            for frame in self._stack:
+                frame[1] = max(frame[1], peak)
+            tracemalloc.reset_peak()
+            self._stack.append([current, current])
+        try:
+            with super().phase(name):
+                yield
+        finally:
+            if tracing and tracemalloc.is_tracing():
+                _, peak = tracemalloc.get_traced_memory()
+                start, seen_peak = self._stack.pop()
+                phase_peak = max(seen_peak, peak)
+                for frame in self._stack:
+                    frame[1] = max(frame[1], phase_peak)
+                self._peaks[name] = max(self._peaks.get(name, 0), phase_peak - start)
+            elif tracing:
+                self._stack.pop()
@@ -0,0 +1,41 @@
+# algorithms/step_recorder.py
+from typing import List, Optional
+from algorithms.transport_analysis import basic_variables_snapshot
+
+
+class StepRecorder:
+    """
+    Registra el historial de pasos que muestran los algoritmos.
+    Los algoritmos le envían cada paso en lugar de armar los diccionarios ellos mismos;
+    antes de construir textos costosos consultan `enabled`.
+    """
+    enabled = True
+
+    def __init__(self):
+        self.steps = []
+
+    def record(self, step_number: int, description: str, matrix: List[List[int]], cost: float,
+               explanation: str, basic_vars: list = (), assignment: Optional[str] = None) -> None:
+        """Guarda una foto del paso (copia de la matriz y de las variables básicas actuales)"""
+        self.steps.append({
+            'step_number': step_number,
+            'description': description,
+            'current_matrix': [row.copy() for row in matrix],
+            'current_cost': cost,
+            'explanation': explanation,
+            'basic_variables': basic_variables_snapshot(basic_vars),
+            'assignment': assignment
+        })
+
+
+class NullStepRecorder(StepRecorder):
+    """Descarta todos los pasos: para resolver sin historial (uso en producción)"""
+    enabled = False
+
+    def record(self, *args, **kwargs) -> None:
+        pass
+
+
+def make_step_recorder(detail: str = "full") -> StepRecorder:
+    """Solo el nivel de detalle "full" necesita el historial de pasos"""
+    return StepRecorder() if detail == "full" else NullStepRecorder()
@@ -1,48 +1,101 @@
 # algorithms/transport_analysis.py
-from typing import List, Tuple, Dict, Any
-from schemas.schema_transport import BasicVariable
+import logging
+from typing import List, Tuple, Dict, Any, Set
+from algorithms.balance import ficticious_mask
 
-def analyze_solution(supply: List[int], demand: List[int], costs: List[List[float]], 
-                    solution: List[List[int]], balance_info: dict) -> Dict[str, Any]:
+logger = logging.getLogger(__name__)
+
+class SolutionView:
     """
-    Analiza una solución de transporte y extrae información estructural
+    Vista compartida de una solución, calculada en un solo recorrido de la matriz.
+    El análisis, el resumen y la conclusión leen de aquí en lugar de volver a recorrerla.
     """
-    m, n = len(supply), len(demand)
+    __slots__ = ("m", "n", "basic_vars", "non_basic_vars", "assignments", "cost_terms",
+                 "total_cost", "row_totals", "col_totals", "degenerated_cells")
+
+    def __init__(self, m: int, n: int):
+        self.m = m
+        self.n = n
+        # Las celdas de la fila/columna ficticia son variables de la matriz balanceada:
+        # cuentan como básicas o no básicas igual que las reales (con costo 0)
+        self.basic_vars = []        # Celdas con valor > 0
+        self.non_basic_vars = []    # Celdas con valor 0
+        self.assignments = []       # (i, j, valor, costo) de toda celda con valor > 0
+        self.cost_terms = []        # (costo, valor) de las variables básicas
+        self.total_cost = 0         # Suma de costo × valor (entera si los costos lo son)
+        self.row_totals = [0] * m   # Unidades asignadas por fila (sin celdas ficticias)
+        self.col_totals = [0] * n   # Unidades asignadas por columna (sin celdas ficticias)
+        self.degenerated_cells = []
+
+    @property
+    def basic_cells(self) -> Set[Tuple[int, int]]:
+        return {(var['i'], var['j']) for var in self.basic_vars}
 
-      # Calcular variables básicas (incluyendo degeneradas)
-    basic_vars = []
-    degenerated_vars = []
+
+def build_solution_view(solution: List[List[int]], costs: List[List[float]], balance_info: dict,
+                        degenerated_cells: List[Tuple[int, int]] = None) -> SolutionView:
+    """
+    Recorre la matriz solución una sola vez y extrae variables básicas, no básicas,
+    costos y totales por fila/columna
+    """
+    m, n = len(solution), len(solution[0])
+    ficticious = ficticious_mask(balance_info, m, n)
+    view = SolutionView(m, n)
+    row_totals = view.row_totals
+    col_totals = view.col_totals
     
-    for i in range(len(solution)):
-        for j in range(len(solution[0])):
-            value = solution[i][j]
-            if not _is_ficticious_cell(i, j, balance_info):
-                if value > 0:
-                    basic_vars.append({
-                        'cell': f"X{i+1}{j+1}",
-                        'value': value,
-                        'cost': costs[i][j],
-                        'i': i,
-                        'j': j,
-                        'type': 'basic'
-                    })
-                # Podemos considerar celdas con 0 como potencialmente degeneradas
-                # En una implementación real, necesitaríamos tracking de cuáles fueron marcadas como degeneradas
+    for i in range(m):
+        row = solution[i]
+        row_mask = ficticious[i]
+        for j in range(n):
+            value = row[j]
+            if not row_mask[j]:
+                row_totals[i] += value
+                col_totals[j] += value
+            if value > 0:
+                cost = costs[i][j]
+                view.basic_vars.append({
+                    'cell': f"X{i+1}{j+1}",
+                    'value': value,
+                    'cost': cost,
+                    'i': i,
+                    'j': j,
+                    'type': 'basic'
+                })
+                view.assignments.append((i, j, value, cost))
+                view.cost_terms.append((cost, value))
+                view.total_cost += cost * value
+            else:
+                view.non_basic_vars.append(f"X{i+1}{j+1}")
     
-    # Calcular variables básicas y no básicas
-    basic_vars, non_basic_vars = _extract_basic_variables(solution, costs, balance_info)
+    if degenerated_cells:
+        view.degenerated_cells = list(degenerated_cells)
+    return view
+
+
+def analyze_solution(supply: List[int], demand: List[int], costs: List[List[float]], 
+                    solution: List[List[int]], balance_info: dict,
+                    view: SolutionView = None) -> Dict[str, Any]:
+    """
+    Analiza una solución de transporte y extrae información estructural.
+    m, n y las variables requeridas son las de la matriz balanceada (la de solution);
+    supply y demand son los originales, para los totales.
+    """
+    if view is None:
+        view = build_solution_view(solution, costs, balance_info)
+    m, n = view.m, view.n
     
-    # Convertir BasicVariable a dict para serialización
-    basic_vars_dict = [basic_variable_to_dict(bv) for bv in basic_vars]
+    # Variables básicas (valores > 0) y no básicas (valores = 0)
+    basic_vars_dict = [
+        {'cell': var['cell'], 'value': var['value'], 'cost': float(var['cost']), 'i': var['i'], 'j': var['j']}
+        for var in view.basic_vars
+    ]
 
     # Verificar degeneración
     required_vars = m + n - 1
-    actual_vars = len(basic_vars)
+    actual_vars = len(basic_vars_dict)
     has_degeneracy = actual_vars < required_vars
     
-    # Calcular costo total
-    total_cost = _calculate_total_cost(solution, costs, balance_info)
-    
     # Información de balanceo
     total_supply = sum(supply)
     total_demand = sum(demand)
@@ -50,8 +103,8 @@ def analyze_solution(supply: List[int], demand: List[int], costs: List[List[floa
     
     return {
         'basic_variables': basic_vars_dict,
-        'non_basic_variables': non_basic_vars,
-        'total_cost': total_cost,
+        'non_basic_variables': list(view.non_basic_vars),
+        'total_cost': float(view.total_cost),
         'is_balanced': is_balanced,
         'total_supply': total_supply,
         'total_demand': total_demand,
@@ -63,44 +116,6 @@ def analyze_solution(supply: List[int], demand: List[int], costs: List[List[floa
         'has_degeneracy': has_degeneracy
     }
 
-def _extract_basic_variables(solution: List[List[int]], costs: List[List[float]], 
-                           balance_info: dict) -> Tuple[List[BasicVariable], List[str]]:
-    """Extrae variables básicas (valores > 0) y no básicas (valores = 0)"""
-    basic_vars = []
-    non_basic_vars = []
-    
-    for i in range(len(solution)):
-        for j in range(len(solution[0])):
-            value = solution[i][j]
-            cell_name = f"X{i+1}{j+1}"
-            
-            # Excluir celdas ficticias
-            if _is_ficticious_cell(i, j, balance_info):
-                continue
-                
-            if value > 0:
-                basic_vars.append(BasicVariable(
-                    cell=cell_name,
-                    value=value,
-                    cost=costs[i][j],
-                    i=i,
-                    j=j
-                ))
-            else:
-                non_basic_vars.append(cell_name)
-    
-    return basic_vars, non_basic_vars
-
-def _calculate_total_cost(solution: List[List[int]], costs: List[List[float]], 
-                        balance_info: dict) -> float:
-    """Calcula el costo total excluyendo celdas ficticias"""
-    total = 0.0
-    for i in range(len(solution)):
-        for j in range(len(solution[0])):
-            if not _is_ficticious_cell(i, j, balance_info):
-                total += solution[i][j] * costs[i][j]
-    return total
-
 def _get_degeneracy_info(actual: int, required: int, has_degeneracy: bool) -> str:
     """Genera información sobre degeneración"""
     if not has_degeneracy:
@@ -108,26 +123,47 @@ def _get_degeneracy_info(actual: int, required: int, has_degeneracy: bool) -> st
     else:
         return f"Solución degenerada: {actual} variables básicas < {required} requeridas"
 
-def _is_ficticious_cell(i: int, j: int, balance_info: dict) -> bool:
-    """Verifica si una celda es ficticia"""
-    if not balance_info.get("balanced", False):
-        return False
-    
-    if balance_info.get("ficticious_row") == i:
-        return True
-    if balance_info.get("ficticious_col") == j:
-        return True
-    
-    return False
+class BasicVariableRecord:
+    """
+    Registro liviano de una variable básica usado dentro de los algoritmos.
+    Se convierte a diccionario una sola vez, al devolver el resultado (ver materialize_steps).
+    """
+    __slots__ = ("i", "j", "value", "cost")
+
+    def __init__(self, i: int, j: int, value: int, cost: float):
+        self.i = i
+        self.j = j
+        self.value = value
+        self.cost = cost
+
+    @property
+    def cell(self) -> str:
+        return f"X{self.i+1}{self.j+1}"
+
+    def to_dict(self) -> dict:
+        return {
+            'cell': self.cell,
+            'value': self.value,
+            'cost': float(self.cost),
+            'i': self.i,
+            'j': self.j
+        }
+
+
+def basic_variables_snapshot(basic_vars: list) -> tuple:
+    """Foto inmutable de las variables básicas en un paso (sin copiar ni validar cada registro)"""
+    return tuple(basic_vars)
 
 
 # algorithms/transport_analysis.py - agregar esta función
 def basic_variable_to_dict(basic_var) -> dict:
-    """Convierte un BasicVariable a diccionario para serialización JSON"""
+    """Convierte un BasicVariable (o BasicVariableRecord) a diccionario para serialización JSON"""
+    if isinstance(basic_var, dict):
+        return basic_var
     return {
         'cell': basic_var.cell,
         'value': basic_var.value,
-        'cost': basic_var.cost,
+        'cost': float(basic_var.cost),
         'i': basic_var.i,
         'j': basic_var.j
     }
@@ -137,6 +173,31 @@ def basic_variables_to_dict_list(basic_vars: list) -> list:
     return [basic_variable_to_dict(bv) for bv in basic_vars]
 
 
+def materialize_steps(steps: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Convierte en el lugar las fotos de variables básicas de cada paso a diccionarios.
+    Cada registro se convierte una sola vez; los pasos que lo comparten reutilizan el mismo diccionario.
+    """
+    converted = {}
+    for step in steps:
+        basic_vars = step.get('basic_variables')
+        if not basic_vars:
+            if basic_vars is not None:
+                step['basic_variables'] = []
+            continue
+        dict_list = []
+        for var in basic_vars:
+            if isinstance(var, BasicVariableRecord):
+                as_dict = converted.get(id(var))
+                if as_dict is None:
+                    as_dict = converted[id(var)] = var.to_dict()
+                dict_list.append(as_dict)
+            else:
+                dict_list.append(basic_variable_to_dict(var))
+        step['basic_variables'] = dict_list
+    return steps
+
+
 
 # algorithms/degeneration_fix.py
 from typing import List, Tuple
@@ -146,15 +207,22 @@ from typing import List, Tuple, Set
 import copy
 
 def fix_degeneration(solution: List[List[int]], supply: List[int], demand: List[int],
-                    costs: List[List[float]], balance_info: dict) -> Tuple[List[List[int]], List[Tuple[int, int]]]:
+                    costs: List[List[float]], balance_info: dict,
+                    view: SolutionView = None) -> Tuple[List[List[int]], List[Tuple[int, int]]]:
     """
-    Corrige la degeneración usando reglas específicas de transporte
+    Corrige la degeneración usando reglas específicas de transporte.
+    Si se pasa la vista de la solución, se reutilizan sus variables básicas y totales
+    y se le asignan las celdas degeneradas encontradas.
     """
     m, n = len(solution), len(solution[0])
     required_vars = m + n - 1
+    ficticious = ficticious_mask(balance_info, m, n)
     
-    # Obtener variables básicas existentes
-    existing_basic = _get_existing_basic_vars(solution, balance_info)
+    # Obtener variables básicas existentes (incluidas las de la fila/columna ficticia)
+    if view is not None:
+        existing_basic = view.basic_cells
+    else:
+        existing_basic = _get_existing_basic_vars(solution)
     current_count = len(existing_basic)
     
     degenerated_cells = []
@@ -162,17 +230,22 @@ def fix_degeneration(solution: List[List[int]], supply: List[int], demand: List[
     
     if current_count < required_vars:
         missing_vars = required_vars - current_count
-        print(f"⚠️  Degeneración: {current_count} < {required_vars}. Buscando {missing_vars} celdas elegibles...")
+        logger.debug("Degeneración: %d < %d. Buscando %d celdas elegibles...", current_count, required_vars, missing_vars)
+        
+        if view is not None:
+            row_totals, col_totals = view.row_totals, view.col_totals
+        else:
+            row_totals, col_totals = _get_line_totals(solution, ficticious)
         
         # Estrategia 1: Buscar celdas que no creen ciclos
         eligible_cells = _find_eligible_degenerated_cells(
-            solution, existing_basic, supply, demand, costs, balance_info
+            solution, existing_basic, supply, demand, costs, ficticious, row_totals, col_totals
         )
         
         # Estrategia 2: Si no hay suficientes, usar cualquier celda que no cree ciclos
         if len(eligible_cells) < missing_vars:
             backup_cells = _find_backup_degenerated_cells(
-                solution, existing_basic, balance_info
+                solution, existing_basic, ficticious
             )
             eligible_cells.extend(backup_cells)
         
@@ -180,22 +253,25 @@ def fix_degeneration(solution: List[List[int]], supply: List[int], demand: List[
         for k in range(min(missing_vars, len(eligible_cells))):
             i, j, cost, reason = eligible_cells[k]
             degenerated_cells.append((i, j))
-            print(f"  + Variable degenerada: X{i+1}{j+1}=0 ({reason})")
+            logger.debug("  + Variable degenerada: X%d%d=0 (%s)", i + 1, j + 1, reason)
     
+    if view is not None:
+        view.degenerated_cells = degenerated_cells
     return solution_copy, degenerated_cells
 
-def _get_existing_basic_vars(solution: List[List[int]], balance_info: dict) -> Set[Tuple[int, int]]:
-    """Obtiene las variables básicas existentes (no ficticias)"""
+def _get_existing_basic_vars(solution: List[List[int]]) -> Set[Tuple[int, int]]:
+    """Obtiene las variables básicas existentes"""
     basic_vars = set()
     for i in range(len(solution)):
         for j in range(len(solution[0])):
-            if solution[i][j] > 0 and not _is_ficticious_cell(i, j, balance_info):
+            if solution[i][j] > 0:
                 basic_vars.add((i, j))
     return basic_vars
 
 def _find_eligible_degenerated_cells(solution: List[List[int]], existing_basic: Set[Tuple[int, int]],
                                    supply: List[int], demand: List[int], 
-                                   costs: List[List[float]], balance_info: dict) -> List[Tuple]:
+                                   costs: List[List[float]], ficticious: List[List[bool]],
+                                   row_totals: List[int], col_totals: List[int]) -> List[Tuple]:
     """
     Encuentra celdas elegibles para variables degeneradas usando reglas específicas
     """
@@ -203,13 +279,13 @@ def _find_eligible_degenerated_cells(solution: List[List[int]], existing_basic:
     m, n = len(solution), len(solution[0])
     
     # Regla 1: Celdas en filas/columnas con oferta/demanda agotada
-    exhausted_rows = _get_exhausted_rows(solution, supply, balance_info)
-    exhausted_cols = _get_exhausted_cols(solution, demand, balance_info)
+    exhausted_rows = _get_exhausted_lines(row_totals, supply)
+    exhausted_cols = _get_exhausted_lines(col_totals, demand)
     
     for i in range(m):
         for j in range(n):
             if (solution[i][j] == 0 and 
-                not _is_ficticious_cell(i, j, balance_info) and
+                not ficticious[i][j] and
                 (i, j) not in existing_basic):
                 
                 # Verificar si es elegible según diferentes criterios
@@ -230,7 +306,7 @@ def _find_eligible_degenerated_cells(solution: List[List[int]], existing_basic:
 
 def _check_eligibility_criteria(i: int, j: int, solution: List[List[int]], 
                               existing_basic: Set[Tuple[int, int]],
-                              exhausted_rows: List[int], exhausted_cols: List[int],
+                              exhausted_rows: Set[int], exhausted_cols: Set[int],
                               costs: List[List[float]]) -> str:
     """
     Verifica los criterios de elegibilidad para una celda degenerada
@@ -261,25 +337,24 @@ def _check_eligibility_criteria(i: int, j: int, solution: List[List[int]],
     
     return ""
 
-def _get_exhausted_rows(solution: List[List[int]], supply: List[int], balance_info: dict) -> List[int]:
-    """Encuentra filas donde la oferta está completamente asignada"""
-    exhausted = []
-    for i in range(len(solution)):
-        row_total = sum(solution[i][j] for j in range(len(solution[0])) 
-                       if not _is_ficticious_cell(i, j, balance_info))
-        if abs(row_total - supply[i]) < 1e-6:  # Considerar tolerancia numérica
-            exhausted.append(i)
-    return exhausted
-
-def _get_exhausted_cols(solution: List[List[int]], demand: List[int], balance_info: dict) -> List[int]:
-    """Encuentra columnas donde la demanda está completamente satisfecha"""
-    exhausted = []
-    for j in range(len(solution[0])):
-        col_total = sum(solution[i][j] for i in range(len(solution))
-                       if not _is_ficticious_cell(i, j, balance_info))
-        if abs(col_total - demand[j]) < 1e-6:  # Considerar tolerancia numérica
-            exhausted.append(j)
-    return exhausted
+def _get_line_totals(solution: List[List[int]], ficticious: List[List[bool]]) -> Tuple[List[int], List[int]]:
+    """Suma las unidades asignadas por fila y por columna, sin celdas ficticias"""
+    m, n = len(solution), len(solution[0])
+    row_totals = [0] * m
+    col_totals = [0] * n
+    for i in range(m):
+        for j in range(n):
+            if not ficticious[i][j]:
+                row_totals[i] += solution[i][j]
+                col_totals[j] += solution[i][j]
+    return row_totals, col_totals
+
+def _get_exhausted_lines(totals: List[int], capacities: List[int]) -> Set[int]:
+    """Encuentra filas/columnas cuya oferta/demanda está completamente asignada"""
+    return {
+        k for k, total in enumerate(totals)
+        if abs(total - capacities[k]) < 1e-6  # Considerar tolerancia numérica
+    }
 
 def _would_create_cycle(i: int, j: int, existing_basic: Set[Tuple[int, int]]) -> bool:
     """
@@ -309,24 +384,14 @@ def _get_priority_score(reason: str) -> int:
     return priority_map.get(reason, 6)
 
 def _find_backup_degenerated_cells(solution: List[List[int]], existing_basic: Set[Tuple[int, int]],
-                                 balance_info: dict) -> List[Tuple]:
+                                 ficticious: List[List[bool]]) -> List[Tuple]:
     """Estrategia de respaldo para encontrar celdas degeneradas"""
     backup_cells = []
     for i in range(len(solution)):
         for j in range(len(solution[0])):
             if (solution[i][j] == 0 and 
-                not _is_ficticious_cell(i, j, balance_info) and
+                not ficticious[i][j] and
                 (i, j) not in existing_basic and
                 not _would_create_cycle(i, j, existing_basic)):
                 backup_cells.append((i, j, 0, "respaldo"))
     return backup_cells
-
-def _is_ficticious_cell(i: int, j: int, balance_info: dict) -> bool:
-    """Verifica si una celda es ficticia"""
-    if not balance_info.get("balanced", False):
-        return False
-    if balance_info.get("ficticious_row") == i:
-        return True
-    if balance_info.get("ficticious_col") == j:
-        return True
-    return False
\ No newline at end of file
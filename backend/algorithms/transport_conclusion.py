@@ -1,12 +1,15 @@
 # algorithms/final_conclusion.py - VERSIÓN COMPLETA CORREGIDA
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from algorithms.transport_analysis import SolutionView, build_solution_view
 
 def generate_final_conclusion(main_solution: Dict, alternative_solutions: List[Dict], 
                             supply: List[int], demand: List[int], 
                             costs: List[List[float]], balance_info: dict,
-                            method: str) -> Dict[str, Any]:
+                            method: str, solution_views: Optional[List[SolutionView]] = None) -> Dict[str, Any]:
     """
-    Genera la conclusión final analizando la solución más económica
+    Genera la conclusión final analizando la solución más económica.
+    solution_views contiene la vista ya calculada de la solución principal y de cada
+    alternativa (en el mismo orden), para no volver a recorrer las matrices.
     """
     # Determinar el tipo de método
     is_northwest = (method.lower() == "northwest")
@@ -29,11 +32,17 @@ def generate_final_conclusion(main_solution: Dict, alternative_solutions: List[D
         else:
             cost_difference = 0
     
+    if solution_views:
+        best_view = solution_views[best_index]
+    else:
+        best_matrix = best_solution.get('main_solution', best_solution.get('solution_matrix'))
+        best_view = build_solution_view(best_matrix, costs, balance_info)
+    
     # Generar interpretación
-    interpretation = _generate_interpretation(best_solution, supply, demand, is_northwest, balance_info, method)
+    interpretation = _generate_interpretation(best_solution, best_view, supply, demand, is_northwest, balance_info, method)
     
     # Generar desglose de costo
-    cost_breakdown = _generate_cost_breakdown(best_solution, costs, balance_info, is_northwest, method)
+    cost_breakdown = _generate_cost_breakdown(best_solution, best_view, costs, balance_info, is_northwest, method)
     
     # Generar recomendaciones
     recommendations = _generate_recommendations(best_solution, cost_difference, has_alternatives, is_northwest, method)
@@ -58,30 +67,25 @@ def generate_final_conclusion(main_solution: Dict, alternative_solutions: List[D
 
 
 
-def _generate_interpretation(solution: Dict, supply: List[int], demand: List[int], 
+def _generate_interpretation(solution: Dict, view: SolutionView, supply: List[int], demand: List[int], 
                            is_northwest: bool, balance_info: dict, method: str) -> str:
     """Genera una explicación en formato párrafo continuo como conclusión"""
-    basic_vars = solution.get('transport_summary', {}).get('basic_variables_list', '')
     total_cost = solution.get('total_cost', 0)
     
-    # Parsear variables básicas
-    vars_list = basic_vars.split(", ")
+    # Variables básicas (y degeneradas) tomadas de la vista de la solución
     real_assignments = []
     ficticious_assignments = []
     
-    for var in vars_list:
-        if '=' in var:
-            var_name, value = var.split('=')
-            clean_value = value.replace(' ⚠️', '')
-            row_char = var_name[0]
-            col_num = var_name[1:]
-            
-            is_ficticious = _is_ficticious_route(row_char, col_num, balance_info)
-            
-            if is_ficticious:
-                ficticious_assignments.append(f"{var_name}={clean_value}")
-            else:
-                real_assignments.append(f"{var_name}={clean_value}")
+    for var_name, value in _basic_variable_labels(view):
+        row_char = var_name[0]
+        col_num = var_name[1:]
+        
+        is_ficticious = _is_ficticious_route(row_char, col_num, balance_info)
+        
+        if is_ficticious:
+            ficticious_assignments.append(f"{var_name}={value}")
+        else:
+            real_assignments.append(f"{var_name}={value}")
     
     # Construir el párrafo explicativo
     interpretation = "La solución aproximada "
@@ -151,6 +155,12 @@ def _generate_interpretation(solution: Dict, supply: List[int], demand: List[int
     
     return interpretation
 
+def _basic_variable_labels(view: SolutionView) -> List[tuple]:
+    """Etiquetas (A1, valor) de las variables básicas seguidas de las degeneradas"""
+    labels = [(f"{chr(65 + var['i'])}{var['j']+1}", var['value']) for var in view.basic_vars]
+    labels.extend((f"{chr(65 + i)}{j+1}", 0) for i, j in view.degenerated_cells)
+    return labels
+
 # Funciones auxiliares (las mismas que antes)
 def _is_ficticious_route(row_char: str, col_num: str, balance_info: dict) -> bool:
     if not balance_info.get("balanced", False):
@@ -288,28 +298,23 @@ def _get_destination_name(col_num: str, demand: List[int], is_ficticious: bool)
 
 
 
-def _generate_cost_breakdown(solution: Dict, costs: List[List[float]], balance_info: dict,
+def _generate_cost_breakdown(solution: Dict, view: SolutionView, costs: List[List[float]], balance_info: dict,
                            is_northwest: bool, method: str) -> str:
     """Genera el desglose del costo final de forma concisa"""
-    calculation = solution.get('transport_summary', {}).get('total_cost_calculation', '')
     total_cost = solution['total_cost']
     
     breakdown = "CÁLCULO DEL COSTO TOTAL:\n\n"
     
-    if ' + ' in calculation and ' = ' in calculation:
-        calculation_part = calculation.split(' = ')[0]
-        terms = calculation_part.split(' + ')
-        
-        for i, term in enumerate(terms, 1):
-            if '×' in term:
-                cost_val, units = term.split('×')
-                cost_num = float(cost_val)
-                partial_cost = cost_num * float(units)
-                
-                if cost_num == 0:
-                    breakdown += f"{cost_val} × {units} = {partial_cost} (ficticio)\n"
-                else:
-                    breakdown += f"{cost_val} × {units} = {partial_cost}\n"
+    # El desglose solo se muestra cuando hay más de un término
+    if len(view.cost_terms) > 1:
+        for cost_val, units in view.cost_terms:
+            cost_num = float(cost_val)
+            partial_cost = cost_num * float(units)
+            
+            if cost_num == 0:
+                breakdown += f"{cost_val} × {units} = {partial_cost} (ficticio)\n"
+            else:
+                breakdown += f"{cost_val} × {units} = {partial_cost}\n"
     
     breakdown += f"\nTOTAL: {total_cost} unidades monetarias"
     
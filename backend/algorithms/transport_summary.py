@@ -1,24 +1,28 @@
 # algorithms/transport_summary.py
 from typing import List, Dict, Any, Tuple
-from algorithms.transport_analysis import analyze_solution
+from algorithms.transport_analysis import analyze_solution, build_solution_view, SolutionView
 
 # algorithms/transport_summary.py - función actualizada
 def generate_transport_summary(supply: List[int], demand: List[int], 
                              costs: List[List[float]], solution: List[List[int]],
                              balance_info: dict, method: str, 
-                             degenerated_cells: List[Tuple[int, int]] = None) -> Dict[str, Any]:
+                             degenerated_cells: List[Tuple[int, int]] = None,
+                             view: SolutionView = None) -> Dict[str, Any]:
     """
     Genera un resumen textual del problema de transporte INCLUYENDO variables degeneradas
     """
     
+    if view is None:
+        view = build_solution_view(solution, costs, balance_info, degenerated_cells)
     if degenerated_cells is None:
-        degenerated_cells = []
+        degenerated_cells = view.degenerated_cells
     
-    m, n = len(supply), len(demand)
+    # Dimensiones de la matriz balanceada, como en analyze_solution
+    m, n = view.m, view.n
     
     # Calcular variables básicas REALES (incluyendo degeneradas)
     basic_vars_list, degenerated_vars_list = _get_all_basic_variables(
-        solution, costs, balance_info, degenerated_cells
+        view, costs, degenerated_cells
     )
     
     # 1. Variables básicas: m + n - 1 = x
@@ -30,7 +34,7 @@ def generate_transport_summary(supply: List[int], demand: List[int],
     )
     
     # 3. Cálculo del costo total (excluyendo degeneradas)
-    total_cost_calc = _generate_total_cost_calculation(solution, costs, balance_info)
+    total_cost_calc = _generate_total_cost_calculation(view)
     
     # 4. Información de degeneración actualizada
     total_basic_vars = len(basic_vars_list) + len(degenerated_vars_list)
@@ -40,7 +44,7 @@ def generate_transport_summary(supply: List[int], demand: List[int],
     
     # 5. Pasos en texto simple
     # step_by_step_text = _generate_step_by_step_text(solution, costs, method, degenerated_cells)
-    step_by_step_text = _generate_step_by_step_text(solution, costs, method)
+    step_by_step_text = _generate_step_by_step_text(solution, view, method)
     
     return {
         'basic_variables_count': basic_vars_count,
@@ -53,26 +57,12 @@ def generate_transport_summary(supply: List[int], demand: List[int],
         'degenerated_variables_count': len(degenerated_vars_list)
     }
 
-def _get_all_basic_variables(solution: List[List[int]], costs: List[List[float]],
-                           balance_info: dict, degenerated_cells: List[Tuple[int, int]]) -> tuple:
+def _get_all_basic_variables(view: SolutionView, costs: List[List[float]],
+                           degenerated_cells: List[Tuple[int, int]]) -> tuple:
     """Obtiene TODAS las variables básicas (normales + degeneradas)"""
-    basic_vars = []      # Variables con valor > 0
+    basic_vars = view.basic_vars  # Variables con valor > 0
     degenerated_vars = [] # Variables degeneradas (valor 0)
     
-    # Variables normales (valor > 0)
-    for i in range(len(solution)):
-        for j in range(len(solution[0])):
-            value = solution[i][j]
-            if value > 0 and not _is_ficticious_cell(i, j, balance_info):
-                basic_vars.append({
-                    'cell': f"X{i+1}{j+1}",
-                    'value': value,
-                    'cost': costs[i][j],
-                    'i': i,
-                    'j': j,
-                    'type': 'basic'
-                })
-    
     # Variables degeneradas
     for i, j in degenerated_cells:
         degenerated_vars.append({
@@ -113,23 +103,11 @@ def _generate_degeneracy_text_updated(actual_vars: int, required_vars: int, dege
     
 
 
-def _generate_total_cost_calculation(solution: List[List[int]], costs: List[List[float]],
-                                   balance_info: dict) -> str:
+def _generate_total_cost_calculation(view: SolutionView) -> str:
     """Genera el cálculo del costo total en formato: 2×10 + 0×5 + 1×15 + ... = 340"""
-    calculation_parts = []
-    total_cost = 0
-    
-    for i in range(len(solution)):
-        for j in range(len(solution[0])):
-            value = solution[i][j]
-            # Solo incluir celdas no ficticias con valor > 0
-            if value > 0 and not _is_ficticious_cell(i, j, balance_info):
-                cost = costs[i][j]
-                calculation_parts.append(f"{cost}×{value}")
-                total_cost += cost * value
-    
-    calculation_str = " + ".join(calculation_parts)
-    return f"{calculation_str} = {total_cost}"
+    # Solo celdas no ficticias con valor > 0
+    calculation_str = " + ".join(f"{cost}×{value}" for cost, value in view.cost_terms)
+    return f"{calculation_str} = {view.total_cost}"
 
 def _generate_degeneracy_text(analysis: Dict[str, Any]) -> str:
     """Genera texto sobre degeneración"""
@@ -141,21 +119,21 @@ def _generate_degeneracy_text(analysis: Dict[str, Any]) -> str:
     else:
         return f"Solución no degenerada: {actual} variables básicas = {required} requeridas"
 
-def _generate_step_by_step_text(solution: List[List[int]], costs: List[List[float]],
+def _generate_step_by_step_text(solution: List[List[int]], view: SolutionView,
                               method: str) -> List[str]:
     """Genera pasos en texto simple (puedes personalizar según el método)"""
     steps = []
     
     if method == "northwest":
-        steps = _generate_northwest_steps_text(solution, costs)
+        steps = _generate_northwest_steps_text(solution)
     elif method == "min_cost":
-        steps = _generate_min_cost_steps_text(solution, costs)
+        steps = _generate_min_cost_steps_text(view)
     elif method == "vogel":
-        steps = _generate_vogel_steps_text(solution, costs)
+        steps = _generate_vogel_steps_text(view)
     
     return steps
 
-def _generate_northwest_steps_text(solution: List[List[int]], costs: List[List[float]]) -> List[str]:
+def _generate_northwest_steps_text(solution: List[List[int]]) -> List[str]:
     """Genera pasos para el método de la esquina noroeste"""
     steps = []
     m, n = len(solution), len(solution[0])
@@ -181,7 +159,7 @@ def _generate_northwest_steps_text(solution: List[List[int]], costs: List[List[f
     
     return steps
 
-def _generate_min_cost_steps_text(solution: List[List[int]], costs: List[List[float]]) -> List[str]:
+def _generate_min_cost_steps_text(view: SolutionView) -> List[str]:
     """Genera pasos para el método del costo mínimo"""
     steps = []
     
@@ -189,14 +167,7 @@ def _generate_min_cost_steps_text(solution: List[List[int]], costs: List[List[fl
     steps.append("──────────────────────")
     
     # Encontrar asignaciones en orden de costo (simplificado)
-    assignments = []
-    for i in range(len(solution)):
-        for j in range(len(solution[0])):
-            if solution[i][j] > 0:
-                assignments.append((i, j, solution[i][j], costs[i][j]))
-    
-    # Ordenar por costo
-    assignments.sort(key=lambda x: x[3])
+    assignments = sorted(view.assignments, key=lambda x: x[3])
     
     for step_num, (i, j, value, cost) in enumerate(assignments, 1):
         row_char = chr(65 + i)
@@ -204,7 +175,7 @@ def _generate_min_cost_steps_text(solution: List[List[int]], costs: List[List[fl
     
     return steps
 
-def _generate_vogel_steps_text(solution: List[List[int]], costs: List[List[float]]) -> List[str]:
+def _generate_vogel_steps_text(view: SolutionView) -> List[str]:
     """Genera pasos para el método de Vogel"""
     steps = []
     
@@ -212,26 +183,8 @@ def _generate_vogel_steps_text(solution: List[List[int]], costs: List[List[float
     steps.append("──────────────────────────────")
     
     # Simulación simplificada de pasos de Vogel
-    assignments = []
-    for i in range(len(solution)):
-        for j in range(len(solution[0])):
-            if solution[i][j] > 0:
-                assignments.append((i, j, solution[i][j]))
-    
-    for step_num, (i, j, value) in enumerate(assignments, 1):
+    for step_num, (i, j, value, _) in enumerate(view.assignments, 1):
         row_char = chr(65 + i)
         steps.append(f"Paso {step_num}: Asignar {value} unidades en {row_char}{j+1}")
     
     return steps
-
-def _is_ficticious_cell(i: int, j: int, balance_info: dict) -> bool:
-    """Verifica si una celda es ficticia"""
-    if not balance_info.get("balanced", False):
-        return False
-    
-    if balance_info.get("ficticious_row") == i:
-        return True
-    if balance_info.get("ficticious_col") == j:
-        return True
-    
-    return False
\ No newline at end of file
@@ -1,68 +1,82 @@
 from typing import List, Dict, Any, Tuple, Optional
 import copy
-from algorithms.balance import balance_transport_problem
-from algorithms.transport_analysis import analyze_solution, basic_variables_to_dict_list, fix_degeneration
-from schemas.schema_transport import BasicVariable
+import logging
+from algorithms.balance import balance_problem, BalancedProblem, ficticious_mask
+from algorithms.cost_scan import active_costs, line_min_positions, two_smallest
+from algorithms.transport_analysis import (
+    analyze_solution, fix_degeneration, build_solution_view,
+    BasicVariableRecord, materialize_steps
+)
+from algorithms.step_recorder import StepRecorder, NullStepRecorder, make_step_recorder
+from algorithms.phase_timer import PhaseTimer, NullPhaseTimer
 from algorithms.transport_summary import generate_transport_summary
 from algorithms.transport_conclusion import generate_final_conclusion
 
-def vogel_approximation(supply: List[int], demand: List[int], costs: List[List[float]]) -> dict:
+logger = logging.getLogger(__name__)
+
+def vogel_approximation(supply: List[int], demand: List[int], costs: List[List[float]],
+                        balanced: Optional[BalancedProblem] = None, detail: str = "full",
+                        recorder: Optional[StepRecorder] = None, timer: Optional[PhaseTimer] = None) -> dict:
     """
-    Método de Vogel con detección EXPLÍCITA de empates en penalizaciones
+    Método de Vogel con detección EXPLÍCITA de empates en penalizaciones.
+    detail controla lo que se calcula: "minimal" (solo matriz y costo), "standard"
+    (más análisis y resumen) o "full" (más pasos, empates, alternativas y conclusión).
+    recorder recibe los pasos; por defecto se elige según el nivel de detalle.
+    timer mide cada fase (ver algorithms/phase_timer.py).
     """
-    balanced_data = balance_transport_problem(supply, demand, costs)
-    balanced_supply = balanced_data["supply"]
-    balanced_demand = balanced_data["demand"]
-    balanced_costs = balanced_data["costs"]
-    balance_info = balanced_data["balance_info"]
+    if timer is None:
+        timer = NullPhaseTimer()
+    if balanced is None:
+        with timer.phase("balance"):
+            balanced = balance_problem(supply, demand, costs)
+    balanced_supply = balanced.supply
+    balanced_demand = balanced.demand
+    balanced_costs = balanced.costs
+    balance_info = balanced.balance_info
+    # Pasos, análisis y conclusión describen la matriz balanceada (ver BalancedProblem)
+    analysis_info = balanced.analysis_info
     
     # Solución principal con detección de empates
-    main_solution, main_steps, main_cost, main_basic_vars, all_ties = _solve_vogel_with_explicit_tie_detection(
-        balanced_supply, balanced_demand, balanced_costs, balance_info
-    )
-    print('all_ties >>' , all_ties)
-    
-    # Buscar soluciones alternativas basadas en empates REALES
-    alternative_solutions = _generate_alternative_solutions_from_ties(
-        balanced_supply, balanced_demand, balanced_costs, balance_info, all_ties
-    )
-    
-    print('alternative_solutions >>' , alternative_solutions)
+    if recorder is None:
+        recorder = make_step_recorder(detail)
+    with timer.phase("heuristic"):
+        main_solution, main_steps, main_cost, main_basic_vars, all_ties = _solve_vogel_with_explicit_tie_detection(
+            balanced_supply, balanced_demand, balanced_costs, analysis_info,
+            recorder=recorder, detect_ties=detail == "full"
+        )
+    logger.debug("Empates detectados: %d", len(all_ties), extra={'ties': all_ties})
+    
+    # Un solo recorrido de la matriz para análisis, resumen y conclusión
+    with timer.phase("solution_view"):
+        main_view = build_solution_view(main_solution, balanced_costs, analysis_info)
+
+    if detail == "minimal":
+        return {
+            'main_solution': main_solution,
+            'total_cost': float(main_view.total_cost),
+            'balance_info': balance_info
+        }
+
     # ✅ CORREGIR DEGENERACIÓN
-    main_solution, degenerated_cells = fix_degeneration(
-        main_solution, balanced_supply, balanced_demand, balanced_costs, balance_info
-    )
+    with timer.phase("degeneracy"):
+        main_solution, degenerated_cells = fix_degeneration(
+            main_solution, balanced_supply, balanced_demand, balanced_costs, analysis_info, view=main_view
+        )
 
     # Análisis final de la solución
-    analysis = analyze_solution(supply, demand, costs, main_solution, balance_info)
+    with timer.phase("analysis"):
+        analysis = analyze_solution(balanced_supply, balanced_demand, balanced_costs, main_solution, analysis_info, view=main_view)
     
-    transport_summary = generate_transport_summary(
-        supply, demand, costs, main_solution, balance_info, "vogel", degenerated_cells
-    )
+    with timer.phase("summary"):
+        transport_summary = generate_transport_summary(
+            balanced_supply, balanced_demand, balanced_costs, main_solution, analysis_info, "vogel", degenerated_cells, view=main_view
+        )
 
 
-    # Generar conclusión final
-    final_conclusion = generate_final_conclusion(
-        {
-            'main_solution': main_solution,
-            'total_cost': analysis['total_cost'],
-            'transport_summary': transport_summary,
-            'basic_variables': analysis['basic_variables'],
-            'required_basic_variables': analysis['required_basic_variables']
-        },
-        alternative_solutions,
-        supply, demand, costs, balance_info,
-        "vogel"
-    )
-    
-    return {
+    result = {
         'main_solution': main_solution,
         'total_cost': analysis['total_cost'],
-        'steps': main_steps,
         'balance_info': balance_info,
-        'alternative_solutions': alternative_solutions,
-        'has_multiple_solutions': len(alternative_solutions) > 0,
-        'all_ties_detected': all_ties,
         # Información de análisis
         'basic_variables': analysis['basic_variables'],
         'non_basic_variables': analysis['non_basic_variables'],
@@ -75,43 +89,92 @@ def vogel_approximation(supply: List[int], demand: List[int], costs: List[List[f
         'required_basic_variables': analysis['required_basic_variables'],
         'actual_basic_variables': analysis['actual_basic_variables'],
         'has_degeneracy': analysis['has_degeneracy'],
-        'transport_summary': transport_summary,
-        'final_conclusion': final_conclusion
+        'transport_summary': transport_summary
     }
+    if detail == "standard":
+        return result
+
+    # Buscar soluciones alternativas basadas en empates REALES
+    with timer.phase("alternatives"):
+        alternative_solutions, alternative_views = _generate_alternative_solutions_from_ties(
+            balanced_supply, balanced_demand, balanced_costs, analysis_info, all_ties
+        )
+    
+    logger.debug("Soluciones alternativas: %d", len(alternative_solutions),
+                 extra={'alternative_costs': [alt['total_cost'] for alt in alternative_solutions]})
+
+    # Generar conclusión final
+    with timer.phase("conclusion"):
+        final_conclusion = generate_final_conclusion(
+            {
+                'main_solution': main_solution,
+                'total_cost': analysis['total_cost'],
+                'transport_summary': transport_summary,
+                'basic_variables': analysis['basic_variables'],
+                'required_basic_variables': analysis['required_basic_variables']
+            },
+            alternative_solutions,
+            balanced_supply, balanced_demand, balanced_costs, analysis_info,
+            "vogel", solution_views=[main_view] + alternative_views
+        )
+    
+    # Conversión única de las variables básicas de cada paso
+    with timer.phase("materialize_steps"):
+        materialize_steps(main_steps)
+        for alt_solution in alternative_solutions:
+            materialize_steps(alt_solution['steps'])
+
+    result.update({
+        'steps': main_steps,
+        'alternative_solutions': alternative_solutions,
+        'has_multiple_solutions': len(alternative_solutions) > 0,
+        'all_ties_detected': all_ties,
+        'final_conclusion': final_conclusion
+    })
+    return result
 
 def _solve_vogel_with_explicit_tie_detection(supply: List[int], demand: List[int], costs: List[List[float]],
-                                            balance_info: dict) -> tuple:
-    """Resuelve Vogel con detección EXPLÍCITA de empates"""
+                                            balance_info: dict, recorder: Optional[StepRecorder] = None,
+                                            detect_ties: bool = True) -> tuple:
+    """
+    Resuelve Vogel con detección EXPLÍCITA de empates.
+    Los pasos se envían a recorder (con NullStepRecorder no se construye historial) y con
+    detect_ties=False no se registran empates (solo sirven para buscar alternativas).
+    """
     m, n = len(supply), len(demand)
+    ficticious = ficticious_mask(balance_info, m, n)
     solution = [[0] * n for _ in range(m)]
-    remaining_supply = supply.copy()
-    remaining_demand = demand.copy()
-    costs_copy = copy.deepcopy(costs)
+    # Las filas y columnas agotadas son las de oferta o demanda restante 0: se excluyen
+    # por esos valores, sin copiar la matriz (costs es la vista balanceada, solo lectura)
+    remaining_supply = list(supply)
+    remaining_demand = list(demand)
     
-    steps = []
+    if recorder is None:
+        recorder = StepRecorder()
     total_cost = 0
     step_count = 0
     basic_vars = []
     all_ties = []  # Todos los empates detectados
     
     # Paso 0: Información inicial
-    steps.append({
-        'step_number': step_count,
-        'description': 'Inicio - Método de Aproximación de Vogel',
-        'current_matrix': [row.copy() for row in solution],
-        'current_cost': total_cost,
-        'explanation': f'Problema: {m} orígenes, {n} destinos. Variables básicas requeridas: {m + n - 1}',
-        'basic_variables': basic_variables_to_dict_list(basic_vars),
-        'assignment': None
-    })
+    if recorder.enabled:
+        recorder.record(
+            step_count, 'Inicio - Método de Aproximación de Vogel', solution, total_cost,
+            f'Problema: {m} orígenes, {n} destinos. Variables básicas requeridas: {m + n - 1}', basic_vars
+        )
     step_count += 1
 
     
     
     while sum(remaining_supply) > 0 and sum(remaining_demand) > 0:
-        # Calcular penalizaciones CORRECTAMENTE
-        row_penalties, row_penalties_info = _calculate_row_penalties_detailed(remaining_supply, remaining_demand, costs_copy)
-        col_penalties, col_penalties_info = _calculate_col_penalties_detailed(remaining_supply, remaining_demand, costs_copy)
+        # Calcular penalizaciones CORRECTAMENTE (el detalle en texto solo si se registran pasos)
+        active = active_costs(costs, remaining_supply, remaining_demand)
+        if recorder.enabled:
+            row_penalties, row_penalties_info = _calculate_row_penalties_detailed(remaining_supply, remaining_demand, costs, active)
+            col_penalties, col_penalties_info = _calculate_col_penalties_detailed(remaining_supply, remaining_demand, costs, active)
+        else:
+            row_penalties = _calculate_simple_row_penalties(remaining_supply, remaining_demand, costs, active)
+            col_penalties = _calculate_simple_col_penalties(remaining_supply, remaining_demand, costs, active)
         
         # Encontrar máxima penalización
         max_row_pen = max([p for p in row_penalties if p >= 0], default=-1)
@@ -129,11 +192,11 @@ def _solve_vogel_with_explicit_tie_detection(supply: List[int], demand: List[int
         # REGISTRAR EMPATES SI LOS HAY
         current_step_ties = []
 
-        print(f"[Paso {step_count}] Penalizaciones fila: {row_penalties}, col: {col_penalties}")
+        logger.debug("[Paso %d] Penalizaciones fila: %s, col: %s", step_count, row_penalties, col_penalties)
 
 
         # Registrar todos los empates detectados, no solo de la dirección elegida
-        if len(row_ties) > 1:
+        if detect_ties and len(row_ties) > 1:
             all_ties.append({
                 'step': step_count,
                 'type': 'penalty_tie',
@@ -143,7 +206,7 @@ def _solve_vogel_with_explicit_tie_detection(supply: List[int], demand: List[int
                 'description': f"Empate en penalización de fila: {max_row_pen} en filas {[r+1 for r in row_ties]}"
             })
 
-        if len(col_ties) > 1:
+        if detect_ties and len(col_ties) > 1:
             all_ties.append({
                 'step': step_count,
                 'type': 'penalty_tie',
@@ -161,15 +224,14 @@ def _solve_vogel_with_explicit_tie_detection(supply: List[int], demand: List[int
                 break
                 
             # Encontrar columna con menor costo en esa fila
-            available_cols = [j for j in range(n) if remaining_demand[j] > 0 and costs_copy[selected_index][j] < float('inf')]
-            if not available_cols:
+            if not len(active[1]):
                 break
                 
-            min_cost = min([costs_copy[selected_index][j] for j in available_cols])
-            candidate_cols = [j for j in available_cols if costs_copy[selected_index][j] == min_cost]
+            candidate_cols = line_min_positions(active, selected_index, axis=1)
+            min_cost = costs[selected_index][candidate_cols[0]]
             
             # DETECTAR EMPATE EN COSTOS MÍNIMOS
-            if len(candidate_cols) > 1:
+            if detect_ties and len(candidate_cols) > 1:
                 tie_info = {
                     'step': step_count,
                     'type': 'min_cost_tie',
@@ -185,25 +247,20 @@ def _solve_vogel_with_explicit_tie_detection(supply: List[int], demand: List[int
             selected_col = candidate_cols[0]
             i, j = selected_index, selected_col
             
-            # Información detallada para explicación
-            penalty_info = row_penalties_info[selected_index]
-            tie_reason = f"Penalización fila {max_row_pen} (≥ columna {max_col_pen}). {penalty_info}. Mínimo costo: {min_cost}"
-            
         else:
             selected_index = col_ties[0] if col_ties else -1
             if selected_index == -1:
                 break
                 
             # Encontrar fila con menor costo en esa columna
-            available_rows = [i for i in range(m) if remaining_supply[i] > 0 and costs_copy[i][selected_index] < float('inf')]
-            if not available_rows:
+            if not len(active[0]):
                 break
                 
-            min_cost = min([costs_copy[i][selected_index] for i in available_rows])
-            candidate_rows = [i for i in available_rows if costs_copy[i][selected_index] == min_cost]
+            candidate_rows = line_min_positions(active, selected_index, axis=0)
+            min_cost = costs[candidate_rows[0]][selected_index]
             
             # DETECTAR EMPATE EN COSTOS MÍNIMOS
-            if len(candidate_rows) > 1:
+            if detect_ties and len(candidate_rows) > 1:
                 tie_info = {
                     'step': step_count,
                     'type': 'min_cost_tie',
@@ -218,48 +275,41 @@ def _solve_vogel_with_explicit_tie_detection(supply: List[int], demand: List[int
             
             selected_row = candidate_rows[0]
             i, j = selected_row, selected_index
-            
-            # Información detallada para explicación
-            penalty_info = col_penalties_info[selected_index]
-            tie_reason = f"Penalización columna {max_col_pen} (> fila {max_row_pen}). {penalty_info}. Mínimo costo: {min_cost}"
         
         # ASIGNACIÓN
         x = min(remaining_supply[i], remaining_demand[j])
         solution[i][j] = x
         
         # Solo sumar costo si no es celda ficticia
-        if not _is_ficticious_cell(i, j, balance_info):
+        if not ficticious[i][j]:
             total_cost += x * costs[i][j]
         
         # Registrar variable básica si no es ficticia
-        if x > 0 and not _is_ficticious_cell(i, j, balance_info):
-            basic_vars.append(BasicVariable(
-                cell=f"X{i+1}{j+1}",
-                value=x,
-                cost=costs[i][j],
-                i=i,
-                j=j
-            ))
+        if x > 0 and not ficticious[i][j]:
+            basic_vars.append(BasicVariableRecord(i, j, x, costs[i][j]))
         
-        step_description = f'Asignar {x} unidades en X{i+1}{j+1}'
-        step_explanation = (f'Penalización máxima: {max_penalty} ({direction}). '
-                          f'Asignación: min({remaining_supply[i]}, {remaining_demand[j]}) = {x}. '
-                          f'{tie_reason}')
-        
-        # Agregar información de empates si los hay
-        if current_step_ties:
-            tie_descriptions = [tie['description'] for tie in current_step_ties]
-            step_explanation += f" | EMPATES: {'; '.join(tie_descriptions)}"
-        
-        steps.append({
-            'step_number': step_count,
-            'description': step_description,
-            'current_matrix': [row.copy() for row in solution],
-            'current_cost': total_cost,
-            'explanation': step_explanation,
-            'basic_variables': basic_variables_to_dict_list(basic_vars),
-            'assignment': f"X{i+1}{j+1}"
-        })
+        if recorder.enabled:
+            # Información detallada para explicación
+            if use_row:
+                tie_reason = (f"Penalización fila {max_row_pen} (≥ columna {max_col_pen}). "
+                              f"{row_penalties_info[selected_index]}. Mínimo costo: {min_cost}")
+            else:
+                tie_reason = (f"Penalización columna {max_col_pen} (> fila {max_row_pen}). "
+                              f"{col_penalties_info[selected_index]}. Mínimo costo: {min_cost}")
+            step_description = f'Asignar {x} unidades en X{i+1}{j+1}'
+            step_explanation = (f'Penalización máxima: {max_penalty} ({direction}). '
+                              f'Asignación: min({remaining_supply[i]}, {remaining_demand[j]}) = {x}. '
+                              f'{tie_reason}')
+            
+            # Agregar información de empates si los hay
+            if current_step_ties:
+                tie_descriptions = [tie['description'] for tie in current_step_ties]
+                step_explanation += f" | EMPATES: {'; '.join(tie_descriptions)}"
+            
+            recorder.record(
+                step_count, step_description, solution, total_cost,
+                step_explanation, basic_vars, f"X{i+1}{j+1}"
+            )
 
 
 
@@ -273,7 +323,6 @@ def _solve_vogel_with_explicit_tie_detection(supply: List[int], demand: List[int
                             alt_solution = copy.deepcopy(solution)
                             alt_supply = remaining_supply.copy()
                             alt_demand = remaining_demand.copy()
-                            alt_costs = copy.deepcopy(costs_copy)
                             
                             # Determinar coordenadas alternativas según la dirección del empate
                             if tie_case['direction'] == 'fila':
@@ -305,28 +354,16 @@ def _solve_vogel_with_explicit_tie_detection(supply: List[int], demand: List[int
         remaining_supply[i] -= x
         remaining_demand[j] -= x
         
-        # Actualizar matriz de costos
-        if remaining_supply[i] == 0:
-            for col in range(n):
-                costs_copy[i][col] = float('inf')
-        if remaining_demand[j] == 0:
-            for row in range(m):
-                costs_copy[row][j] = float('inf')
-        
         step_count += 1
     
     # Paso final
-    steps.append({
-        'step_number': step_count,
-        'description': 'Solución final de Vogel',
-        'current_matrix': [row.copy() for row in solution],
-        'current_cost': total_cost,
-        'explanation': f'Solución básica factible inicial obtenida. Costo total: {total_cost}',
-        'basic_variables': basic_variables_to_dict_list(basic_vars),
-        'assignment': None
-    })
+    if recorder.enabled:
+        recorder.record(
+            step_count, 'Solución final de Vogel', solution, total_cost,
+            f'Solución básica factible inicial obtenida. Costo total: {total_cost}', basic_vars
+        )
     
-    return solution, steps, total_cost, basic_vars, all_ties
+    return solution, recorder.steps, total_cost, basic_vars, all_ties
 
 
 
@@ -337,74 +374,56 @@ def _solve_vogel_with_explicit_tie_detection(supply: List[int], demand: List[int
 
 
 def _calculate_row_penalties_detailed(remaining_supply: List[int], remaining_demand: List[int], 
-                                    costs: List[List[float]]) -> Tuple[List[float], List[str]]:
-    """Calcula penalizaciones por fila con información detallada"""
+                                    costs: List[List[float]], active) -> Tuple[List[float], List[str]]:
+    """Calcula penalizaciones por fila con información detallada (active: ver cost_scan.active_costs)"""
     m = len(remaining_supply)
-    penalties = []
-    penalties_info = []
-    
-    for i in range(m):
-        if remaining_supply[i] > 0:
-            # Obtener costos válidos de la fila
-            valid_costs = []
-            for j in range(len(remaining_demand)):
-                if remaining_demand[j] > 0 and costs[i][j] < float('inf'):
-                    valid_costs.append((costs[i][j], j))
-            
-            if len(valid_costs) >= 2:
-                # Ordenar por costo y tomar los dos menores
-                sorted_costs = sorted(valid_costs, key=lambda x: x[0])
-                min1_cost, min1_col = sorted_costs[0]
-                min2_cost, min2_col = sorted_costs[1]
-                penalty = min2_cost - min1_cost
-                penalties.append(penalty)
-                penalties_info.append(f"Fila {i+1}: min1=X{i+1}{min1_col+1}({min1_cost}), min2=X{i+1}{min2_col+1}({min2_cost}), penalización={penalty}")
-            elif len(valid_costs) == 1:
-                min_cost, min_col = valid_costs[0]
-                penalties.append(min_cost)
-                penalties_info.append(f"Fila {i+1}: único costo X{i+1}{min_col+1}({min_cost})")
-            else:
-                penalties.append(-1)
-                penalties_info.append(f"Fila {i+1}: sin celdas disponibles")
-        else:
-            penalties.append(-1)
-            penalties_info.append(f"Fila {i+1}: sin oferta")
+    penalties = [-1] * m
+    penalties_info = [f"Fila {i+1}: sin oferta" for i in range(m)]
+    
+    rows, min1_cols, min2_cols = two_smallest(active, axis=1)
+    if not min1_cols:
+        for i in rows:
+            penalties_info[i] = f"Fila {i+1}: sin celdas disponibles"
+    elif min2_cols is None:
+        for i, min_col in zip(rows, min1_cols):
+            min_cost = costs[i][min_col]
+            penalties[i] = min_cost
+            penalties_info[i] = f"Fila {i+1}: único costo X{i+1}{min_col+1}({min_cost})"
+    else:
+        # Los dos menores costos de cada fila
+        for i, min1_col, min2_col in zip(rows, min1_cols, min2_cols):
+            min1_cost = costs[i][min1_col]
+            min2_cost = costs[i][min2_col]
+            penalty = min2_cost - min1_cost
+            penalties[i] = penalty
+            penalties_info[i] = f"Fila {i+1}: min1=X{i+1}{min1_col+1}({min1_cost}), min2=X{i+1}{min2_col+1}({min2_cost}), penalización={penalty}"
     
     return penalties, penalties_info
 
 def _calculate_col_penalties_detailed(remaining_supply: List[int], remaining_demand: List[int],
-                                    costs: List[List[float]]) -> Tuple[List[float], List[str]]:
-    """Calcula penalizaciones por columna con información detallada"""
+                                    costs: List[List[float]], active) -> Tuple[List[float], List[str]]:
+    """Calcula penalizaciones por columna con información detallada (active: ver cost_scan.active_costs)"""
     n = len(remaining_demand)
-    penalties = []
-    penalties_info = []
-    
-    for j in range(n):
-        if remaining_demand[j] > 0:
-            # Obtener costos válidos de la columna
-            valid_costs = []
-            for i in range(len(remaining_supply)):
-                if remaining_supply[i] > 0 and costs[i][j] < float('inf'):
-                    valid_costs.append((costs[i][j], i))
-            
-            if len(valid_costs) >= 2:
-                # Ordenar por costo y tomar los dos menores
-                sorted_costs = sorted(valid_costs, key=lambda x: x[0])
-                min1_cost, min1_row = sorted_costs[0]
-                min2_cost, min2_row = sorted_costs[1]
-                penalty = min2_cost - min1_cost
-                penalties.append(penalty)
-                penalties_info.append(f"Columna {j+1}: min1=X{min1_row+1}{j+1}({min1_cost}), min2=X{min2_row+1}{j+1}({min2_cost}), penalización={penalty}")
-            elif len(valid_costs) == 1:
-                min_cost, min_row = valid_costs[0]
-                penalties.append(min_cost)
-                penalties_info.append(f"Columna {j+1}: único costo X{min_row+1}{j+1}({min_cost})")
-            else:
-                penalties.append(-1)
-                penalties_info.append(f"Columna {j+1}: sin celdas disponibles")
-        else:
-            penalties.append(-1)
-            penalties_info.append(f"Columna {j+1}: sin demanda")
+    penalties = [-1] * n
+    penalties_info = [f"Columna {j+1}: sin demanda" for j in range(n)]
+    
+    cols, min1_rows, min2_rows = two_smallest(active, axis=0)
+    if not min1_rows:
+        for j in cols:
+            penalties_info[j] = f"Columna {j+1}: sin celdas disponibles"
+    elif min2_rows is None:
+        for j, min_row in zip(cols, min1_rows):
+            min_cost = costs[min_row][j]
+            penalties[j] = min_cost
+            penalties_info[j] = f"Columna {j+1}: único costo X{min_row+1}{j+1}({min_cost})"
+    else:
+        # Los dos menores costos de cada columna
+        for j, min1_row, min2_row in zip(cols, min1_rows, min2_rows):
+            min1_cost = costs[min1_row][j]
+            min2_cost = costs[min2_row][j]
+            penalty = min2_cost - min1_cost
+            penalties[j] = penalty
+            penalties_info[j] = f"Columna {j+1}: min1=X{min1_row+1}{j+1}({min1_cost}), min2=X{min2_row+1}{j+1}({min2_cost}), penalización={penalty}"
     
     return penalties, penalties_info
 
@@ -413,22 +432,26 @@ def _calculate_col_penalties_detailed(remaining_supply: List[int], remaining_dem
 
 
 def _generate_alternative_solutions_from_ties(supply, demand, costs, balance_info, all_ties):
-    """Genera soluciones alternativas REALES forzando elecciones diferentes"""
+    """
+    Genera soluciones alternativas REALES forzando elecciones diferentes.
+    Retorna también la vista de cada alternativa, en el mismo orden.
+    """
     alternative_solutions = []
+    alternative_views = []
     if not all_ties:
-        return []
+        return [], []
 
-    print(f"Analizando {len(all_ties)} empates para generar alternativas...")
+    logger.debug("Analizando %d empates para generar alternativas...", len(all_ties))
     
     # Obtener solución principal para comparación
     main_solution = _get_main_solution_from_ties(supply, demand, costs, balance_info)
     
     for tie in all_ties:
         if tie['type'] in ('penalty_tie', 'min_cost_tie') and len(tie['ties']) > 1:
-            print(f"Procesando empate: {tie['description']}")
+            logger.debug("Procesando empate: %s", tie['description'])
             
             for alt_choice in tie['ties'][1:]:  # Probar todas las alternativas excepto la primera
-                print(f"  Probando alternativa: {alt_choice}")
+                logger.debug("  Probando alternativa: %s", alt_choice)
                 
                 # Resolver forzando la elección alternativa
                 alt_result = _solve_with_forced_choice(
@@ -445,17 +468,18 @@ def _generate_alternative_solutions_from_ties(supply, demand, costs, balance_inf
                     
                     if is_different:
                         # Analizar la solución alternativa
-                        analysis = analyze_solution(supply, demand, costs, alt_result['solution_matrix'], balance_info)
+                        alt_view = build_solution_view(alt_result['solution_matrix'], costs, balance_info)
+                        analysis = analyze_solution(supply, demand, costs, alt_result['solution_matrix'], balance_info, view=alt_view)
                         
                         # Corregir degeneración si es necesario
                         fixed_solution, degenerated_cells = fix_degeneration(
-                            alt_result['solution_matrix'], supply, demand, costs, balance_info
+                            alt_result['solution_matrix'], supply, demand, costs, balance_info, view=alt_view
                         )
                         
                         # Generar summary
                         alt_summary = generate_transport_summary(
                             supply, demand, costs, fixed_solution, 
-                            balance_info, "vogel", degenerated_cells
+                            balance_info, "vogel", degenerated_cells, view=alt_view
                         )
 
                         tie_break_reason = (
@@ -484,51 +508,50 @@ def _generate_alternative_solutions_from_ties(supply, demand, costs, balance_inf
                         }
                         
                         alternative_solutions.append(alternative_solution)
-                        print(f"  ✅ Alternativa encontrada con costo: {alt_result['total_cost']}")
+                        alternative_views.append(alt_view)
+                        logger.debug("  Alternativa encontrada con costo: %s", alt_result['total_cost'])
                     else:
-                        print(f"  ❌ Alternativa idéntica a la principal")
+                        logger.debug("  Alternativa idéntica a la principal")
                 else:
-                    print(f"  ❌ No se pudo generar solución alternativa")
+                    logger.debug("  No se pudo generar solución alternativa")
 
-    print(f"Se generaron {len(alternative_solutions)} soluciones alternativas")
-    return alternative_solutions
+    logger.debug("Se generaron %d soluciones alternativas", len(alternative_solutions))
+    return alternative_solutions, alternative_views
 
 
 
-def _solve_with_forced_choice(supply, demand, costs, balance_info, target_step, tie, forced_choice):
+def _solve_with_forced_choice(supply, demand, costs, balance_info, target_step, tie, forced_choice,
+                              recorder=None):
     """Resuelve Vogel forzando una elección específica en el paso objetivo"""
     try:
         m, n = len(supply), len(demand)
+        ficticious = ficticious_mask(balance_info, m, n)
         solution = [[0] * n for _ in range(m)]
-        remaining_supply = supply.copy()
-        remaining_demand = demand.copy()
-        costs_copy = copy.deepcopy(costs)
+        remaining_supply = list(supply)
+        remaining_demand = list(demand)
         
         # Usar un diccionario mutable para el costo total
         state = {'total_cost': 0}
         step_count = 0
-        steps = []
+        if recorder is None:
+            recorder = StepRecorder()
         basic_vars = []
         
         # Paso inicial
-        steps.append({
-            'step_number': step_count,
-            'description': 'Inicio - Método de Aproximación de Vogel (Alternativa)',
-            'current_matrix': [row.copy() for row in solution],
-            'current_cost': state['total_cost'],
-            'explanation': f'Alternativa por empate: {tie["description"]}',
-            'basic_variables': basic_variables_to_dict_list(basic_vars),
-            'assignment': None
-        })
+        if recorder.enabled:
+            recorder.record(
+                step_count, 'Inicio - Método de Aproximación de Vogel (Alternativa)', solution, state['total_cost'],
+                f'Alternativa por empate: {tie["description"]}', basic_vars
+            )
         step_count += 1
         
         # Avanzar hasta el paso anterior al objetivo
         while (sum(remaining_supply) > 0 and sum(remaining_demand) > 0 and 
                step_count < target_step):
             assignment_made = _make_standard_vogel_assignment_with_steps(
-                remaining_supply, remaining_demand, costs_copy, 
-                solution, state, balance_info, costs,
-                steps, step_count, basic_vars
+                remaining_supply, remaining_demand,
+                solution, state, ficticious, costs,
+                recorder, step_count, basic_vars
             )
             if assignment_made:
                 step_count += 1
@@ -540,19 +563,20 @@ def _solve_with_forced_choice(supply, demand, costs, balance_info, target_step,
             if tie['type'] == 'penalty_tie':
                 if tie['direction'] == 'fila':
                     i = forced_choice
-                    available_cols = [j for j in range(n) if remaining_demand[j] > 0 and costs_copy[i][j] < float('inf')]
+                    # Una fila agotada no tiene celdas disponibles
+                    available_cols = [j for j in range(n) if remaining_demand[j] > 0] if remaining_supply[i] > 0 else []
                     if available_cols:
-                        min_cost = min([costs_copy[i][j] for j in available_cols])
-                        candidate_cols = [j for j in available_cols if costs_copy[i][j] == min_cost]
+                        min_cost = min([costs[i][j] for j in available_cols])
+                        candidate_cols = [j for j in available_cols if costs[i][j] == min_cost]
                         j = candidate_cols[0]
                     else:
                         return None
                 else:
                     j = forced_choice
-                    available_rows = [i for i in range(m) if remaining_supply[i] > 0 and costs_copy[i][j] < float('inf')]
+                    available_rows = [i for i in range(m) if remaining_supply[i] > 0] if remaining_demand[j] > 0 else []
                     if available_rows:
-                        min_cost = min([costs_copy[i][j] for i in available_rows])
-                        candidate_rows = [i for i in available_rows if costs_copy[i][j] == min_cost]
+                        min_cost = min([costs[i][j] for i in available_rows])
+                        candidate_rows = [i for i in available_rows if costs[i][j] == min_cost]
                         i = candidate_rows[0]
                     else:
                         return None
@@ -569,51 +593,33 @@ def _solve_with_forced_choice(supply, demand, costs, balance_info, target_step,
             x = min(remaining_supply[i], remaining_demand[j])
             solution[i][j] = x
             
-            if not _is_ficticious_cell(i, j, balance_info):
+            if not ficticious[i][j]:
                 state['total_cost'] += x * costs[i][j]
             
-            if x > 0 and not _is_ficticious_cell(i, j, balance_info):
-                basic_vars.append(BasicVariable(
-                    cell=f"X{i+1}{j+1}",
-                    value=x,
-                    cost=costs[i][j],
-                    i=i,
-                    j=j
-                ))
+            if x > 0 and not ficticious[i][j]:
+                basic_vars.append(BasicVariableRecord(i, j, x, costs[i][j]))
             
             # Registrar el paso forzado
-            step_description = f'Asignar {x} unidades en X{i+1}{j+1} (Alternativa forzada)'
-            step_explanation = f'Alternativa por empate: {tie["description"]}. Asignación: min({remaining_supply[i]}, {remaining_demand[j]}) = {x}'
-            
-            steps.append({
-                'step_number': step_count,
-                'description': step_description,
-                'current_matrix': [row.copy() for row in solution],
-                'current_cost': state['total_cost'],
-                'explanation': step_explanation,
-                'basic_variables': basic_variables_to_dict_list(basic_vars),
-                'assignment': f"X{i+1}{j+1}"
-            })
+            if recorder.enabled:
+                step_description = f'Asignar {x} unidades en X{i+1}{j+1} (Alternativa forzada)'
+                step_explanation = f'Alternativa por empate: {tie["description"]}. Asignación: min({remaining_supply[i]}, {remaining_demand[j]}) = {x}'
+                
+                recorder.record(
+                    step_count, step_description, solution, state['total_cost'],
+                    step_explanation, basic_vars, f"X{i+1}{j+1}"
+                )
             
             remaining_supply[i] -= x
             remaining_demand[j] -= x
             
-            # Actualizar matriz de costos
-            if remaining_supply[i] == 0:
-                for col in range(n):
-                    costs_copy[i][col] = float('inf')
-            if remaining_demand[j] == 0:
-                for row in range(m):
-                    costs_copy[row][j] = float('inf')
-            
             step_count += 1
             
             # Continuar con el resto normalmente
             while sum(remaining_supply) > 0 and sum(remaining_demand) > 0:
                 assignment_made = _make_standard_vogel_assignment_with_steps(
-                    remaining_supply, remaining_demand, costs_copy, 
-                    solution, state, balance_info, costs,
-                    steps, step_count, basic_vars
+                    remaining_supply, remaining_demand,
+                    solution, state, ficticious, costs,
+                    recorder, step_count, basic_vars
                 )
                 if assignment_made:
                     step_count += 1
@@ -621,47 +627,40 @@ def _solve_with_forced_choice(supply, demand, costs, balance_info, target_step,
                     break
             
             # Paso final
-            steps.append({
-                'step_number': step_count,
-                'description': 'Solución final alternativa de Vogel',
-                'current_matrix': [row.copy() for row in solution],
-                'current_cost': state['total_cost'],
-                'explanation': f'Solución alternativa obtenida. Costo total: {state["total_cost"]}',
-                'basic_variables': basic_variables_to_dict_list(basic_vars),
-                'assignment': None
-            })
+            if recorder.enabled:
+                recorder.record(
+                    step_count, 'Solución final alternativa de Vogel', solution, state['total_cost'],
+                    f'Solución alternativa obtenida. Costo total: {state["total_cost"]}', basic_vars
+                )
             
             # Recalcular el costo final para asegurar consistencia
             final_cost = 0
             for i in range(m):
                 for j in range(n):
-                    if solution[i][j] > 0 and not _is_ficticious_cell(i, j, balance_info):
+                    if solution[i][j] > 0 and not ficticious[i][j]:
                         final_cost += solution[i][j] * costs[i][j]
             
             return {
                 'solution_matrix': solution,
                 'total_cost': final_cost,
-                'steps': steps,
+                'steps': recorder.steps,
                 'basic_variables': basic_vars
             }
         
         return None
         
     except Exception as e:
-        print(f"Error en solución forzada: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error en solución forzada: %s", e)
         return None
 
-def _make_standard_vogel_assignment_with_steps(remaining_supply, remaining_demand, costs_copy, 
-                                             solution, state, balance_info, original_costs,
-                                             steps, step_count, basic_vars):
-    """Realiza una asignación estándar de Vogel con registro de pasos"""
-    m, n = len(remaining_supply), len(remaining_demand)
-    
+def _make_standard_vogel_assignment_with_steps(remaining_supply, remaining_demand,
+                                             solution, state, ficticious, costs,
+                                             recorder, step_count, basic_vars):
+    """Realiza una asignación estándar de Vogel enviando el paso a recorder"""
     # Calcular penalizaciones básicas
-    row_penalties = _calculate_simple_row_penalties(remaining_supply, remaining_demand, costs_copy)
-    col_penalties = _calculate_simple_col_penalties(remaining_supply, remaining_demand, costs_copy)
+    active = active_costs(costs, remaining_supply, remaining_demand)
+    row_penalties = _calculate_simple_row_penalties(remaining_supply, remaining_demand, costs, active)
+    col_penalties = _calculate_simple_col_penalties(remaining_supply, remaining_demand, costs, active)
     
     max_row_pen = max([p for p in row_penalties if p >= 0], default=-1)
     max_col_pen = max([p for p in col_penalties if p >= 0], default=-1)
@@ -676,12 +675,9 @@ def _make_standard_vogel_assignment_with_steps(remaining_supply, remaining_deman
         if not row_ties:
             return False
         i = row_ties[0]
-        available_cols = [j for j in range(n) if remaining_demand[j] > 0 and costs_copy[i][j] < float('inf')]
-        if not available_cols:
+        if not len(active[1]):
             return False
-        min_cost = min([costs_copy[i][j] for j in available_cols])
-        candidate_cols = [j for j in available_cols if costs_copy[i][j] == min_cost]
-        j = candidate_cols[0]
+        j = line_min_positions(active, i, axis=1)[0]
         direction = "fila"
         penalty_value = max_row_pen
     else:
@@ -689,97 +685,63 @@ def _make_standard_vogel_assignment_with_steps(remaining_supply, remaining_deman
         if not col_ties:
             return False
         j = col_ties[0]
-        available_rows = [i for i in range(m) if remaining_supply[i] > 0 and costs_copy[i][j] < float('inf')]
-        if not available_rows:
+        if not len(active[0]):
             return False
-        min_cost = min([costs_copy[i][j] for i in available_rows])
-        candidate_rows = [i for i in available_rows if costs_copy[i][j] == min_cost]
-        i = candidate_rows[0]
+        i = line_min_positions(active, j, axis=0)[0]
         direction = "columna"
         penalty_value = max_col_pen
     
     x = min(remaining_supply[i], remaining_demand[j])
     solution[i][j] = x
     
-    if not _is_ficticious_cell(i, j, balance_info):
-        state['total_cost'] += x * original_costs[i][j]
+    if not ficticious[i][j]:
+        state['total_cost'] += x * costs[i][j]
     
-    if x > 0 and not _is_ficticious_cell(i, j, balance_info):
-        basic_vars.append(BasicVariable(
-            cell=f"X{i+1}{j+1}",
-            value=x,
-            cost=original_costs[i][j],
-            i=i,
-            j=j
-        ))
+    if x > 0 and not ficticious[i][j]:
+        basic_vars.append(BasicVariableRecord(i, j, x, costs[i][j]))
     
     # Registrar el paso
-    step_description = f'Asignar {x} unidades en X{i+1}{j+1}'
-    step_explanation = f'Penalización máxima: {penalty_value} ({direction}). Asignación: min({remaining_supply[i]}, {remaining_demand[j]}) = {x}'
-    
-    steps.append({
-        'step_number': step_count,
-        'description': step_description,
-        'current_matrix': [row.copy() for row in solution],
-        'current_cost': state['total_cost'],
-        'explanation': step_explanation,
-        'basic_variables': basic_variables_to_dict_list(basic_vars),
-        'assignment': f"X{i+1}{j+1}"
-    })
+    if recorder.enabled:
+        step_description = f'Asignar {x} unidades en X{i+1}{j+1}'
+        step_explanation = f'Penalización máxima: {penalty_value} ({direction}). Asignación: min({remaining_supply[i]}, {remaining_demand[j]}) = {x}'
+        
+        recorder.record(
+            step_count, step_description, solution, state['total_cost'],
+            step_explanation, basic_vars, f"X{i+1}{j+1}"
+        )
     
     remaining_supply[i] -= x
     remaining_demand[j] -= x
     
-    if remaining_supply[i] == 0:
-        for col in range(n):
-            costs_copy[i][col] = float('inf')
-    if remaining_demand[j] == 0:
-        for row in range(m):
-            costs_copy[row][j] = float('inf')
-    
     return True
 
 
-def _calculate_simple_row_penalties(remaining_supply, remaining_demand, costs):
-    """Calcula penalizaciones simples por fila"""
-    m = len(remaining_supply)
-    penalties = []
-    
-    for i in range(m):
-        if remaining_supply[i] > 0:
-            valid_costs = [costs[i][j] for j in range(len(remaining_demand)) 
-                          if remaining_demand[j] > 0 and costs[i][j] < float('inf')]
-            if len(valid_costs) >= 2:
-                sorted_costs = sorted(valid_costs)
-                penalties.append(sorted_costs[1] - sorted_costs[0])
-            elif len(valid_costs) == 1:
-                penalties.append(valid_costs[0])
-            else:
-                penalties.append(-1)
-        else:
-            penalties.append(-1)
+def _calculate_simple_row_penalties(remaining_supply, remaining_demand, costs, active):
+    """Calcula penalizaciones simples por fila (active: ver cost_scan.active_costs)"""
+    penalties = [-1] * len(remaining_supply)
+    
+    rows, min1_cols, min2_cols = two_smallest(active, axis=1)
+    if min2_cols is not None:
+        for i, min1_col, min2_col in zip(rows, min1_cols, min2_cols):
+            penalties[i] = costs[i][min2_col] - costs[i][min1_col]
+    else:
+        for i, min_col in zip(rows, min1_cols):
+            penalties[i] = costs[i][min_col]
     
     return penalties
 
 
-def _calculate_simple_col_penalties(remaining_supply, remaining_demand, costs):
-    """Calcula penalizaciones simples por columna"""
-    n = len(remaining_demand)
-    penalties = []
-    
-    for j in range(n):
-        if remaining_demand[j] > 0:
-            valid_costs = [costs[i][j] for i in range(len(remaining_supply)) 
-                          if remaining_supply[i] > 0 and costs[i][j] < float('inf')]
-            if len(valid_costs) >= 2:
-                sorted_costs = sorted(valid_costs)
-                penalties.append(sorted_costs[1] - sorted_costs[0])
-            elif len(valid_costs) == 1:
-                penalties.append(valid_costs[0])
-            else:
-                penalties.append(-1)
-        else:
-            penalties.append(-1)
+def _calculate_simple_col_penalties(remaining_supply, remaining_demand, costs, active):
+    """Calcula penalizaciones simples por columna (active: ver cost_scan.active_costs)"""
+    penalties = [-1] * len(remaining_demand)
+    
+    cols, min1_rows, min2_rows = two_smallest(active, axis=0)
+    if min2_rows is not None:
+        for j, min1_row, min2_row in zip(cols, min1_rows, min2_rows):
+            penalties[j] = costs[min2_row][j] - costs[min1_row][j]
+    else:
+        for j, min_row in zip(cols, min1_rows):
+            penalties[j] = costs[min_row][j]
     
     return penalties
 
@@ -797,21 +759,10 @@ def _is_solution_different(sol1, sol2):
 def _get_main_solution_from_ties(supply, demand, costs, balance_info):
     """Obtiene la solución principal para comparación"""
     main_solution, _, _, _, _ = _solve_vogel_with_explicit_tie_detection(
-        supply, demand, costs, balance_info
+        supply, demand, costs, balance_info, recorder=NullStepRecorder(), detect_ties=False
     )
     return main_solution
 
-def _is_ficticious_cell(i: int, j: int, balance_info: dict) -> bool:
-    """Verifica si una celda es ficticia"""
-    if not balance_info.get("balanced", False):
-        return False
-    
-    if balance_info.get("ficticious_row") == i:
-        return True
-    if balance_info.get("ficticious_col") == j:
-        return True
-    
-    return False
 
 
 # def _generate_alternative_solutions_from_ties(supply, demand, costs, balance_info, all_ties):
@@ -0,0 +1,225 @@
+# benchmarks/compare.py
+"""
+Compara el rendimiento actual contra una línea base guardada en el repositorio.
+
+Uso (desde backend/):
+    python -m benchmarks.compare                       # usa benchmarks/baseline.json
+    python -m benchmarks.compare --threshold 0.3 --report actual.json
+    python -m benchmarks.compare --update              # regenera la línea base
+
+Repite la suite con la configuración de la línea base (mismas instancias,
+semilla, repeticiones y calentamiento) y marca como regresión todo caso o fase
+cuyo tiempo mínimo de las repeticiones o memoria pico empeore más que el umbral.
+El mínimo es la medida menos afectada por la carga de la máquina (el ruido solo
+suma tiempo); la mediana queda en el reporte como referencia. Antes de
+comparar, los tiempos de la línea base se escalan por la razón entre la carga de
+referencia medida junto a cada caso ahora y al generarla (reference_ms), para
+que una máquina más lenta en ese momento no cuente como regresión. Los casos
+marcados se vuelven a medir (--confirm) y solo se reportan si la regresión se
+mantiene, para no fallar por ruido de la máquina. Termina con código 1 si hay
+regresiones. Las líneas base dependen de la máquina: se deben
+regenerar con --update en la misma máquina donde se compara.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.generator import generate_instance
+from benchmarks.run_benchmarks import METHODS, run_suite, time_solver
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Configuración de la línea base: rápida de correr y suficiente para detectar cambios de orden
+BASELINE_CONFIG = {
+    'methods': ["northwest", "vogel", "min_cost"],
+    'kinds': ["random", "ties", "degenerate", "unbalanced_supply", "unbalanced_demand", "assignment"],
+    'sizes': [5, 10, 20, 50],
+    'details': ["minimal", "standard", "full"],
+    'max_size_by_detail': {"full": 10},
+    'repeats': 5,
+    'warmup': 1
+}
+
+# Diferencias absolutas por debajo de estos pisos se consideran ruido: en los casos
+# chicos (menos de 1 ms) una pausa del recolector o del sistema ya duplica el tiempo
+MIN_DELTA_MS = 1.0
+MIN_DELTA_BYTES = 4096
+
+
+def _case_key(case: Dict[str, Any]) -> Tuple:
+    return case['method'], case['kind'], case['detail'], case['m'], case['n']
+
+
+def _case_label(key: Tuple) -> str:
+    return "/".join(str(part) for part in key[:3]) + f" {key[3]}x{key[4]}"
+
+
+def _phase_times(case: Dict[str, Any]) -> Dict[str, float]:
+    """Mínimo por fase (las líneas base anteriores solo tienen la mediana)"""
+    return case.get('phases_min_ms') or case.get('phases_ms', {})
+
+
+def _machine_factor(base: Dict[str, Any], case: Dict[str, Any]) -> float:
+    """Cuánto más lenta está la máquina que al medir la línea base (1 sin referencia)"""
+    if base.get('reference_ms') and case.get('reference_ms'):
+        return case['reference_ms'] / base['reference_ms']
+    return 1.0
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any],
+                    time_threshold: float = 0.25, memory_threshold: float = 0.10) -> Dict[str, Any]:
+    """
+    Compara dos reportes de run_benchmarks caso por caso; los tiempos de la
+    línea base se reportan ya escalados a la velocidad actual de la máquina.
+    Retorna las regresiones, las mejoras y los casos que faltan en alguno de los dos.
+    """
+    baseline_cases = {_case_key(case): case for case in baseline['results']}
+    current_cases = {_case_key(case): case for case in current['results']}
+
+    regressions = []
+    improvements = []
+    for key, base in baseline_cases.items():
+        case = current_cases.get(key)
+        if case is None:
+            continue
+        label = _case_label(key)
+        factor = _machine_factor(base, case)
+
+        metrics = [('wall_ms', round(base['wall_ms']['min'] * factor, 3), case['wall_ms']['min'],
+                    time_threshold, MIN_DELTA_MS)]
+        base_phases, case_phases = _phase_times(base), _phase_times(case)
+        for phase, base_ms in base_phases.items():
+            if phase in case_phases:
+                metrics.append((f"phase:{phase}", round(base_ms * factor, 3), case_phases[phase],
+                                time_threshold, MIN_DELTA_MS))
+        if 'peak_memory_bytes' in base and 'peak_memory_bytes' in case:
+            metrics.append(('peak_memory_bytes', base['peak_memory_bytes'], case['peak_memory_bytes'],
+                            memory_threshold, MIN_DELTA_BYTES))
+
+        for metric, before, after, threshold, min_delta in metrics:
+            delta = after - before
+            ratio = after / before if before else float("inf")
+            entry = {'case': label, 'key': key, 'metric': metric, 'baseline': before,
+                     'current': after, 'ratio': round(ratio, 3)}
+            if delta > min_delta and ratio > 1 + threshold:
+                regressions.append(entry)
+            elif -delta > min_delta and ratio < 1 / (1 + threshold):
+                improvements.append(entry)
+
+    return {
+        'regressions': regressions,
+        'improvements': improvements,
+        'missing_in_current': sorted(" ".join(map(str, key)) for key in baseline_cases.keys() - current_cases.keys()),
+        'new_in_current': sorted(" ".join(map(str, key)) for key in current_cases.keys() - baseline_cases.keys())
+    }
+
+
+def rerun_from_baseline(baseline: Dict[str, Any], progress=None) -> Dict[str, Any]:
+    """Repite la suite con la misma configuración con la que se generó la línea base"""
+    meta = baseline['meta']
+    config = meta['config']
+    return run_suite(
+        config['methods'], config['kinds'], config['sizes'], config['details'],
+        repeats=meta['repeats'], warmup=meta['warmup'], seed=meta['seed'],
+        measure_memory=config.get('measure_memory', True),
+        max_size_by_detail=config['max_size_by_detail'],
+        time_budget_s=config['time_budget_s'],
+        progress=progress
+    )
+
+
+def confirm_regressions(baseline: Dict[str, Any], current: Dict[str, Any], comparison: Dict[str, Any],
+                        attempts: int = 3, time_threshold: float = 0.25,
+                        memory_threshold: float = 0.10) -> Dict[str, Any]:
+    """
+    Vuelve a medir los casos con regresiones, con el doble de repeticiones, y
+    conserva, por métrica, el menor tiempo observado. Solo los casos que siguen por encima del umbral se reportan.
+    """
+    meta = baseline['meta']
+    flagged = {tuple(entry['key']) for entry in comparison['regressions']}
+    cases = {_case_key(case): case for case in current['results']}
+
+    for _ in range(attempts):
+        if not flagged:
+            break
+        for key in flagged:
+            method, kind, detail, m, n = key
+            instance = generate_instance(kind, m, n, meta['seed'])
+            timing = time_solver(METHODS[method], instance, detail, meta['repeats'] * 2, meta['warmup'])
+            case = cases[key]
+            case['wall_ms']['min'] = min(case['wall_ms']['min'], timing['wall_ms']['min'])
+            case['reference_ms'] = min(case.get('reference_ms', timing['reference_ms']), timing['reference_ms'])
+            phases = case.setdefault('phases_min_ms', {})
+            for phase, fastest in timing['phases_min_ms'].items():
+                phases[phase] = min(phases.get(phase, fastest), fastest)
+        comparison = compare_reports(baseline, current, time_threshold, memory_threshold)
+        flagged = {tuple(entry['key']) for entry in comparison['regressions']}
+    return comparison
+
+
+def _print_entries(title: str, entries: List[Dict[str, Any]]) -> None:
+    if not entries:
+        return
+    print(f"\n{title} ({len(entries)}):")
+    for entry in sorted(entries, key=lambda entry: -entry['ratio']):
+        print(f"  {entry['case']:45} {entry['metric']:28} {entry['baseline']:>12} -> {entry['current']:>12}"
+              f"  x{entry['ratio']}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compara el rendimiento contra la línea base")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Aumento relativo de tiempo tolerado (0.25 = 25%%)")
+    parser.add_argument("--memory-threshold", type=float, default=0.10,
+                        help="Aumento relativo de memoria pico tolerado")
+    parser.add_argument("--confirm", type=int, default=3,
+                        help="Veces que se vuelven a medir los casos con regresiones antes de reportarlos")
+    parser.add_argument("--report", help="Guardar el reporte de la corrida actual en este archivo")
+    parser.add_argument("--update", action="store_true", help="Regenerar la línea base y salir")
+    parser.add_argument("--quiet", action="store_true", help="No mostrar el progreso")
+    args = parser.parse_args(argv)
+
+    progress = None if args.quiet else (lambda line: print(line, file=sys.stderr, flush=True))
+
+    if args.update:
+        config = BASELINE_CONFIG
+        report = run_suite(
+            config['methods'], config['kinds'], config['sizes'], config['details'],
+            repeats=config['repeats'], warmup=config['warmup'],
+            max_size_by_detail=config['max_size_by_detail'], progress=progress
+        )
+        with open(args.baseline, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2, ensure_ascii=False)
+            output.write("\n")
+        print(f"Línea base guardada en {args.baseline} ({len(report['results'])} casos)")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+
+    current = rerun_from_baseline(baseline, progress)
+    comparison = compare_reports(baseline, current, args.threshold, args.memory_threshold)
+    comparison = confirm_regressions(baseline, current, comparison, args.confirm,
+                                     args.threshold, args.memory_threshold)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as output:
+            json.dump(current, output, indent=2, ensure_ascii=False)
+            output.write("\n")
+
+    _print_entries("Regresiones", comparison['regressions'])
+    _print_entries("Mejoras", comparison['improvements'])
+    if comparison['missing_in_current']:
+        print(f"\nCasos de la línea base que no se ejecutaron: {len(comparison['missing_in_current'])}")
+
+    if comparison['regressions']:
+        print(f"\nFALLA: {len(comparison['regressions'])} regresiones por encima del umbral")
+        return 1
+    print("\nOK: sin regresiones por encima del umbral")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+# benchmarks/generator.py
+import random
+from typing import Dict, List
+
+# Familias de instancias que genera el banco de pruebas
+INSTANCE_KINDS = (
+    "random",             # costos uniformes, problema balanceado
+    "ties",               # pocos valores de costo distintos: muchos empates
+    "degenerate",         # sumas parciales de oferta y demanda que coinciden
+    "unbalanced_supply",  # oferta total mayor que la demanda (columna ficticia)
+    "unbalanced_demand",  # demanda total mayor que la oferta (fila ficticia)
+    "assignment",         # oferta y demanda unitarias (problema de asignación)
+)
+
+
+def generate_instance(kind: str, m: int, n: int, seed: int = 0) -> Dict[str, List]:
+    """
+    Genera una instancia reproducible {'supply', 'demand', 'costs'} de tamaño m x n.
+    La misma combinación (kind, m, n, seed) produce siempre la misma instancia.
+    """
+    if kind not in INSTANCE_KINDS:
+        raise ValueError(f"Tipo de instancia desconocido: {kind}")
+    rng = random.Random(f"{kind}|{m}|{n}|{seed}")
+
+    if kind == "assignment":
+        # La asignación es cuadrada: se usa el menor de los dos lados
+        size = min(m, n)
+        return {
+            'supply': [1] * size,
+            'demand': [1] * size,
+            'costs': _random_costs(rng, size, size, 1, 100)
+        }
+
+    supply = [rng.randint(10, 100) for _ in range(m)]
+    total = sum(supply)
+
+    if kind == "degenerate":
+        demand = _coinciding_split(rng, supply, n)
+    else:
+        demand = _random_split(rng, total, n)
+
+    if kind == "unbalanced_supply":
+        supply = [value + rng.randint(1, max(1, value // 4)) for value in supply]
+    elif kind == "unbalanced_demand":
+        demand = [value + rng.randint(1, max(1, value // 4)) for value in demand]
+
+    if kind == "ties":
+        costs = _random_costs(rng, m, n, 1, 4)
+    else:
+        costs = _random_costs(rng, m, n, 1, 100)
+
+    return {'supply': supply, 'demand': demand, 'costs': costs}
+
+
+def _random_costs(rng: random.Random, m: int, n: int, low: int, high: int) -> List[List[int]]:
+    return [[rng.randint(low, high) for _ in range(n)] for _ in range(m)]
+
+
+def _random_split(rng: random.Random, total: int, parts: int) -> List[int]:
+    """Divide total en `parts` enteros positivos al azar"""
+    if parts > total:
+        raise ValueError("No se puede dividir el total en tantas partes positivas")
+    cuts = sorted(rng.sample(range(1, total), parts - 1))
+    return [b - a for a, b in zip([0] + cuts, cuts + [total])]
+
+
+def _coinciding_split(rng: random.Random, supply: List[int], parts: int) -> List[int]:
+    """
+    Divide la oferta total en `parts` demandas cuyas sumas acumuladas coinciden
+    con la mitad de los cortes posibles de la oferta: la esquina noroeste agota
+    fila y columna a la vez y la solución queda degenerada.
+    """
+    total = sum(supply)
+    supply_cuts = []
+    running = 0
+    for value in supply[:-1]:
+        running += value
+        supply_cuts.append(running)
+
+    shared = rng.sample(supply_cuts, min(len(supply_cuts), parts - 1) // 2)
+    shared_set = set(shared)
+    others = [cut for cut in range(1, total) if cut not in shared_set]
+    cuts = sorted(shared + rng.sample(others, parts - 1 - len(shared)))
+    return [b - a for a, b in zip([0] + cuts, cuts + [total])]
@@ -0,0 +1,233 @@
+# benchmarks/load_test.py
+"""
+Prueba de carga de punta a punta de la API, dentro del mismo proceso.
+
+Uso (desde backend/):
+    python -m benchmarks.load_test --concurrency 8 --requests 500
+    python -m benchmarks.load_test --duration 30 --mix create=1 list=2 solve=6 executions=1 --output carga.json
+
+La aplicación de FastAPI se ejecuta a través de un transporte ASGI (sin red ni
+servidor) y con una base SQLite temporal en lugar de Postgres, de modo que se
+mide toda la pila: validación, algoritmos, caché y persistencia.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.generator import INSTANCE_KINDS, generate_instance
+
+DEFAULT_MIX = {"create": 1, "list": 2, "solve": 6, "executions": 1}
+METHODS = ("northwest", "vogel", "min_cost")
+DETAILS = ("minimal", "standard", "full")
+
+
+def load_app(database_url: str):
+    """
+    Importa la aplicación apuntando a database_url.
+    Debe llamarse antes de cualquier otro import de main o config.db_conexion.
+    """
+    os.environ["DATABASE_URL"] = database_url
+    # Los logs por petición irían a la salida estándar junto con el reporte
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    import main
+    return main.app
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class LoadTest:
+    """Genera la carga mixta y acumula latencias y errores por endpoint"""
+
+    def __init__(self, client, mix: Dict[str, int], seed: int = 0,
+                 sizes: List[int] = (4, 6, 8), details: List[str] = ("minimal", "standard")):
+        self.client = client
+        self.mix = mix
+        self.rng = random.Random(seed)
+        self.sizes = list(sizes)
+        self.details = list(details)
+        self.problem_ids: List[int] = []
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, Dict[str, int]] = {}
+        self._instance_counter = 0
+
+    def _next_instance(self) -> Dict[str, Any]:
+        self._instance_counter += 1
+        kind = self.rng.choice(INSTANCE_KINDS)
+        size = self.rng.choice(self.sizes)
+        instance = generate_instance(kind, size, size, seed=self._instance_counter)
+        return {'name': f"carga-{kind}-{self._instance_counter}", **instance}
+
+    async def _request(self, endpoint: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            status = str(response.status_code)
+        except Exception as error:  # errores de la aplicación que no llegan a ser respuesta HTTP
+            response = None
+            status = type(error).__name__
+        self.samples.setdefault(endpoint, []).append((time.perf_counter() - start) * 1000)
+        if response is None or response.status_code >= 400:
+            endpoint_errors = self.errors.setdefault(endpoint, {})
+            endpoint_errors[status] = endpoint_errors.get(status, 0) + 1
+        return response
+
+    async def create(self) -> None:
+        response = await self._request("create", "POST", "/problems/", json=self._next_instance())
+        if response is not None and response.status_code == 200:
+            self.problem_ids.append(response.json()['id'])
+
+    async def list(self) -> None:
+        await self._request("list", "GET", "/problems/")
+
+    async def solve(self) -> None:
+        if not self.problem_ids:
+            return await self.create()
+        problem_id = self.rng.choice(self.problem_ids)
+        body = {'method': self.rng.choice(METHODS), 'detail': self.rng.choice(self.details)}
+        await self._request("solve", "POST", f"/problems/{problem_id}/solve", json=body)
+
+    async def executions(self) -> None:
+        if not self.problem_ids:
+            return await self.create()
+        problem_id = self.rng.choice(self.problem_ids)
+        await self._request("executions", "GET", f"/problems/{problem_id}/executions")
+
+    def _pick_operation(self):
+        operations = list(self.mix)
+        return getattr(self, self.rng.choices(operations, weights=[self.mix[op] for op in operations])[0])
+
+    async def run(self, concurrency: int, total_requests: Optional[int] = None,
+                  duration_s: Optional[float] = None, initial_problems: int = 10) -> Dict[str, Any]:
+        for _ in range(initial_problems):
+            await self.create()
+        self.samples.clear()
+        self.errors.clear()
+
+        remaining = [total_requests]
+        deadline = time.perf_counter() + duration_s if duration_s else None
+
+        async def worker():
+            while True:
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return
+                if remaining[0] is not None:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+                await self._pick_operation()()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        return self.report(elapsed, concurrency)
+
+    def report(self, elapsed_s: float, concurrency: int) -> Dict[str, Any]:
+        endpoints = {}
+        total = 0
+        total_errors = 0
+        for endpoint, latencies in sorted(self.samples.items()):
+            latencies = sorted(latencies)
+            errors = sum(self.errors.get(endpoint, {}).values())
+            total += len(latencies)
+            total_errors += errors
+            endpoints[endpoint] = {
+                'requests': len(latencies),
+                'errors': errors,
+                'error_rate': round(errors / len(latencies), 4),
+                'error_statuses': self.errors.get(endpoint, {}),
+                'p50_ms': round(percentile(latencies, 0.50), 3),
+                'p95_ms': round(percentile(latencies, 0.95), 3),
+                'p99_ms': round(percentile(latencies, 0.99), 3),
+                'max_ms': round(latencies[-1], 3),
+                'throughput_rps': round(len(latencies) / elapsed_s, 2)
+            }
+        return {
+            'concurrency': concurrency,
+            'elapsed_s': round(elapsed_s, 3),
+            'requests': total,
+            'errors': total_errors,
+            'error_rate': round(total_errors / total, 4) if total else 0.0,
+            'throughput_rps': round(total / elapsed_s, 2) if elapsed_s else 0.0,
+            'endpoints': endpoints
+        }
+
+
+def _parse_mix(items: List[str]) -> Dict[str, int]:
+    mix = {}
+    for item in items:
+        name, _, weight = item.partition("=")
+        if name not in DEFAULT_MIX or not weight.isdigit():
+            raise argparse.ArgumentTypeError(f"Mezcla inválida: {item} (use create|list|solve|executions=peso)")
+        mix[name] = int(weight)
+    return mix
+
+
+async def run_load_test(args) -> Dict[str, Any]:
+    import httpx
+
+    app = load_app(args.database_url)
+    transport = httpx.ASGITransport(app=app)
+    # ASGITransport no envía los eventos de arranque y apagado: se ejecuta el lifespan
+    # a mano para que el pool de resolución y los engines se cierren al terminar
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://carga") as client:
+            load = LoadTest(client, _parse_mix(args.mix) if args.mix else DEFAULT_MIX, seed=args.seed,
+                            sizes=args.sizes, details=args.details)
+            return await load.run(args.concurrency, args.requests, args.duration, args.initial_problems)
+
+
+def _print_summary(report: Dict[str, Any]) -> None:
+    print(f"{report['requests']} peticiones en {report['elapsed_s']} s "
+          f"({report['throughput_rps']} req/s, concurrencia {report['concurrency']}, "
+          f"errores {report['error_rate']:.2%})", file=sys.stderr)
+    for endpoint, stats in report['endpoints'].items():
+        print(f"  {endpoint:11} n={stats['requests']:<6} p50={stats['p50_ms']:>9.3f} ms  "
+              f"p95={stats['p95_ms']:>9.3f} ms  p99={stats['p99_ms']:>9.3f} ms  "
+              f"errores={stats['error_rate']:.2%}", file=sys.stderr)
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API con SQLite en proceso")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=None, help="Total de peticiones (por defecto 500)")
+    parser.add_argument("--duration", type=float, default=None, help="Segundos de carga (en lugar de --requests)")
+    parser.add_argument("--mix", nargs="+", help="Pesos por operación, p. ej. create=1 list=2 solve=6 executions=1")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[4, 6, 8], help="Tamaños n de los problemas n x n")
+    parser.add_argument("--details", nargs="+", choices=DETAILS, default=["minimal", "standard"])
+    parser.add_argument("--initial-problems", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-url", help="Base de datos a usar (por defecto, SQLite temporal)")
+    parser.add_argument("--output", help="Archivo JSON de salida")
+    args = parser.parse_args(argv)
+    if args.requests is None and args.duration is None:
+        args.requests = 500
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if not args.database_url:
+            args.database_url = f"sqlite:///{os.path.join(tmp_dir, 'carga.db')}"
+        report = asyncio.run(run_load_test(args))
+
+    _print_summary(report)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+# benchmarks/run_benchmarks.py
+"""
+Banco de pruebas de rendimiento de los algoritmos de transporte.
+
+Uso (desde backend/):
+    python -m benchmarks.run_benchmarks --output resultados.json
+    python -m benchmarks.run_benchmarks --sizes 5 10 20 --kinds random ties --repeats 5
+
+Cada caso mide el tiempo total del método y el de cada fase (ver
+algorithms/phase_timer.py) con repeticiones y calentamiento, y la memoria
+pico en una corrida aparte con tracemalloc.
+"""
+import argparse
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import algorithms.northwest_corner as northwest
+import algorithms.vogel as vogel
+import algorithms.min_cost as min_cost
+from algorithms.phase_timer import PhaseTimer
+from benchmarks.generator import INSTANCE_KINDS, generate_instance
+
+METHODS: Dict[str, Callable] = {
+    "northwest": northwest.northwest_corner,
+    "vogel": vogel.vogel_approximation,
+    "min_cost": min_cost.min_cost_method
+}
+
+DEFAULT_SIZES = (5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+DEFAULT_DETAILS = ("minimal", "standard", "full")
+
+# La búsqueda de alternativas de "full" crece muy rápido: se limita el tamaño
+DEFAULT_MAX_SIZE_BY_DETAIL = {"minimal": 2000, "standard": 2000, "full": 20}
+
+# Si una corrida supera este tiempo, no se prueban tamaños mayores de esa combinación
+DEFAULT_TIME_BUDGET_S = 10.0
+
+# Carga fija de referencia, independiente del código medido: su tiempo junto a cada
+# caso indica qué tan rápida estaba la máquina en ese momento (ver benchmarks/compare.py)
+_REFERENCE_ROWS = [[(i * 31 + j * 17) % 97 for j in range(60)] for i in range(60)]
+
+
+def _reference_workload() -> int:
+    spread = 0
+    for _ in range(3):
+        for row in _REFERENCE_ROWS:
+            smallest = min(row)
+            for value in row:
+                if value - smallest > spread:
+                    spread = value - smallest
+    return spread
+
+
+def reference_ms(repeats: int = 5) -> float:
+    """Menor tiempo de la carga de referencia, en milisegundos"""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        _reference_workload()
+        samples.append((time.perf_counter_ns() - start) / 1e6)
+    return min(samples)
+
+
+def time_solver(solver: Callable, instance: Dict[str, List], detail: str,
+                repeats: int = 3, warmup: int = 1) -> Dict[str, Any]:
+    """
+    Ejecuta el método warmup + repeats veces y retorna las estadísticas de las repeticiones:
+    tiempo total (mediana, mínimo, máximo) y mediana y mínimo por fase, en milisegundos,
+    más el tiempo de la carga de referencia medido antes y después de las repeticiones.
+    """
+    for _ in range(warmup):
+        solver(instance['supply'], instance['demand'], instance['costs'], detail=detail)
+
+    reference = reference_ms()
+    wall_samples = []
+    phase_samples: Dict[str, List[float]] = {}
+    for _ in range(repeats):
+        timer = PhaseTimer()
+        start = time.perf_counter_ns()
+        solver(instance['supply'], instance['demand'], instance['costs'], detail=detail, timer=timer)
+        wall_samples.append((time.perf_counter_ns() - start) / 1e6)
+        for phase, timing in timer.as_dict().items():
+            phase_samples.setdefault(phase, []).append(timing['wall_ms'])
+    reference = min(reference, reference_ms())
+
+    return {
+        'wall_ms': {
+            'median': round(statistics.median(wall_samples), 3),
+            'min': round(min(wall_samples), 3),
+            'max': round(max(wall_samples), 3),
+            'samples': [round(sample, 3) for sample in wall_samples]
+        },
+        'phases_ms': {
+            phase: round(statistics.median(samples), 3)
+            for phase, samples in phase_samples.items()
+        },
+        'phases_min_ms': {
+            phase: round(min(samples), 3)
+            for phase, samples in phase_samples.items()
+        },
+        'reference_ms': round(reference, 4)
+    }
+
+
+def measure_peak_memory(solver: Callable, instance: Dict[str, List], detail: str) -> int:
+    """Memoria pico (bytes) asignada durante una corrida, medida con tracemalloc"""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        solver(instance['supply'], instance['demand'], instance['costs'], detail=detail)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_suite(methods: List[str], kinds: List[str], sizes: List[int], details: List[str],
+              repeats: int = 3, warmup: int = 1, seed: int = 0, measure_memory: bool = True,
+              max_size_by_detail: Optional[Dict[str, int]] = None,
+              time_budget_s: float = DEFAULT_TIME_BUDGET_S,
+              progress: Callable[[str], None] = None) -> Dict[str, Any]:
+    """Corre todas las combinaciones y retorna el documento de resultados (serializable a JSON)"""
+    max_size_by_detail = {**DEFAULT_MAX_SIZE_BY_DETAIL, **(max_size_by_detail or {})}
+    results = []
+    skipped = []
+
+    for method in methods:
+        solver = METHODS[method]
+        for kind in kinds:
+            for detail in details:
+                over_budget = False
+                for size in sorted(sizes):
+                    if size > max_size_by_detail.get(detail, max(sizes)):
+                        skipped.append({'method': method, 'kind': kind, 'detail': detail,
+                                        'size': size, 'reason': 'max_size'})
+                        continue
+                    if over_budget:
+                        skipped.append({'method': method, 'kind': kind, 'detail': detail,
+                                        'size': size, 'reason': 'time_budget'})
+                        continue
+
+                    instance = generate_instance(kind, size, size, seed)
+                    m, n = len(instance['supply']), len(instance['demand'])
+                    case = {'method': method, 'kind': kind, 'detail': detail, 'm': m, 'n': n}
+                    case.update(time_solver(solver, instance, detail, repeats, warmup))
+                    if measure_memory:
+                        case['peak_memory_bytes'] = measure_peak_memory(solver, instance, detail)
+                    results.append(case)
+
+                    if progress:
+                        progress(f"{method:9} {kind:17} {detail:8} {m}x{n}: "
+                                 f"{case['wall_ms']['median']:.3f} ms")
+                    if case['wall_ms']['max'] / 1000 > time_budget_s:
+                        over_budget = True
+
+    return {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'seed': seed,
+            'repeats': repeats,
+            'warmup': warmup,
+            # Configuración completa, para poder repetir la corrida (ver benchmarks/compare.py)
+            'config': {
+                'methods': list(methods),
+                'kinds': list(kinds),
+                'sizes': sorted(sizes),
+                'details': list(details),
+                'max_size_by_detail': max_size_by_detail,
+                'time_budget_s': time_budget_s,
+                'measure_memory': measure_memory
+            }
+        },
+        'results': results,
+        'scaling': scaling_curves(results),
+        'skipped': skipped
+    }
+
+
+def scaling_curves(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Agrupa los resultados por (método, tipo, detalle) y estima el exponente de
+    crecimiento del tiempo respecto de las celdas m·n (pendiente en escala log-log).
+    """
+    groups: Dict[tuple, List[tuple]] = {}
+    for case in results:
+        key = (case['method'], case['kind'], case['detail'])
+        groups.setdefault(key, []).append((case['m'] * case['n'], case['wall_ms']['median']))
+
+    curves = []
+    for (method, kind, detail), points in groups.items():
+        points.sort()
+        curves.append({
+            'method': method,
+            'kind': kind,
+            'detail': detail,
+            'points': [{'cells': cells, 'median_ms': median} for cells, median in points],
+            'exponent': _loglog_slope(points)
+        })
+    return curves
+
+
+def _loglog_slope(points: List[tuple]) -> Optional[float]:
+    """Pendiente por mínimos cuadrados de log(tiempo) contra log(celdas)"""
+    valid = [(math.log(cells), math.log(ms)) for cells, ms in points if cells > 0 and ms > 0]
+    if len(valid) < 2:
+        return None
+    mean_x = sum(x for x, _ in valid) / len(valid)
+    mean_y = sum(y for _, y in valid) / len(valid)
+    variance = sum((x - mean_x) ** 2 for x, _ in valid)
+    if variance == 0:
+        return None
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in valid)
+    return round(covariance / variance, 3)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Banco de pruebas de los métodos de transporte")
+    parser.add_argument("--methods", nargs="+", choices=list(METHODS), default=list(METHODS))
+    parser.add_argument("--kinds", nargs="+", choices=INSTANCE_KINDS, default=list(INSTANCE_KINDS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES),
+                        help="Tamaños n de las instancias n x n")
+    parser.add_argument("--details", nargs="+", choices=DEFAULT_DETAILS, default=list(DEFAULT_DETAILS))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-full-size", type=int, default=DEFAULT_MAX_SIZE_BY_DETAIL["full"],
+                        help="Tamaño máximo para el nivel de detalle full")
+    parser.add_argument("--time-budget", type=float, default=DEFAULT_TIME_BUDGET_S,
+                        help="Segundos por corrida a partir de los cuales no se prueban tamaños mayores")
+    parser.add_argument("--no-memory", action="store_true", help="No medir la memoria pico")
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto, la salida estándar)")
+    return parser
+
+
+def main(argv: List[str] = None) -> None:
+    args = build_parser().parse_args(argv)
+    report = run_suite(
+        args.methods, args.kinds, args.sizes, args.details,
+        repeats=args.repeats, warmup=args.warmup, seed=args.seed,
+        measure_memory=not args.no_memory,
+        max_size_by_detail={"full": args.max_full_size},
+        time_budget_s=args.time_budget,
+        progress=lambda line: print(line, file=sys.stderr, flush=True)
+    )
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -6,10 +8,79 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-DATABASE_URL = f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
+# DATABASE_URL reemplaza la conexión a Postgres. Puede indicar el driver síncrono o el
+# asíncrono (sqlite:///app.db o sqlite+aiosqlite:///app.db, postgresql://... o
+# postgresql+asyncpg://...): de la misma URL se crean los dos engines.
+DATABASE_URL = os.getenv("DATABASE_URL") or f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
 
-engine = create_engine(DATABASE_URL)
+# Pool de conexiones (por engine: el síncrono y el asíncrono tienen cada uno el suyo)
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Reciclar conexiones antes de que el servidor o un proxy las cierre por inactividad
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+
+# Driver de cada backend: (síncrono, asíncrono)
+DRIVERS = {
+    "postgresql": ("postgresql", "postgresql+asyncpg"),
+    "sqlite": ("sqlite", "sqlite+aiosqlite"),
+}
+
+
+def engine_urls(database_url: str):
+    """URL síncrona y asíncrona para la misma base de datos"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in DRIVERS:
+        raise ValueError(f"Base de datos no soportada: {backend}")
+    if backend == "sqlite" and url.database in (None, "", ":memory:"):
+        # Cada engine tendría su propia base vacía
+        raise ValueError("SQLite en memoria no se puede compartir entre los dos engines: use un archivo")
+    sync_driver, async_driver = DRIVERS[backend]
+    return url.set(drivername=sync_driver), url.set(drivername=async_driver)
+
+
+def engine_options(backend: str) -> dict:
+    """Opciones de create_engine según el backend"""
+    options = {
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+        "pool_pre_ping": POOL_PRE_PING,
+    }
+    if backend == "sqlite":
+        # SQLite solo permite usar una conexión desde el hilo que la creó, salvo que se desactive el chequeo
+        options["connect_args"] = {"check_same_thread": False}
+    return options
+
+
+def _enable_sqlite_wal(engine) -> None:
+    # WAL: las lecturas no esperan a las escrituras (los dos engines comparten el archivo)
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+
+sync_url, async_url = engine_urls(DATABASE_URL)
+
+# Engine síncrono: resolución (CPU), escritura diferida, exportaciones, migraciones y scripts
+engine = create_engine(sync_url, **engine_options(sync_url.get_backend_name()))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Engine asíncrono: endpoints que solo hacen I/O, sin ocupar hilos del threadpool
+async_engine = create_async_engine(async_url, **engine_options(async_url.get_backend_name()))
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False,
+                                       expire_on_commit=False)
+
+if sync_url.get_backend_name() == "sqlite":
+    _enable_sqlite_wal(engine)
+    _enable_sqlite_wal(async_engine.sync_engine)
+
 Base = declarative_base()
 
 def get_db():
@@ -17,4 +88,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
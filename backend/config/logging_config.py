@@ -0,0 +1,89 @@
+# config/logging_config.py
+import json
+import logging
+import os
+import random
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+
+# Identificador de la petición en curso, para correlacionar todas sus líneas de log
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+# Si la petición en curso fue elegida para conservar sus trazas DEBUG
+debug_sampled_var: ContextVar[bool] = ContextVar("debug_sampled", default=True)
+
+# Campos estándar de LogRecord que no se repiten como campos estructurados
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+
+class RequestContextFilter(logging.Filter):
+    """Agrega el request_id a cada registro y descarta las trazas DEBUG de peticiones no muestreadas"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        if record.levelno <= logging.DEBUG and not debug_sampled_var.get():
+            return False
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro; los argumentos de `extra` se agregan como campos"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging() -> None:
+    """
+    Configura el logging de la aplicación a partir de variables de entorno:
+    LOG_LEVEL (INFO por defecto), LOG_FORMAT ("json" o "text") y
+    LOG_DEBUG_SAMPLE_RATE (fracción de peticiones que conservan sus trazas DEBUG).
+    """
+    handler = logging.StreamHandler(sys.stdout)
+    handler.addFilter(RequestContextFilter())
+    if os.getenv("LOG_FORMAT", "json").lower() == "text":
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+    else:
+        handler.setFormatter(JsonFormatter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+
+def debug_sample_rate() -> float:
+    try:
+        return float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))
+    except ValueError:
+        return 1.0
+
+
+def bind_request(request_id: str = None, debug_sampled: bool = None) -> str:
+    """
+    Asigna el request_id del contexto actual y decide si sus trazas DEBUG se conservan
+    (debug_sampled fija la decisión ya tomada, p. ej. en un proceso del pool de resolución)
+    """
+    request_id = request_id or uuid.uuid4().hex
+    request_id_var.set(request_id)
+    if debug_sampled is None:
+        debug_sampled = random.random() < debug_sample_rate()
+    debug_sampled_var.set(debug_sampled)
+    return request_id
+
+
+def current_request_context() -> tuple:
+    """(request_id, debug_sampled) de la petición en curso, para pasarlos a otro proceso"""
+    return request_id_var.get(), debug_sampled_var.get()
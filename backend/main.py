@@ -1,22 +1,69 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, File, Form, HTTPException, Query, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+import base64
+import json
+import logging
 import time
-import algorithms.northwest_corner as northwest
-import algorithms.vogel as vogel
-import algorithms.min_cost as min_cost
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import List, Literal, Optional
 import algorithms.balance as balance
-from config.db_conexion import get_db, engine
-from models.mod_transport import Base, ModelTransportProblem, ModelProblemExecution
+from config.db_conexion import get_db, get_async_db, engine, async_engine
+from config.logging_config import setup_logging, bind_request, current_request_context
+from models.mod_transport import Base, ModelTransportProblem, ModelProblemExecution, ModelExecutionSteps
+from models.step_blob import decode_steps_json
+from models.schema_upgrade import upgrade_schema
 from schemas.schema_transport import *
+from services.solve_cache import solve_cache, make_cache_key, problem_content_hash
+from services.json_response import FastJSONResponse
+from services.admission import balanced_tie_profile, check_admission
+from services.problem_import import ProblemImporter
+from services.execution_export import MEDIA_TYPES, export_headers, format_available, stream_executions
+from services.solve_runner import SOLVERS, run_solve
+from services.solver_pool import SolverBusy, solver_pool
+from services.execution_writer import WRITE_BEHIND, execution_writer, build_execution, new_execution_uid
+from services.metrics import (
+    registry as metrics_registry, record_solve, record_admission, register_cache_metrics,
+    instrument_engine, register_writer_metrics, register_solver_pool_metrics, RESPONSE_SIZE
+)
+from algorithms.phase_timer import PhaseTimer
+
+setup_logging()
+logger = logging.getLogger(__name__)
 
 # Crear tablas
 Base.metadata.create_all(bind=engine)
+upgrade_schema(engine)
+
+# Métricas: tiempos de consultas SQL y estadísticas de la caché
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+register_cache_metrics(solve_cache)
+register_writer_metrics(execution_writer)
+register_solver_pool_metrics(solver_pool)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Escritura diferida de ejecuciones: se vacía la cola al apagar
+    if WRITE_BEHIND:
+        execution_writer.start()
+    yield
+    execution_writer.stop()
+    solver_pool.shutdown()
+    await async_engine.dispose()
+
 
 app = FastAPI(
     title="Sistema de Modelos de Transporte",
     description="API para resolver problemas de transporte en investigación de operaciones",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configurar CORS
@@ -34,136 +81,474 @@ app.add_middleware(
     allow_credentials=True,             # Permite cookies/encabezados de autorización
     allow_methods=["*"],                # Permite todos los métodos (GET, POST, etc.)
     allow_headers=["*"],                # Permite todos los encabezados
+    expose_headers=["X-Next-Cursor"],   # Cursor de la página siguiente del listado
 )
 
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    # Correlacionar todos los logs de la petición; se respeta el X-Request-ID del cliente
+    request_id = bind_request(request.headers.get("X-Request-ID"))
+    response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    
+    # Tamaño de la respuesta por plantilla de ruta (no por URL, para acotar las etiquetas)
+    content_length = response.headers.get("content-length")
+    if content_length is not None:
+        route = request.scope.get("route")
+        RESPONSE_SIZE.observe(int(content_length), route.path if route else "unmatched",
+                              str(response.status_code))
+    return response
+
+
 @app.get("/")
 def read_root():
     return {"message": "Sistema de Modelos de Transporte - IO"}
 
 
-@app.post("/problems/", response_model=TransportProblem)
-def create_problem(problem: TransportProblemCreate, db: Session = Depends(get_db)):
-    total_supply = sum(problem.supply)
-    total_demand = sum(problem.demand)
-    
-    # Determinar si requiere balanceo y cómo
-    requires_balance = total_supply != total_demand
-    balance_type = None
-    if requires_balance:
-        if total_supply > total_demand:
-            balance_type = "columna_ficticia"
-        else:
-            balance_type = "fila_ficticia"
-    
-    balance_info = {
-        "balanced": requires_balance,
-        "original_supply": problem.supply,
-        "original_demand": problem.demand,
-        "balanced_supply": problem.supply,
-        "balanced_demand": problem.demand,
-        "ficticious_row": None,
-        "ficticious_col": None,
-        "balance_type": balance_type,
-        "difference": abs(total_supply - total_demand),
-        "explanation": f"Oferta ({total_supply}) = Demanda ({total_demand}) - Balanceado" if not requires_balance 
-                      else f"Oferta ({total_supply}) ≠ Demanda ({total_demand}) - Requiere {balance_type}"
-    }
+def _build_problem(problem: TransportProblemCreate) -> ModelTransportProblem:
+    # Balancear una sola vez; el resultado se guarda y se reutiliza en cada resolución
+    balanced = balance.balance_problem(problem.supply, problem.demand, problem.costs)
     
-    db_problem = ModelTransportProblem(
+    return ModelTransportProblem(
         name=problem.name,
         description=problem.description,
         supply=problem.supply,
         demand=problem.demand,
+        m=len(problem.supply),
+        n=len(problem.demand),
         costs=problem.costs,
-        balance_info=balance_info
+        balance_info=balanced.balance_info,
+        content_hash=problem_content_hash(problem.supply, problem.demand, problem.costs)
     )
+
+
+@app.post("/problems/", response_model=TransportProblem)
+async def create_problem(problem: TransportProblemCreate, db: AsyncSession = Depends(get_async_db)):
+    # El balanceo y la codificación de costos usan CPU: fuera del event loop
+    db_problem = await run_in_threadpool(_build_problem, problem)
     
     db.add(db_problem)
-    db.commit()
-    db.refresh(db_problem)
+    await db.commit()
+    await db.refresh(db_problem)
     return db_problem
 
-@app.get("/problems/", response_model=list[TransportProblem])
-def list_problems(db: Session = Depends(get_db)):
-    return db.query(ModelTransportProblem).all()
+@app.post("/problems/import", response_model=ProblemImportResult)
+def import_problems(files: List[UploadFile] = File(...), description: Optional[str] = Form(None),
+                    db: Session = Depends(get_db)):
+    """
+    Importación masiva desde archivos .csv, .npy o .ndjson (ver services/problem_import.py).
+    Se insertan en lotes con un commit por lote; los registros inválidos se informan y se omiten.
+    """
+    importer = ProblemImporter(db)
+    for upload in files:
+        importer.import_file(upload.file, upload.filename or "", description)
+    importer.flush()
+    summary = importer.summary()
+    logger.info("Problemas importados", extra={
+        'files': len(files), 'imported': summary['imported'], 'failed': summary['failed']
+    })
+    return summary
+
+
+# Columnas del listado; las pesadas solo se leen si se piden con include
+SUMMARY_COLUMNS = ('id', 'name', 'description', 'supply', 'demand', 'm', 'n',
+                   'method', 'total_cost', 'balance_info', 'created_at')
+INCLUDE_COLUMNS = {
+    'costs': ('costs_blob', 'costs_json'),
+    'solution': ('solution',),
+    'steps': ('steps',),
+}
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(*values) -> str:
+    """Cursor opaco con los valores de la clave de orden de la última fila"""
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode()
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return values
+
+
+@app.get("/problems/", response_model=list[TransportProblemSummary], response_model_exclude_unset=True)
+async def list_problems(
+    response: Response,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    name: Optional[str] = None,
+    min_m: Optional[int] = None,
+    max_m: Optional[int] = None,
+    min_n: Optional[int] = None,
+    max_n: Optional[int] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    include: List[str] = Query(default=[]),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Listado paginado por cursor (keyset sobre id): cada página es una consulta por
+    índice sin OFFSET. El cursor de la página siguiente va en el encabezado X-Next-Cursor.
+    """
+    unknown = set(include) - INCLUDE_COLUMNS.keys()
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"include no válido: {', '.join(sorted(unknown))}")
+    
+    column_names = list(SUMMARY_COLUMNS)
+    for field in include:
+        column_names.extend(INCLUDE_COLUMNS[field])
+    query = select(*(getattr(ModelTransportProblem, column) for column in column_names))
+    
+    if cursor:
+        last_id, = decode_cursor(cursor, 1)
+        query = query.where(ModelTransportProblem.id > last_id)
+    if name:
+        # % y _ del texto buscado se toman literalmente
+        escaped = name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.where(ModelTransportProblem.name.ilike(f"%{escaped}%", escape="\\"))
+    for column, bound, is_min in ((ModelTransportProblem.m, min_m, True), (ModelTransportProblem.m, max_m, False),
+                                  (ModelTransportProblem.n, min_n, True), (ModelTransportProblem.n, max_n, False)):
+        if bound is not None:
+            query = query.where(column >= bound if is_min else column <= bound)
+    if created_after is not None:
+        query = query.where(ModelTransportProblem.created_at >= created_after)
+    if created_before is not None:
+        query = query.where(ModelTransportProblem.created_at < created_before)
+    
+    # Una fila de más indica si hay otra página
+    rows = (await db.execute(query.order_by(ModelTransportProblem.id).limit(limit + 1))).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].id)
+    
+    problems = []
+    for row in rows:
+        item = {column: getattr(row, column) for column in SUMMARY_COLUMNS}
+        if 'costs' in include:
+            item['costs'] = ModelTransportProblem.costs_to_array(row.costs_blob, row.costs_json).tolist()
+        if 'solution' in include:
+            item['solution'] = row.solution
+        if 'steps' in include:
+            item['steps'] = row.steps
+        problems.append(item)
+    return problems
+
+
+@app.get("/problems/{problem_id}", response_model=TransportProblem)
+async def get_problem(problem_id: int, db: AsyncSession = Depends(get_async_db)):
+    problem = await db.get(ModelTransportProblem, problem_id)
+    if problem is None:
+        raise HTTPException(status_code=404, detail="Problema no encontrado")
+    return problem
+
+
+
+# Columnas que necesita la resolución; la fila del problema solo se lee.
+# Los costos se leen aparte y solo si hay que resolver (ver _load_cost_array).
+SOLVE_COLUMNS = (
+    ModelTransportProblem.supply, ModelTransportProblem.demand,
+    ModelTransportProblem.content_hash, ModelTransportProblem.balance_info
+)
+
+
+def _load_cost_array(db: Session, problem_id: int):
+    """Matriz de costos del problema: el blob se decodifica directo a NumPy"""
+    costs_blob, costs_json = (db.query(ModelTransportProblem.costs_blob, ModelTransportProblem.costs_json)
+                              .filter(ModelTransportProblem.id == problem_id).one())
+    return ModelTransportProblem.costs_to_array(costs_blob, costs_json)
 
 
+def _cache_lookup(timer: PhaseTimer, content_hash: str, method: str, detail: str, db: Session):
+    """Clave de caché y resultado guardado (None si no está)"""
+    cache_key = make_cache_key(content_hash, method, {"detail": detail})
+    with timer.phase("cache_lookup"):
+        return cache_key, solve_cache.get(cache_key, db)
+
 
 # main.py - actualizar solve_problem
 @app.post("/problems/{problem_id}/solve", response_model=SolutionResponse)
-def solve_problem(problem_id: int, solution_req: SolutionRequest, db: Session = Depends(get_db)):
-    # Obtener problema
-    problem = db.query(ModelTransportProblem).filter(ModelTransportProblem.id == problem_id).first()
+def solve_problem(problem_id: int, solution_req: SolutionRequest, profile: bool = False,
+                  memory: bool = False, db: Session = Depends(get_db)):
+    # Obtener problema (solo las columnas necesarias; la fila nunca se modifica aquí)
+    problem = db.query(*SOLVE_COLUMNS).filter(ModelTransportProblem.id == problem_id).first()
     if not problem:
         raise HTTPException(status_code=404, detail="Problema no encontrado")
     
-    # Balancear el problema ANTES de resolver
-    balanced_data = balance.balance_transport_problem(problem.supply, problem.demand, problem.costs)
-    balanced_supply = balanced_data["supply"]
-    balanced_demand = balanced_data["demand"] 
-    balanced_costs = balanced_data["costs"]
-    balance_info = balanced_data["balance_info"]
-
-    # Actualizar el balance_info en la base de datos
-    problem.balance_info = balance_info
-    db.commit()
+    if solution_req.method not in SOLVERS:
+        raise HTTPException(status_code=400, detail="Método no válido")
+    
+    timer = PhaseTimer()
+    profile_stats = None
+    memory_profile = None
     
-    # Seleccionar algoritmo
     start_time = time.time()
-     
-    if solution_req.method == "northwest":
-        result = northwest.northwest_corner(balanced_supply, balanced_demand, balanced_costs)
-    elif solution_req.method == "vogel":
-        result = vogel.vogel_approximation(balanced_supply, balanced_demand, balanced_costs)
-    elif solution_req.method == "min_cost":
-        result = min_cost.min_cost_method(balanced_supply, balanced_demand, balanced_costs)
+    cost_array = None
+    content_hash = problem.content_hash
+    if content_hash is None:
+        # Registro anterior a la huella guardada: se calcula sobre la matriz
+        with timer.phase("load_costs"):
+            cost_array = _load_cost_array(db, problem_id)
+            content_hash = problem_content_hash(problem.supply, problem.demand, cost_array)
+    
+    # Consultar la caché antes del control de admisión y de cualquier algoritmo:
+    # un acierto no lee los costos ni escribe nada.
+    # Con ?profile=true o ?memory=true siempre se resuelve, para que haya algo que medir.
+    use_cache = not (profile or memory)
+    detail = solution_req.detail
+    cache_key, payload = None, None
+    if use_cache:
+        cache_key, payload = _cache_lookup(timer, content_hash, solution_req.method, detail, db)
+    cache_hit = payload is not None
+    
+    admission = None
+    outcome = None
+    if cache_hit:
+        execution_time = time.time() - start_time
     else:
-        raise HTTPException(status_code=400, detail="Método no válido")
+        if cost_array is None:
+            with timer.phase("load_costs"):
+                cost_array = _load_cost_array(db, problem_id)
+        
+        # Control de admisión: estimar la memoria según el tamaño (y, con detalle "full",
+        # los empates de costos que generan soluciones alternativas)
+        with timer.phase("admission"):
+            m, n, tie_group = balanced_tie_profile(
+                problem.supply, problem.demand, cost_array if detail == "full" else None
+            )
+            admission = check_admission(m, n, solution_req.method, detail, tie_group)
+        record_admission(solution_req.method, admission)
+        if not admission['admitted']:
+            raise HTTPException(
+                status_code=413,
+                detail=(f"El problema excede el presupuesto de memoria: se estiman "
+                        f"{admission['estimated_bytes'] / 2**20:.1f} MB y el límite es "
+                        f"{admission['budget_bytes'] / 2**20:.1f} MB")
+            )
+        if admission['detail'] != detail:
+            # Con el detalle rebajado puede haber un resultado guardado
+            detail = admission['detail']
+            if use_cache:
+                cache_key, payload = _cache_lookup(timer, content_hash, solution_req.method, detail, db)
+                cache_hit = payload is not None
+        if cache_hit:
+            execution_time = time.time() - start_time
+    
+    if not cache_hit:
+        # No retener la conexión mientras se espera al pool de resolución
+        db.close()
+        # Balanceo, algoritmo y validación corren en el pool de procesos (cola acotada)
+        try:
+            outcome, queue_seconds = solver_pool.execute(
+                run_solve, solution_req.method, problem.supply, problem.demand, cost_array,
+                problem.balance_info, detail, profile, memory, current_request_context(),
+                method=solution_req.method, detail=detail, m=m, n=n, tie_group=tie_group,
+                learn=use_cache
+            )
+        except SolverBusy as busy:
+            raise HTTPException(status_code=503, detail=str(busy),
+                                headers={"Retry-After": str(busy.retry_after)})
+        timer.merge({'queue_wait': {'wall_ms': queue_seconds * 1000, 'cpu_ms': 0.0, 'calls': 1}})
+        timer.merge(outcome['phase_timings'])
+        payload = outcome['payload']
+        execution_time = outcome['execution_time']
+        profile_stats = outcome['profile']
+        memory_profile = outcome['memory_profile']
+        
+        if use_cache:
+            with timer.phase("cache_store"):
+                solve_cache.put(cache_key, solution_req.method, payload, db)
+    
+    # Guardar ejecución (los tiempos guardados cubren todo hasta antes de persistir).
+    # Caché, ejecución y pasos van en una sola transacción, sin refresh: el id no se usa.
+    # Un acierto de caché no es una ejecución nueva: no escribe nada (execution_uid es None).
+    execution_uid = None
+    if not cache_hit:
+        execution_uid = new_execution_uid()
+        with timer.phase("persist"):
+            record = {
+                'uid': execution_uid,
+                'problem_id': problem_id,
+                'method': solution_req.method,
+                'execution_time': execution_time,
+                'solution_matrix': payload['main_solution'],
+                'total_cost': payload['total_cost'],
+                'phase_timings': timer.as_dict(),
+                'memory_profile': memory_profile,
+                'step_by_step': payload.get('step_by_step')
+            }
+            if execution_writer.running:
+                # Escritura diferida: solo se espera el commit de la caché
+                execution_writer.enqueue(record)
+            else:
+                db.add(build_execution(record))
+            db.commit()
+    phase_timings = timer.as_dict()
     
-    execution_time = time.time() - start_time
+    record_solve(solution_req.method, detail, cache_hit,
+                 len(problem.supply), len(problem.demand), execution_time,
+                 outcome, phase_timings, memory_profile)
     
-    # Guardar ejecución
-    execution = ModelProblemExecution(
-        problem_id=problem_id,
-        method=solution_req.method,
-        execution_time=execution_time,
-        solution_matrix=result['main_solution'],
-        total_cost=result['total_cost'],
-        step_by_step=result['steps']
+    logger.info("Problema resuelto", extra={
+        'problem_id': problem_id,
+        'method': solution_req.method,
+        'detail': detail,
+        'cache_hit': cache_hit,
+        'execution_time': execution_time,
+        'phase_timings': phase_timings
+    })
+    
+    # El payload ya fue validado: se codifica directo a bytes sin pasar otra vez por response_model
+    response = {
+        'problem_id': problem_id,
+        'method': solution_req.method,
+        'execution_time': execution_time,
+        'cache_hit': cache_hit,
+        'execution_uid': execution_uid,
+        'phase_timings': phase_timings,
+        **payload
+    }
+    if profile_stats is not None:
+        response['profile'] = profile_stats
+    if memory_profile is not None:
+        response['memory_profile'] = memory_profile
+    if admission is not None and admission['downgraded_from']:
+        response['detail_downgraded_from'] = admission['downgraded_from']
+    return FastJSONResponse(response)
+
+
+@app.get("/cache/stats")
+def get_cache_stats():
+    return solve_cache.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    # Formato de texto de Prometheus
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+
+EXECUTION_SUMMARY_COLUMNS = (
+    ModelProblemExecution.id, ModelProblemExecution.uid, ModelProblemExecution.problem_id, ModelProblemExecution.method,
+    ModelProblemExecution.execution_time, ModelProblemExecution.total_cost, ModelProblemExecution.executed_at,
+    ModelExecutionSteps.step_count
+)
+EXECUTION_DETAIL_COLUMNS = EXECUTION_SUMMARY_COLUMNS + (
+    ModelProblemExecution.solution_matrix, ModelProblemExecution.phase_timings, ModelProblemExecution.memory_profile
+)
+
+
+def select_executions(columns):
+    # step_count sale de execution_steps sin leer el payload comprimido
+    return select(*columns).outerjoin(
+        ModelExecutionSteps, ModelExecutionSteps.execution_id == ModelProblemExecution.id
     )
-    db.add(execution)
-    db.commit()
-    db.refresh(execution)
-    
-    return SolutionResponse(
-        problem_id=problem_id,
-        method=solution_req.method,
-        main_solution=result['main_solution'],
-        total_cost=result['total_cost'],
-        step_by_step=result['steps'],
-        execution_time=execution_time,
-        alternative_solutions=result.get('alternative_solutions', []),
-        has_multiple_solutions=result.get('has_multiple_solutions', False),
-        tie_scenarios=result.get('tie_scenarios', []),
-        # Nueva información de análisis
-        basic_variables=result['basic_variables'],
-        non_basic_variables=result['non_basic_variables'],
-        is_balanced=result['is_balanced'],
-        total_supply=result['total_supply'],
-        total_demand=result['total_demand'],
-        degeneracy_info=result['degeneracy_info'],
-        m=result['m'],
-        n=result['n'],
-        required_basic_variables=result['required_basic_variables'],
-        actual_basic_variables=result['actual_basic_variables'],
-        has_degeneracy=result['has_degeneracy'],
-        transport_summary=result['transport_summary'],
-        final_conclusion=result['final_conclusion']
+
+
+@app.get("/problems/{problem_id}/executions", response_model=list[ExecutionSummary])
+async def get_problem_executions(
+    problem_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Historial de ejecuciones de un problema, de la más reciente a la más antigua.
+    Solo lee columnas livianas y pagina por (executed_at, id) sobre el índice
+    ix_problem_executions_problem_executed; el cursor siguiente va en X-Next-Cursor.
+    """
+    query = select_executions(EXECUTION_SUMMARY_COLUMNS).where(ModelProblemExecution.problem_id == problem_id)
+    if cursor:
+        last_executed_at, last_id = decode_cursor(cursor, 2)
+        try:
+            last_executed_at = datetime.fromisoformat(last_executed_at)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Cursor inválido")
+        query = query.where(or_(
+            ModelProblemExecution.executed_at < last_executed_at,
+            and_(ModelProblemExecution.executed_at == last_executed_at, ModelProblemExecution.id < last_id)
+        ))
+    
+    query = query.order_by(ModelProblemExecution.executed_at.desc(), ModelProblemExecution.id.desc()).limit(limit + 1)
+    rows = (await db.execute(query)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].executed_at.isoformat(), rows[-1].id)
+    return [row._asdict() for row in rows]
+
+
+def _export_response(export_format: str, problem_id: Optional[int], executed_after: Optional[datetime]):
+    if not format_available(export_format):
+        raise HTTPException(status_code=501, detail="El formato parquet requiere pyarrow instalado")
+    # Sin Content-Length: la respuesta se envía por fragmentos (chunked) a medida que se lee el cursor
+    return StreamingResponse(
+        stream_executions(export_format, problem_id, executed_after),
+        media_type=MEDIA_TYPES[export_format],
+        headers=export_headers(export_format, problem_id)
     )
 
 
+@app.get("/problems/{problem_id}/executions/export")
+def export_problem_executions(
+    problem_id: int,
+    format: Literal["csv", "ndjson", "parquet"] = "csv",
+    executed_after: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Historial de ejecuciones de un problema como filas dispersas
+    (origen, destino, cantidad, costo), en streaming (ver services/execution_export.py).
+    """
+    if db.query(ModelTransportProblem.id).filter(ModelTransportProblem.id == problem_id).first() is None:
+        raise HTTPException(status_code=404, detail="Problema no encontrado")
+    return _export_response(format, problem_id, executed_after)
+
+
+# Declarada antes de /executions/{execution_id} para que "export" no se tome como id
+@app.get("/executions/export")
+def export_executions(
+    format: Literal["csv", "ndjson", "parquet"] = "csv",
+    executed_after: Optional[datetime] = None
+):
+    """Exportación de todas las ejecuciones de la base, ordenadas por problema y fecha"""
+    return _export_response(format, None, executed_after)
 
-@app.get("/problems/{problem_id}/executions")
-def get_problem_executions(problem_id: int, db: Session = Depends(get_db)):
-    executions = db.query(ModelProblemExecution).filter(ModelProblemExecution.problem_id == problem_id).all()
-    return executions
\ No newline at end of file
+
+@app.get("/executions/{execution_id}", response_model=ExecutionDetail)
+async def get_execution(execution_id: int, db: AsyncSession = Depends(get_async_db)):
+    query = select_executions(EXECUTION_DETAIL_COLUMNS).where(ModelProblemExecution.id == execution_id)
+    row = (await db.execute(query)).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Ejecución no encontrada")
+    return row._asdict()
+
+
+@app.get("/executions/{execution_id}/steps")
+async def get_execution_steps(execution_id: int, db: AsyncSession = Depends(get_async_db)):
+    record = await db.get(ModelExecutionSteps, execution_id)
+    if record is not None:
+        # El JSON guardado se devuelve tal cual, sin convertirlo a objetos de Python
+        steps_json = decode_steps_json(record.codec, record.payload)
+        body = b'{"execution_id":%d,"step_count":%d,"step_by_step":%s}' % (
+            execution_id, record.step_count, steps_json
+        )
+        return Response(content=body, media_type="application/json")
+    
+    legacy = (await db.execute(
+        select(ModelProblemExecution.step_by_step).where(ModelProblemExecution.id == execution_id)
+    )).first()
+    if legacy is None:
+        raise HTTPException(status_code=404, detail="Ejecución no encontrada")
+    # Registro anterior a execution_steps (o ejecución sin historial de pasos)
+    steps = legacy.step_by_step
+    return FastJSONResponse({
+        'execution_id': execution_id,
+        'step_count': len(steps) if steps else 0,
+        'step_by_step': steps
+    })
\ No newline at end of file
@@ -0,0 +1,92 @@
+# models/matrix_blob.py
+import os
+import struct
+import zlib
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+# Formato del blob (todo little-endian):
+#   magic "TPMX" | versión u8 | dtype u8 | flags u8 | ndim u8 | shape u32 x ndim | datos
+# Los datos son el arreglo en orden C, comprimidos con zlib si FLAG_ZLIB está activo.
+MAGIC = b"TPMX"
+VERSION = 1
+FLAG_ZLIB = 0x01
+
+_DTYPES = {1: np.dtype("<f4"), 2: np.dtype("<f8"), 3: np.dtype("<i4"), 4: np.dtype("<i8")}
+_DTYPE_CODES = {dtype: code for code, dtype in _DTYPES.items()}
+_HEADER = struct.Struct("<4sBBBB")
+
+# Por debajo de este tamaño no vale la pena comprimir
+COMPRESS_MIN_BYTES = 4096
+# La compresión ahorra espacio pero descomprimir cuesta más que leer el blob
+# (≈30 ms contra <1 ms en 1000x1000): desactivada salvo que se pida
+COMPRESS_BY_DEFAULT = os.getenv("COST_BLOB_COMPRESS", "0") == "1"
+
+# Enteros exactos en float64 (2**53): por encima no se puede saber si el valor era entero
+_MAX_EXACT_INT = 2 ** 53
+
+
+def as_cost_array(values: Union[Sequence, np.ndarray]) -> np.ndarray:
+    """
+    Convierte una matriz de costos a NumPy conservando la integralidad: si todos los
+    valores son enteros retorna int32/int64 (así tolist() vuelve a dar int y los textos
+    muestran "8×13" y no "8.0×13"); si no, float64.
+    """
+    array = np.asarray(values)
+    if array.dtype.kind in "iu":
+        return array.astype("<i4" if _fits_int32(array) else "<i8", copy=False)
+    array = array.astype("<f8")
+    if array.size == 0 or not np.all(np.isfinite(array)):
+        return array
+    if np.abs(array).max() < _MAX_EXACT_INT and np.array_equal(array, np.trunc(array)):
+        return array.astype("<i4" if _fits_int32(array) else "<i8")
+    return array
+
+
+def _fits_int32(array: np.ndarray) -> bool:
+    info = np.iinfo(np.int32)
+    return array.size == 0 or (array.min() >= info.min and array.max() <= info.max)
+
+
+def encode_matrix(values: Union[Sequence, np.ndarray], compress: Optional[bool] = None) -> bytes:
+    """
+    Codifica una matriz numérica como blob binario.
+    Los costos enteros se guardan como int32/int64 y se decodifican como enteros; los demás
+    usan float32 cuando no pierde precisión y float64 en otro caso;
+    si se comprime (COST_BLOB_COMPRESS=1), solo se guarda comprimido cuando reduce el tamaño.
+    """
+    if compress is None:
+        compress = COMPRESS_BY_DEFAULT
+    array = as_cost_array(values)
+    if array.dtype.kind == "f":
+        as_float32 = array.astype("<f4")
+        if np.array_equal(as_float32, array):
+            array = as_float32
+
+    data = np.ascontiguousarray(array).tobytes()
+    flags = 0
+    if compress and len(data) >= COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(data, 1)
+        if len(compressed) < len(data) * 0.9:
+            data = compressed
+            flags |= FLAG_ZLIB
+
+    header = _HEADER.pack(MAGIC, VERSION, _DTYPE_CODES[array.dtype], flags, array.ndim)
+    shape = struct.pack(f"<{array.ndim}I", *array.shape)
+    return header + shape + data
+
+
+def decode_matrix(blob: bytes) -> np.ndarray:
+    """Decodifica un blob de encode_matrix a un arreglo de NumPy (sin pasar por objetos de Python)"""
+    magic, version, dtype_code, flags, ndim = _HEADER.unpack_from(blob)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Blob de matriz con formato desconocido")
+    offset = _HEADER.size
+    shape = struct.unpack_from(f"<{ndim}I", blob, offset)
+    offset += 4 * ndim
+
+    data = memoryview(blob)[offset:]
+    if flags & FLAG_ZLIB:
+        data = zlib.decompress(data)
+    return np.frombuffer(data, dtype=_DTYPES[dtype_code]).reshape(shape)
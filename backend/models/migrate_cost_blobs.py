@@ -0,0 +1,65 @@
+# models/migrate_cost_blobs.py
+"""
+Migra los costos guardados como JSON al formato binario de models/matrix_blob.py.
+
+Uso (desde backend/):
+    python -m models.migrate_cost_blobs [--batch-size 200]
+
+Se puede ejecutar con la aplicación en marcha: los registros sin migrar se siguen
+leyendo desde la columna JSON.
+"""
+import argparse
+import logging
+
+from sqlalchemy.orm import Session
+
+from config.db_conexion import SessionLocal, engine
+from models.mod_transport import ModelTransportProblem
+from models.schema_upgrade import upgrade_schema
+
+logger = logging.getLogger(__name__)
+
+
+def migrate_cost_blobs(db: Session, batch_size: int = 200) -> int:
+    """Convierte por lotes (recorridos por id) los registros que aún no tienen blob; retorna cuántos migró"""
+    migrated = 0
+    last_id = 0
+    while True:
+        problems = (
+            db.query(ModelTransportProblem)
+            .filter(ModelTransportProblem.id > last_id,
+                    ModelTransportProblem.costs_blob.is_(None),
+                    ModelTransportProblem.costs_json.isnot(None))
+            .order_by(ModelTransportProblem.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not problems:
+            return migrated
+        for problem in problems:
+            # El setter codifica el blob y vacía la columna JSON
+            problem.costs = problem.costs_json
+        db.commit()
+        migrated += len(problems)
+        last_id = problems[-1].id
+        logger.info("Lote migrado", extra={'migrated': migrated, 'last_id': last_id})
+        db.expunge_all()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Migra los costos JSON a blobs binarios")
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    upgrade_schema(engine)
+    db = SessionLocal()
+    try:
+        migrated = migrate_cost_blobs(db, args.batch_size)
+    finally:
+        db.close()
+    print(f"Problemas migrados: {migrated}")
+
+
+if __name__ == "__main__":
+    main()
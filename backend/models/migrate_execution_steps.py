@@ -0,0 +1,71 @@
+# models/migrate_execution_steps.py
+"""
+Mueve el historial de pasos de problem_executions.step_by_step (JSON) a la
+tabla comprimida execution_steps.
+
+Uso (desde backend/):
+    python -m models.migrate_execution_steps [--batch-size 200]
+
+Se puede ejecutar con la aplicación en marcha: las ejecuciones sin migrar se
+siguen leyendo desde la columna JSON. En Postgres el espacio liberado solo se
+devuelve al sistema con VACUUM FULL problem_executions.
+"""
+import argparse
+import logging
+
+from sqlalchemy import null
+from sqlalchemy.orm import Session, undefer
+
+from config.db_conexion import Base, SessionLocal, engine
+from models.mod_transport import ModelProblemExecution
+from models.schema_upgrade import upgrade_schema
+
+logger = logging.getLogger(__name__)
+
+
+def migrate_execution_steps(db: Session, batch_size: int = 200) -> int:
+    """Migra por lotes (recorridos por id) las ejecuciones con pasos en JSON; retorna cuántas migró"""
+    migrated = 0
+    last_id = 0
+    while True:
+        executions = (
+            db.query(ModelProblemExecution)
+            .options(undefer(ModelProblemExecution.step_by_step))
+            .filter(ModelProblemExecution.id > last_id,
+                    ModelProblemExecution.step_by_step.isnot(None))
+            .order_by(ModelProblemExecution.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not executions:
+            return migrated
+        for execution in executions:
+            if execution.step_by_step and execution.steps_record is None:
+                execution.set_steps(execution.step_by_step)
+                migrated += 1
+            # JSON null de versiones anteriores o pasos ya migrados: se deja NULL en SQL
+            execution.step_by_step = null()
+        db.commit()
+        last_id = executions[-1].id
+        logger.info("Lote migrado", extra={'migrated': migrated, 'last_id': last_id})
+        db.expunge_all()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mueve los pasos de las ejecuciones a execution_steps")
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    db = SessionLocal()
+    try:
+        migrated = migrate_execution_steps(db, args.batch_size)
+    finally:
+        db.close()
+    print(f"Ejecuciones migradas: {migrated}")
+
+
+if __name__ == "__main__":
+    main()
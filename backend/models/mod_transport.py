@@ -1,7 +1,19 @@
-from sqlalchemy import Column, Integer, String, Float, Text, JSON, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Text, JSON, DateTime, ForeignKey, LargeBinary, Index
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
+import numpy as np
 from config.db_conexion import Base
+from models.matrix_blob import as_cost_array, encode_matrix, decode_matrix
+from models.step_blob import encode_steps, decode_steps, decode_json
+
+# Fechas asignadas por la base (server_default). En SQLite CURRENT_TIMESTAMP guarda
+# "AAAA-MM-DD HH:MM:SS" como texto: los parámetros se formatean igual para que las
+# comparaciones de los filtros y cursores por fecha sean correctas.
+Timestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite"
+)
 
 class ModelTransportProblem(Base):
     __tablename__ = "transport_problems"
@@ -13,7 +25,13 @@ class ModelTransportProblem(Base):
     # Datos del problema
     supply = Column(JSON)  # [100, 150, 200]
     demand = Column(JSON)  # [80, 120, 150, 100]
-    costs = Column(JSON)   # [[8, 6, 10, 9], [9, 12, 13, 7], [14, 9, 16, 5]]
+    # Dimensiones (orígenes x destinos) para filtrar el listado sin leer los JSON
+    m = Column(Integer, index=True)
+    n = Column(Integer, index=True)
+    # Costos como blob binario (ver models/matrix_blob.py); los registros anteriores
+    # conservan la columna JSON hasta migrarlos con models/migrate_cost_blobs.py
+    costs_blob = Column(LargeBinary, nullable=True)
+    costs_json = Column("costs", JSON(none_as_null=True))   # [[8, 6, 10, 9], [9, 12, 13, 7], [14, 9, 16, 5]]
     
     # Método seleccionado
     method = Column(String(20))  # northwest, vogel, min_cost
@@ -23,18 +41,53 @@ class ModelTransportProblem(Base):
     total_cost = Column(Float)
     steps = Column(JSON)  # Pasos del algoritmo
     balance_info = Column(JSON, nullable=True) # si la oferta y demanda esta desbalanceada
+    # Huella de oferta, demanda y costos (services/solve_cache.problem_content_hash) para la
+    # clave de caché; en los registros anteriores es NULL y se calcula al resolver
+    content_hash = Column(String(64), nullable=True)
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now(), index=True)
     
     # Relación con ejecuciones
     executions = relationship("ModelProblemExecution", back_populates="problem")
+    
+    @staticmethod
+    def costs_to_array(costs_blob, costs_json) -> np.ndarray:
+        """Matriz de costos a partir de las columnas (sirve también con consultas por columnas)"""
+        if costs_blob is not None:
+            array = decode_matrix(costs_blob)
+            # Los blobs anteriores guardaban los costos enteros como float32
+            return as_cost_array(array) if array.dtype == np.float32 else array
+        return as_cost_array(costs_json)
+    
+    @property
+    def cost_array(self) -> np.ndarray:
+        """Matriz de costos como arreglo de NumPy, leída directo del blob"""
+        return self.costs_to_array(self.costs_blob, self.costs_json)
+    
+    @property
+    def costs(self):
+        """Matriz de costos como lista de listas (formato de la API y de los algoritmos)"""
+        if self.costs_blob is not None:
+            return self.cost_array.tolist()
+        return self.costs_json
+    
+    @costs.setter
+    def costs(self, value):
+        self.costs_blob = encode_matrix(value)
+        self.costs_json = None
 
 
 
 class ModelProblemExecution(Base):
     __tablename__ = "problem_executions"
+    # Historial de un problema ordenado por fecha: cubre el filtro y el orden del listado
+    __table_args__ = (
+        Index("ix_problem_executions_problem_executed", "problem_id", "executed_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True, autoincrement="auto")
+    # Identificador asignado antes de escribir (la escritura puede ser diferida)
+    uid = Column(String(32), unique=True, index=True)
     problem_id = Column(Integer, ForeignKey("transport_problems.id"))
     
     # Parámetros de ejecución
@@ -44,9 +97,70 @@ class ModelProblemExecution(Base):
     # Resultados
     solution_matrix = Column(JSON)
     total_cost = Column(Float)
-    step_by_step = Column(JSON)  # Pasos detallados
+    # Pasos detallados de registros anteriores; los nuevos van comprimidos en execution_steps.
+    # Diferida: solo se lee si se accede a ella
+    step_by_step = deferred(Column(JSON(none_as_null=True)))
+    phase_timings = Column(JSON, nullable=True)  # Tiempos por fase {fase: {wall_ms, cpu_ms, calls}}
+    memory_profile = Column(JSON, nullable=True)  # Memoria pico y sitios de asignación (?memory=true)
     
-    executed_at = Column(DateTime(timezone=True), server_default=func.now())
+    executed_at = Column(Timestamp, server_default=func.now())
     
     # Relación
-    problem = relationship("ModelTransportProblem", back_populates="executions")
\ No newline at end of file
+    problem = relationship("ModelTransportProblem", back_populates="executions")
+    steps_record = relationship("ModelExecutionSteps", uselist=False, lazy="select",
+                                cascade="all, delete-orphan", back_populates="execution")
+    
+    def set_steps(self, steps) -> None:
+        """Guarda el historial de pasos comprimido en su propia tabla"""
+        if steps is None:
+            self.steps_record = None
+            return
+        self.steps_record = ModelExecutionSteps(**ModelExecutionSteps.values_for(steps))
+    
+    def get_steps(self):
+        """Historial de pasos (carga diferida); None si la ejecución no lo guardó"""
+        if self.steps_record is not None:
+            return decode_steps(self.steps_record.codec, self.steps_record.payload)
+        return self.step_by_step
+
+
+class ModelExecutionSteps(Base):
+    __tablename__ = "execution_steps"
+    
+    # Una fila por ejecución con historial de pasos
+    execution_id = Column(Integer, ForeignKey("problem_executions.id", ondelete="CASCADE"), primary_key=True)
+    codec = Column(String(20), nullable=False)  # ver models/step_blob.py
+    step_count = Column(Integer, nullable=False)
+    raw_size = Column(Integer)  # Bytes del JSON sin comprimir
+    payload = Column(LargeBinary, nullable=False)
+    
+    execution = relationship("ModelProblemExecution", back_populates="steps_record")
+    
+    @staticmethod
+    def values_for(steps) -> dict:
+        """Columnas (sin execution_id) para guardar un historial de pasos"""
+        codec, payload, raw_size = encode_steps(steps)
+        return {'codec': codec, 'payload': payload, 'raw_size': raw_size, 'step_count': len(steps)}
+
+
+class ModelSolveCache(Base):
+    __tablename__ = "solve_cache"
+    
+    # Hash SHA-256 del problema canonicalizado (oferta, demanda, costos, método, opciones)
+    key = Column(String(64), primary_key=True)
+    method = Column(String(20), nullable=False)
+    
+    # Respuesta completa ya calculada, comprimida (ver models/step_blob.py).
+    # Las filas anteriores conservan el JSON sin comprimir en result.
+    result = Column(JSON(none_as_null=True))
+    codec = Column(String(20), nullable=True)
+    payload = Column(LargeBinary, nullable=True)
+    raw_size = Column(Integer, nullable=True)  # Bytes del JSON sin comprimir
+    
+    # Para expirar entradas (SOLVE_CACHE_DB_TTL_S) y podar las más viejas (SOLVE_CACHE_DB_MAX_ROWS)
+    created_at = Column(Timestamp, server_default=func.now(), index=True)
+    
+    def get_result(self):
+        if self.payload is not None:
+            return decode_json(self.codec, self.payload)
+        return self.result
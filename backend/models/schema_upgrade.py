@@ -0,0 +1,49 @@
+# models/schema_upgrade.py
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from models.mod_transport import Base
+
+logger = logging.getLogger(__name__)
+
+# Sentencias para completar una columna recién agregada en los registros existentes
+# (json_array_length existe tanto en Postgres como en SQLite)
+COLUMN_BACKFILLS = {
+    ('transport_problems', 'm'): "UPDATE transport_problems SET m = json_array_length(supply) WHERE supply IS NOT NULL",
+    ('transport_problems', 'n'): "UPDATE transport_problems SET n = json_array_length(demand) WHERE demand IS NOT NULL",
+}
+
+
+def upgrade_schema(engine: Engine) -> None:
+    """
+    Agrega a las tablas existentes las columnas nuevas que admiten NULL y los
+    índices que falten.
+
+    create_all solo crea tablas que no existen; las columnas e índices agregados
+    después a un modelo se crean aquí. Los cambios de tipo o de columnas
+    obligatorias requieren una migración manual.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                logger.info("Columna agregada", extra={'table': table.name, 'column': column.name})
+                backfill = COLUMN_BACKFILLS.get((table.name, column.name))
+                if backfill:
+                    connection.execute(text(backfill))
+
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(bind=connection)
+                    logger.info("Índice creado", extra={'table': table.name, 'index': index.name})
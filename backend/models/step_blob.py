@@ -0,0 +1,48 @@
+# models/step_blob.py
+import json
+import zlib
+from typing import Any, List, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional; sin él se usa el codificador estándar
+    orjson = None
+
+# Codec: JSON comprimido con zlib nivel 1 (el más rápido); se usa para el historial
+# de pasos y para los resultados de la caché persistente
+CODEC = "json+zlib1"
+
+
+def encode_json(value: Any) -> Tuple[str, bytes, int]:
+    """Codifica un valor JSON comprimido; retorna (codec, blob, tamaño sin comprimir)"""
+    if orjson is not None:
+        raw = orjson.dumps(value)
+    else:
+        raw = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+    return CODEC, zlib.compress(raw, 1), len(raw)
+
+
+def decode_json_bytes(codec: str, blob: bytes) -> bytes:
+    """JSON (bytes) de un blob de encode_json, sin convertirlo a objetos de Python"""
+    if codec != CODEC:
+        raise ValueError(f"Codec desconocido: {codec}")
+    return zlib.decompress(blob)
+
+
+def decode_json(codec: str, blob: bytes) -> Any:
+    raw = decode_json_bytes(codec, blob)
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def encode_steps(steps: List[Any]) -> Tuple[str, bytes, int]:
+    """Codifica el historial de pasos; retorna (codec, blob, tamaño sin comprimir)"""
+    return encode_json(steps)
+
+
+def decode_steps_json(codec: str, blob: bytes) -> bytes:
+    """JSON (bytes) del historial de pasos, sin convertirlo a objetos de Python"""
+    return decode_json_bytes(codec, blob)
+
+
+def decode_steps(codec: str, blob: bytes) -> List[Any]:
+    return decode_json(codec, blob)
@@ -68,11 +68,8 @@ def solve_problem(problem_id: int, solution_req: SolutionRequest, db: Session =
         raise HTTPException(status_code=404, detail="Problema no encontrado")
     
     # Balancear el problema ANTES de resolver
-    balanced_data = balance.balance_transport_problem(problem.supply, problem.demand, problem.costs)
-    balanced_supply = balanced_data["supply"]
-    balanced_demand = balanced_data["demand"] 
-    balanced_costs = balanced_data["costs"]
-    balance_info = balanced_data["balance_info"]
+    balanced = balance.balance_problem(problem.supply, problem.demand, problem.costs)
+    balance_info = balanced.balance_info
 
     # Actualizar el balance_info en la base de datos
     problem.balance_info = balance_info
@@ -82,11 +79,11 @@ def solve_problem(problem_id: int, solution_req: SolutionRequest, db: Session =
     start_time = time.time()
      
     if solution_req.method == "northwest":
-        result = northwest.northwest_corner(balanced_supply, balanced_demand, balanced_costs)
+        result = northwest.northwest_corner(problem.supply, problem.demand, problem.costs, balanced=balanced)
     elif solution_req.method == "vogel":
-        result = vogel.vogel_approximation(balanced_supply, balanced_demand, balanced_costs)
+        result = vogel.vogel_approximation(problem.supply, problem.demand, problem.costs, balanced=balanced)
     elif solution_req.method == "min_cost":
-        result = min_cost.min_cost_method(balanced_supply, balanced_demand, balanced_costs)
+        result = min_cost.min_cost_method(problem.supply, problem.demand, problem.costs, balanced=balanced)
     else:
         raise HTTPException(status_code=400, detail="Método no válido")
     
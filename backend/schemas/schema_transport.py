@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 from datetime import datetime
 
 class TransportProblemBase(BaseModel):
@@ -34,8 +34,57 @@ class TransportProblem(TransportProblemBase):
     
     model_config = ConfigDict(from_attributes=True)
 
+class TransportProblemSummary(BaseModel):
+    """Fila del listado de problemas: costs, steps y solution solo si se piden con include"""
+    id: int
+    name: str
+    description: Optional[str] = None
+    supply: List[int]
+    demand: List[int]
+    m: Optional[int] = None
+    n: Optional[int] = None
+    method: Optional[str] = None
+    total_cost: Optional[float] = None
+    balance_info: Optional[BalanceInfo] = None
+    created_at: datetime
+    costs: Optional[List[List[float]]] = None
+    solution: Optional[List[List[int]]] = None
+    steps: Optional[List[Dict[str, Any]]] = None
+
+class ProblemImportIssue(BaseModel):
+    """Registro o archivo omitido en una importación (line es None si falló el archivo entero)"""
+    file: str
+    line: Optional[int] = None
+    detail: str
+
+class ProblemImportResult(BaseModel):
+    imported: int
+    failed: int
+    batches: int
+    errors: List[ProblemImportIssue]
+
+class ExecutionSummary(BaseModel):
+    """Fila del historial de ejecuciones, sin solución ni pasos"""
+    id: int
+    uid: Optional[str] = None
+    problem_id: int
+    method: str
+    execution_time: Optional[float] = None
+    total_cost: Optional[float] = None
+    step_count: Optional[int] = None
+    executed_at: datetime
+
+class ExecutionDetail(ExecutionSummary):
+    """Una ejecución completa; los pasos se piden aparte en /executions/{id}/steps"""
+    solution_matrix: Optional[List[List[int]]] = None
+    phase_timings: Optional[Dict[str, Any]] = None
+    memory_profile: Optional[Dict[str, Any]] = None
+
 class SolutionRequest(BaseModel):
     method: str  # "northwest", "vogel", "min_cost"
+    # Nivel de detalle: "minimal" (matriz y costo), "standard" (más análisis y resumen)
+    # o "full" (más pasos, alternativas y conclusión). Controla lo que se calcula.
+    detail: Literal["minimal", "standard", "full"] = "full"
 
 # class StepByStep(BaseModel):
 #     step_number: int
@@ -113,35 +162,57 @@ class AlternativeSolution(BaseModel):
 
 
 
-class SolutionResponse(BaseModel):
-    problem_id: int
-    method: str
+class SolutionPayload(BaseModel):
+    """
+    Resultado de un algoritmo, independiente de la petición (es lo que se guarda en caché).
+    Los campos opcionales solo se calculan con los niveles de detalle "standard" o "full".
+    """
     main_solution: List[List[int]]
     total_cost: float
-    step_by_step: List[StepByStep]
-    execution_time: float
+    step_by_step: Optional[List[StepByStep]] = None
     alternative_solutions: List[AlternativeSolution] = []
     has_multiple_solutions: bool = False
     tie_scenarios: List[str] = []
     
     # Nueva información estructural
-    basic_variables: List[BasicVariable]
-    non_basic_variables: List[str]
-    is_balanced: bool
-    total_supply: int
-    total_demand: int
-    degeneracy_info: str
-    m: int  # Número de filas (orígenes)
-    n: int  # Número de columnas (destinos)
-    required_basic_variables: int  # m + n - 1
-    actual_basic_variables: int
-    has_degeneracy: bool
+    basic_variables: Optional[List[BasicVariable]] = None
+    non_basic_variables: Optional[List[str]] = None
+    is_balanced: Optional[bool] = None
+    total_supply: Optional[int] = None
+    total_demand: Optional[int] = None
+    degeneracy_info: Optional[str] = None
+    m: Optional[int] = None  # Número de filas (orígenes)
+    n: Optional[int] = None  # Número de columnas (destinos)
+    required_basic_variables: Optional[int] = None  # m + n - 1
+    actual_basic_variables: Optional[int] = None
+    has_degeneracy: Optional[bool] = None
 
      #  Resumen textual
-    transport_summary: TransportSummary
+    transport_summary: Optional[TransportSummary] = None
 
     #  Conclusión final
-    final_conclusion: FinalConclusion
+    final_conclusion: Optional[FinalConclusion] = None
+
+
+class SolutionResponse(SolutionPayload):
+    problem_id: int
+    method: str
+    execution_time: float
+
+    # Indica si el resultado se obtuvo de la caché
+    cache_hit: bool = False
+
+    # Identificador de la ejecución guardada (con escritura diferida puede no estar escrita aún)
+    execution_uid: Optional[str] = None
+
+    # Tiempos por fase en milisegundos: {fase: {wall_ms, cpu_ms, calls}}
+    phase_timings: Optional[Dict[str, Dict[str, float]]] = None
 
+    # Funciones más costosas según cProfile (solo con ?profile=true)
+    profile: Optional[List[Dict[str, Any]]] = None
 
+    # Memoria pico y sitios de asignación (solo con ?memory=true)
+    memory_profile: Optional[Dict[str, Any]] = None
 
+    # Nivel de detalle pedido cuando se bajó para respetar el presupuesto de memoria
+    detail_downgraded_from: Optional[str] = None
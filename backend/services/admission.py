@@ -0,0 +1,93 @@
+# services/admission.py
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Presupuesto de memoria por resolución (MB) y qué hacer si se excede: "reject" o "downgrade"
+# (con "downgrade" la respuesta indica el nivel pedido en detail_downgraded_from)
+SOLVE_MEMORY_BUDGET_MB = float(os.getenv("SOLVE_MEMORY_BUDGET_MB", "256"))
+SOLVE_MEMORY_POLICY = os.getenv("SOLVE_MEMORY_POLICY", "reject").lower()
+
+# Niveles de detalle de mayor a menor consumo
+DETAIL_LEVELS = ("full", "standard", "minimal")
+
+# Constantes calibradas con la memoria pico (tracemalloc) de benchmarks/generator.py:
+# todos los tipos de instancia de 5x5 a 40x40 en "full" y hasta 100x100 en los demás niveles.
+# La estimación queda por encima de todo lo medido (hasta ≈3x en las instancias aleatorias).
+_FIXED_BYTES = 64 * 1024
+_BYTES_PER_CELL = {"minimal": 120, "standard": 250, "full": 250}
+# En "full" cada paso copia la matriz (≈ m + n pasos de 16 bytes por celda)...
+_FULL_STEP_FACTOR = {"northwest": 1, "min_cost": 8, "vogel": 16}
+# ...y cada solución alternativa guarda su propio historial. Las alternativas salen de
+# los empates, así que crecen con el grupo más grande de costos iguales (g celdas):
+# el término es k · (m + n)² · √(m·n) · g^1.5 bytes (esquina noroeste no las busca)
+_ALTERNATIVES_FACTOR = {"northwest": 0.0, "min_cost": 12.0, "vogel": 3.5}
+
+
+def balanced_tie_profile(supply: List[int], demand: List[int], cost_array: Optional[np.ndarray] = None
+                         ) -> Tuple[int, int, Optional[int]]:
+    """
+    Dimensiones de la matriz balanceada y cantidad de celdas del grupo de costos
+    iguales más grande (la fila o columna ficticia aporta sus costos 0).
+    Sin cost_array el grupo queda en None (se asume el peor caso).
+    """
+    m, n = len(supply), len(demand)
+    dummy_cells = 0
+    if sum(supply) > sum(demand):
+        n += 1
+        dummy_cells = m
+    elif sum(demand) > sum(supply):
+        m += 1
+        dummy_cells = n
+    if cost_array is None or cost_array.size == 0:
+        return m, n, None
+    values, counts = np.unique(cost_array, return_counts=True)
+    zeros = int(counts[values == 0].sum()) + dummy_cells
+    return m, n, max(int(counts.max()), zeros)
+
+
+def estimate_solve_memory(m: int, n: int, method: str, detail: str, tie_group: Optional[int] = None) -> int:
+    """
+    Estimación (bytes) de la memoria pico de una resolución de m x n (matriz balanceada).
+    tie_group es el tamaño del grupo de costos iguales más grande; sin él se asume
+    que todos los costos empatan.
+    """
+    cells = m * n
+    estimate = _FIXED_BYTES + cells * _BYTES_PER_CELL[detail]
+    if detail == "full":
+        group = cells if tie_group is None else min(tie_group, cells)
+        estimate += cells * 16 * (m + n) * _FULL_STEP_FACTOR.get(method, 16)
+        estimate += int(_ALTERNATIVES_FACTOR.get(method, 12.0) * (m + n) ** 2 * cells ** 0.5 * group ** 1.5)
+    return estimate
+
+
+def check_admission(m: int, n: int, method: str, detail: str, tie_group: Optional[int] = None,
+                    budget_mb: Optional[float] = None, policy: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Decide si una resolución entra en el presupuesto de memoria.
+    Con la política "downgrade" se baja al mayor nivel de detalle que entra;
+    si ninguno entra (o la política es "reject") la resolución no se admite.
+    """
+    budget_bytes = int((SOLVE_MEMORY_BUDGET_MB if budget_mb is None else budget_mb) * 1024 * 1024)
+    policy = policy or SOLVE_MEMORY_POLICY
+
+    candidates = DETAIL_LEVELS[DETAIL_LEVELS.index(detail):] if policy == "downgrade" else (detail,)
+    for candidate in candidates:
+        estimated = estimate_solve_memory(m, n, method, candidate, tie_group)
+        if estimated <= budget_bytes:
+            return {
+                'admitted': True,
+                'detail': candidate,
+                'downgraded_from': detail if candidate != detail else None,
+                'estimated_bytes': estimated,
+                'budget_bytes': budget_bytes
+            }
+
+    return {
+        'admitted': False,
+        'detail': detail,
+        'downgraded_from': None,
+        'estimated_bytes': estimate_solve_memory(m, n, method, detail, tie_group),
+        'budget_bytes': budget_bytes
+    }
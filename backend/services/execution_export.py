@@ -0,0 +1,266 @@
+# services/execution_export.py
+"""
+Exportación del historial de ejecuciones en streaming.
+
+Cada ejecución se exporta como filas dispersas, una por celda con cantidad
+asignada: (origen, destino, cantidad, costo unitario, costo), en lugar de la
+matriz solution_matrix completa. Las celdas de la fila o columna ficticia se
+marcan con ficticious (su costo es 0).
+
+Las ejecuciones se leen con un cursor del servidor (yield_per) de a
+EXPORT_YIELD_PER filas y cada tanda se codifica y se envía como un fragmento de
+la respuesta: la memoria no depende del tamaño del historial. Formatos: csv,
+ndjson y parquet (este último requiere pyarrow; cada tanda es un row group).
+"""
+import csv
+import io
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+from sqlalchemy import Text, cast, select
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional; sin él se usa el codificador estándar
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow es opcional; solo lo necesita el formato parquet
+    pa = None
+
+from config.db_conexion import SessionLocal
+from models.mod_transport import ModelProblemExecution, ModelTransportProblem
+
+EXPORT_YIELD_PER = int(os.getenv("EXPORT_YIELD_PER", "1000"))
+
+COLUMNS = ('execution_id', 'execution_uid', 'problem_id', 'method', 'executed_at',
+           'origin', 'destination', 'quantity', 'unit_cost', 'cost', 'ficticious')
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+EXPORT_COLUMNS = (
+    ModelProblemExecution.id, ModelProblemExecution.uid, ModelProblemExecution.problem_id,
+    ModelProblemExecution.method, ModelProblemExecution.executed_at,
+    # Texto sin decodificar: se lee con orjson directo a NumPy
+    cast(ModelProblemExecution.solution_matrix, Text).label("solution_matrix")
+)
+
+
+def format_available(export_format: str) -> bool:
+    return export_format != "parquet" or pa is not None
+
+
+class _ProblemCosts:
+    """Costos y celdas ficticias del problema actual (las filas llegan ordenadas por problema)"""
+
+    def __init__(self, db):
+        self.db = db
+        self.problem_id = None
+        self.costs: Optional[np.ndarray] = None
+        self.ficticious_row = None
+        self.ficticious_col = None
+
+    def load(self, problem_id: int) -> None:
+        if problem_id == self.problem_id:
+            return
+        row = self.db.execute(
+            select(ModelTransportProblem.costs_blob, ModelTransportProblem.costs_json,
+                   ModelTransportProblem.balance_info)
+            .where(ModelTransportProblem.id == problem_id)
+        ).first()
+        self.problem_id = problem_id
+        self.costs = None
+        self.ficticious_row = self.ficticious_col = None
+        if row is None:
+            return
+        if row.costs_blob is not None or row.costs_json is not None:
+            self.costs = ModelTransportProblem.costs_to_array(row.costs_blob, row.costs_json)
+        balance_info = row.balance_info or {}
+        if balance_info.get("balanced", False):
+            self.ficticious_row = balance_info.get("ficticious_row")
+            self.ficticious_col = balance_info.get("ficticious_col")
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite devuelve fechas sin zona (CURRENT_TIMESTAMP está en UTC)
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _loads(text):
+    if text is None or not isinstance(text, (str, bytes)):
+        # Drivers que ya devuelven el JSON decodificado
+        return text
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+def add_sparse_rows(columns: Dict[str, list], execution, problem: _ProblemCosts) -> None:
+    """Agrega a columns (ver COLUMNS) las celdas con cantidad asignada de una ejecución"""
+    matrix = _loads(execution.solution_matrix)
+    if not matrix:
+        return
+    solution = np.asarray(matrix)
+    if solution.ndim != 2:
+        return
+    origin, destination = np.nonzero(solution)
+    count = len(origin)
+    quantity = solution[origin, destination]
+
+    ficticious = np.zeros(count, dtype=bool)
+    if problem.ficticious_row is not None:
+        ficticious |= origin == problem.ficticious_row
+    if problem.ficticious_col is not None:
+        ficticious |= destination == problem.ficticious_col
+    costs = problem.costs
+    if costs is not None:
+        inside = (origin < costs.shape[0]) & (destination < costs.shape[1])
+        unit_cost = np.zeros(count)
+        unit_cost[inside] = costs[origin[inside], destination[inside]]
+        unit_cost[ficticious] = 0
+        cost = (unit_cost * quantity).tolist()
+        unit_cost = unit_cost.tolist()
+        # Celdas fuera de la matriz que no son ficticias: costo desconocido
+        for k in np.flatnonzero(~(inside | ficticious)).tolist():
+            unit_cost[k] = cost[k] = None
+    else:
+        unit_cost = cost = [None] * count
+
+    for name, value in (('execution_id', execution.id), ('execution_uid', execution.uid),
+                        ('problem_id', execution.problem_id), ('method', execution.method),
+                        ('executed_at', _utc(execution.executed_at))):
+        columns[name].extend([value] * count)
+    columns['origin'].extend(origin.tolist())
+    columns['destination'].extend(destination.tolist())
+    columns['quantity'].extend(quantity.tolist())
+    columns['unit_cost'].extend(unit_cost)
+    columns['cost'].extend(cost)
+    columns['ficticious'].extend(ficticious.tolist())
+
+
+def _iter_chunks(problem_id: Optional[int], executed_after: Optional[datetime]) -> Iterator[Dict[str, list]]:
+    """Columnas de las filas dispersas de cada tanda de ejecuciones leída del cursor del servidor"""
+    query = select(*EXPORT_COLUMNS)
+    if problem_id is not None:
+        query = query.where(ModelProblemExecution.problem_id == problem_id)
+    if executed_after is not None:
+        query = query.where(ModelProblemExecution.executed_at >= executed_after)
+    # Orden del índice ix_problem_executions_problem_executed: los costos se leen una vez por problema
+    query = query.order_by(ModelProblemExecution.problem_id, ModelProblemExecution.executed_at,
+                           ModelProblemExecution.id)
+
+    db = SessionLocal()
+    try:
+        problem = _ProblemCosts(db)
+        result = db.execute(query.execution_options(yield_per=EXPORT_YIELD_PER))
+        for partition in result.partitions():
+            columns = {name: [] for name in COLUMNS}
+            for execution in partition:
+                problem.load(execution.problem_id)
+                add_sparse_rows(columns, execution, problem)
+            if columns['execution_id']:
+                yield columns
+    finally:
+        db.close()
+
+
+def _text_rows(columns: Dict[str, list]) -> Iterator[tuple]:
+    # Las fechas se repiten en todas las celdas de una ejecución: se formatean una vez
+    iso = {value: value.isoformat() for value in set(columns['executed_at']) if value is not None}
+    text_columns = dict(columns, executed_at=[iso.get(value) for value in columns['executed_at']])
+    return zip(*(text_columns[name] for name in COLUMNS))
+
+
+def _csv_stream(chunks: Iterator[Dict[str, list]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for columns in chunks:
+        writer.writerows(_text_rows(columns))
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _ndjson_stream(chunks: Iterator[Dict[str, list]]) -> Iterator[bytes]:
+    dumps = orjson.dumps if orjson is not None else (lambda row: json.dumps(row).encode())
+    for columns in chunks:
+        yield b"".join(dumps(dict(zip(COLUMNS, row))) + b"\n" for row in _text_rows(columns))
+
+
+class _ChunkSink(io.RawIOBase):
+    """Destino del ParquetWriter: guarda lo escrito hasta que se envía"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _parquet_schema():
+    return pa.schema([
+        ('execution_id', pa.int64()), ('execution_uid', pa.string()), ('problem_id', pa.int64()),
+        ('method', pa.string()), ('executed_at', pa.timestamp("us", tz="UTC")),
+        ('origin', pa.int32()), ('destination', pa.int32()), ('quantity', pa.float64()),
+        ('unit_cost', pa.float64()), ('cost', pa.float64()), ('ficticious', pa.bool_())
+    ])
+
+
+def _parquet_stream(chunks: Iterator[Dict[str, list]]) -> Iterator[bytes]:
+    schema = _parquet_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for columns in chunks:
+            writer.write_batch(pa.record_batch(
+                [pa.array(columns[field.name], type=field.type) for field in schema], schema=schema
+            ))
+            yield sink.take()
+    finally:
+        # Pie del archivo (metadatos de los row groups)
+        writer.close()
+    yield sink.take()
+
+
+STREAMS = {"csv": _csv_stream, "ndjson": _ndjson_stream, "parquet": _parquet_stream}
+
+
+def stream_executions(export_format: str, problem_id: Optional[int] = None,
+                      executed_after: Optional[datetime] = None) -> Iterator[bytes]:
+    """Fragmentos del archivo exportado (de un problema o de toda la base)"""
+    return STREAMS[export_format](_iter_chunks(problem_id, executed_after))
+
+
+def export_filename(export_format: str, problem_id: Optional[int] = None) -> str:
+    scope = f"problem_{problem_id}" if problem_id is not None else "all"
+    return f"executions_{scope}.{export_format}"
+
+
+def export_headers(export_format: str, problem_id: Optional[int] = None) -> Dict[str, Any]:
+    return {"Content-Disposition": f'attachment; filename="{export_filename(export_format, problem_id)}"'}
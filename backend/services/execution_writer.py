@@ -0,0 +1,325 @@
+# services/execution_writer.py
+"""
+Escritura diferida (write-behind) de las ejecuciones.
+
+Con EXECUTION_WRITE_BEHIND=1 la resolución no espera el commit: el registro se
+encola en memoria (con su uid ya asignado) y un hilo lo escribe en lotes cada
+EXECUTION_FLUSH_BATCH registros o cada EXECUTION_FLUSH_INTERVAL_MS milisegundos.
+Cada registro encolado se anota antes en un archivo de respaldo (JSON por línea).
+El respaldo se divide en segmentos (EXECUTION_SPILL_PATH.000001, .000002, ...) que
+se rotan cada EXECUTION_FLUSH_BATCH registros; un segmento se borra cuando todos
+sus registros quedaron escritos en la base, así que nunca se reescribe un archivo.
+Al arrancar se recupera lo que haya quedado, de modo que una caída del proceso no
+pierde ejecuciones. Una ruta relativa se resuelve desde el directorio backend/, no
+desde el directorio de trabajo. La ruta es por proceso: con varios workers, cada
+uno necesita la suya (si la comparten, uno recupera y borra los segmentos del otro).
+
+Las ejecuciones encoladas aparecen en el historial recién cuando se escriben.
+"""
+import glob
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config.db_conexion import SessionLocal
+from models.mod_transport import ModelProblemExecution, ModelExecutionSteps
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND = os.getenv("EXECUTION_WRITE_BEHIND", "0") == "1"
+FLUSH_BATCH_SIZE = int(os.getenv("EXECUTION_FLUSH_BATCH", "100"))
+FLUSH_INTERVAL_MS = int(os.getenv("EXECUTION_FLUSH_INTERVAL_MS", "200"))
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPILL_PATH = os.path.join(BACKEND_DIR, os.getenv("EXECUTION_SPILL_PATH", "executions.spill.jsonl"))
+
+
+def new_execution_uid() -> str:
+    """Identificador de la ejecución, asignado antes de escribirla"""
+    return uuid.uuid4().hex
+
+
+def _execution_values(record: Dict[str, Any]) -> Dict[str, Any]:
+    fields = {key: value for key, value in record.items() if key != 'step_by_step'}
+    if isinstance(fields.get('executed_at'), str):
+        fields['executed_at'] = datetime.fromisoformat(fields['executed_at'])
+    return fields
+
+
+def build_execution(record: Dict[str, Any]) -> ModelProblemExecution:
+    """Crea la ejecución (con su historial de pasos comprimido) a partir de un registro"""
+    execution = ModelProblemExecution(**_execution_values(record))
+    execution.set_steps(record.get('step_by_step'))
+    return execution
+
+
+def insert_executions(db: Session, records: List[Dict[str, Any]]) -> None:
+    """
+    Inserta un lote de ejecuciones con INSERT de varias filas: uno para las
+    ejecuciones, una consulta por uid para conocer sus id y uno para los pasos.
+    """
+    db.execute(insert(ModelProblemExecution), [_execution_values(record) for record in records])
+    steps_by_uid = {record['uid']: record['step_by_step'] for record in records
+                    if record.get('step_by_step') is not None}
+    if not steps_by_uid:
+        return
+    ids = dict(db.query(ModelProblemExecution.uid, ModelProblemExecution.id)
+               .filter(ModelProblemExecution.uid.in_(list(steps_by_uid))))
+    db.execute(insert(ModelExecutionSteps), [
+        {'execution_id': ids[uid], **ModelExecutionSteps.values_for(steps)}
+        for uid, steps in steps_by_uid.items()
+    ])
+
+
+class ExecutionWriter:
+    """Cola en memoria de ejecuciones pendientes con un hilo que las escribe en lotes"""
+
+    def __init__(self, session_factory: Callable = SessionLocal, batch_size: int = FLUSH_BATCH_SIZE,
+                 interval_ms: int = FLUSH_INTERVAL_MS, spill_path: str = SPILL_PATH):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.interval_s = interval_ms / 1000
+        self.spill_path = spill_path
+        # Pendientes como (segmento del respaldo, registro), en orden de llegada
+        self._pending: List[Tuple[int, Dict[str, Any]]] = []
+        self._condition = threading.Condition()
+        # Solo un flush a la vez (el del hilo o el del apagado)
+        self._flush_lock = threading.Lock()
+        self._spill = None
+        self._segment = 0
+        self._segment_lines = 0
+        # Registros todavía no escritos en la base, por segmento
+        self._segment_pending: Dict[int, int] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.written = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        """Recupera lo pendiente del archivo de respaldo y arranca el hilo de escritura"""
+        if self.running:
+            return
+        recovered_segments = self._spill_segments()
+        recovered = self._load_spill(recovered_segments)
+        with self._condition:
+            self._pending = []
+            self._segment_pending = {}
+            self._segment = recovered_segments[-1][0] if recovered_segments else 0
+            self._stopping = False
+            self._open_segment()
+            # Lo recuperado pasa a un segmento nuevo antes de borrar los anteriores
+            for record in recovered:
+                self._append(record)
+        for _, path in recovered_segments:
+            os.remove(path)
+        if recovered:
+            logger.info("Ejecuciones recuperadas del respaldo", extra={'count': len(recovered)})
+        self._thread = threading.Thread(target=self._run, name="execution-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Escribe lo pendiente y detiene el hilo (apagado ordenado)"""
+        if not self.running:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self._thread.join()
+        self._thread = None
+        with self._condition:
+            remaining = len(self._pending)
+            self._close_segment()
+        if remaining:
+            # Quedan en el archivo de respaldo para el próximo arranque
+            logger.warning("Ejecuciones sin escribir al apagar", extra={'count': remaining})
+
+    def enqueue(self, record: Dict[str, Any]) -> None:
+        """Encola una ejecución; queda en el respaldo antes de volver"""
+        record = dict(record)
+        record.setdefault('executed_at', datetime.now(timezone.utc).isoformat())
+        with self._condition:
+            self._append(record)
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify()
+
+    def flush(self) -> int:
+        """
+        Escribe lo pendiente en lotes de batch_size (una transacción por lote);
+        retorna cuántas ejecuciones se escribieron.
+        """
+        total = 0
+        with self._flush_lock:
+            while True:
+                with self._condition:
+                    entries = self._pending[:self.batch_size]
+                if not entries:
+                    return total
+                batch = [record for _, record in entries]
+                try:
+                    written = self._write(batch)
+                except Exception:
+                    # Base no disponible: se reintenta en el próximo ciclo, el respaldo sigue intacto
+                    self.failed_flushes += 1
+                    logger.exception("No se pudieron escribir las ejecuciones", extra={'count': len(batch)})
+                    return total
+                with self._condition:
+                    # Solo este método quita elementos: los primeros len(batch) son los escritos
+                    del self._pending[:len(batch)]
+                    finished = self._release_segments(segment for segment, _ in entries)
+                # Segmentos ya escritos por completo: se borran fuera del lock
+                for segment in finished:
+                    self._remove_segment(segment)
+                self.written += written
+                total += written
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            pending = len(self._pending)
+        return {
+            'running': self.running,
+            'pending': pending,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed_flushes': self.failed_flushes
+        }
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if not self._stopping and len(self._pending) < self.batch_size:
+                    self._condition.wait(self.interval_s)
+                stopping = self._stopping
+            self.flush()
+            if stopping:
+                return
+
+    def _write(self, batch: List[Dict[str, Any]]) -> int:
+        """
+        Inserta el lote en una sola transacción. Si choca con una restricción, se
+        escribe fila por fila y se descartan solo los registros que nunca podrían escribirse.
+        """
+        db = self.session_factory()
+        try:
+            insert_executions(db, batch)
+            db.commit()
+            return len(batch)
+        except IntegrityError:
+            db.rollback()
+        finally:
+            db.close()
+
+        written = 0
+        for record in batch:
+            db = self.session_factory()
+            try:
+                insert_executions(db, [record])
+                db.commit()
+                written += 1
+            except IntegrityError:
+                db.rollback()
+                self.dropped += 1
+                logger.error("Ejecución descartada: viola una restricción", extra={
+                    'uid': record.get('uid'), 'problem_id': record.get('problem_id')
+                })
+            finally:
+                db.close()
+        return written
+
+    def _segment_path(self, segment: int) -> str:
+        return f"{self.spill_path}.{segment:06d}"
+
+    def _spill_segments(self) -> List[Tuple[int, str]]:
+        """Segmentos del respaldo en disco, en orden (el archivo único anterior va primero)"""
+        segments = []
+        if os.path.exists(self.spill_path):
+            segments.append((0, self.spill_path))
+        for path in glob.glob(glob.escape(self.spill_path) + ".*"):
+            suffix = path[len(self.spill_path) + 1:]
+            if suffix.isdigit():
+                segments.append((int(suffix), path))
+        return sorted(segments)
+
+    def _load_spill(self, segments: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
+        """Registros del respaldo que todavía no están en la base"""
+        records = []
+        for _, path in segments:
+            with open(path, encoding="utf-8") as spill:
+                for line in spill:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # Última línea cortada por una caída a mitad de escritura
+                        continue
+        if not records:
+            return []
+
+        # Una caída entre el commit y el borrado del segmento deja registros ya escritos
+        db = self.session_factory()
+        try:
+            uids = [record['uid'] for record in records]
+            existing = {uid for uid, in db.query(ModelProblemExecution.uid)
+                        .filter(ModelProblemExecution.uid.in_(uids))}
+        finally:
+            db.close()
+        return [record for record in records if record['uid'] not in existing]
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        """Anota el registro en el segmento actual y lo encola (llamar con el lock tomado)"""
+        if self._segment_lines >= self.batch_size:
+            self._rotate_segment()
+        self._spill.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n")
+        self._spill.flush()
+        self._segment_lines += 1
+        self._segment_pending[self._segment] = self._segment_pending.get(self._segment, 0) + 1
+        self._pending.append((self._segment, record))
+
+    def _open_segment(self) -> None:
+        self._segment += 1
+        self._segment_lines = 0
+        self._spill = open(self._segment_path(self._segment), "a", encoding="utf-8")
+
+    def _close_segment(self) -> None:
+        """Cierra el segmento actual; si no le queda nada pendiente, se borra"""
+        self._spill.close()
+        self._spill = None
+        if not self._segment_pending.get(self._segment):
+            self._segment_pending.pop(self._segment, None)
+            self._remove_segment(self._segment)
+
+    def _rotate_segment(self) -> None:
+        self._close_segment()
+        self._open_segment()
+
+    def _release_segments(self, segments) -> List[int]:
+        """
+        Descuenta los registros escritos de sus segmentos; retorna los segmentos
+        cerrados que ya no tienen pendientes (llamar con el lock tomado)
+        """
+        finished = []
+        for segment in segments:
+            self._segment_pending[segment] -= 1
+            if not self._segment_pending[segment] and segment != self._segment:
+                del self._segment_pending[segment]
+                finished.append(segment)
+        return finished
+
+    def _remove_segment(self, segment: int) -> None:
+        try:
+            os.remove(self._segment_path(segment))
+        except FileNotFoundError:
+            pass
+
+
+execution_writer = ExecutionWriter()
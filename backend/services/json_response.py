@@ -0,0 +1,23 @@
+# services/json_response.py
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional; sin él se usa el codificador estándar
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Respuesta JSON que codifica directamente a bytes con orjson.
+
+    Se usa con contenido ya validado: FastAPI no vuelve a validar contra
+    response_model cuando la ruta retorna una Response.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+        return super().render(content)
@@ -0,0 +1,288 @@
+# services/metrics.py
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Límites de los buckets de tamaño (m·n celdas de la matriz balanceada): potencias de 4
+# hasta 2048x2048 para cubrir los tamaños del banco de pruebas (hasta 2000x2000)
+SIZE_BUCKETS = tuple(4 ** power for power in range(2, 12))
+
+# Buckets de latencia en segundos (las resoluciones con detalle "full" tardan decenas de segundos)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+                   30.0, 60.0, 120.0, 300.0)
+# Buckets de las fases: pocas por serie, porque hay una serie por método y fase
+PHASE_BUCKETS = (0.001, 0.01, 0.1, 1.0, 10.0, 60.0)
+DB_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+# Buckets de tamaño de respuesta en bytes
+BYTES_BUCKETS = (512, 2048, 8192, 32768, 131072, 524288, 2097152, 8388608)
+# Buckets de memoria pico en bytes
+MEMORY_BUCKETS = tuple(2 ** power for power in range(16, 33, 2))
+
+
+def size_bucket(m: int, n: int) -> str:
+    """Etiqueta del bucket de tamaño del problema según m·n"""
+    cells = m * n
+    for limit in SIZE_BUCKETS:
+        if cells <= limit:
+            return f"le_{limit}"
+    return f"gt_{SIZE_BUCKETS[-1]}"
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Contador monótono con etiquetas"""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram:
+    """Histograma de buckets fijos con etiquetas; los conteos se acumulan al exportar"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Por etiqueta: [conteos por bucket (+Inf al final), suma, total]
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._values.items()]
+        for labels, counts, total, count in values:
+            cumulative = 0
+            for limit, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(limit)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}"
+
+
+class CallbackGauge:
+    """Gauge cuyo valor se lee al exportar (p. ej. estadísticas de la caché)"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.labelnames = ()
+
+    def samples(self) -> Iterable[str]:
+        yield f"{self.name} {_format_value(self.callback())}"
+
+
+class CallbackCounter(CallbackGauge):
+    """Contador monótono cuyo valor se lee al exportar (se reinicia con el proceso)"""
+    kind = "counter"
+
+
+class MetricsRegistry:
+    """Registro de métricas exportadas en formato de texto de Prometheus"""
+
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+SOLVE_DURATION = registry.register(Histogram(
+    "transport_solve_duration_seconds", "Duración de la resolución sin caché",
+    ("method", "size_bucket")
+))
+SOLVE_PHASE_DURATION = registry.register(Histogram(
+    "transport_solve_phase_duration_seconds", "Duración de cada fase de la resolución",
+    ("method", "phase"), buckets=PHASE_BUCKETS
+))
+SOLVES_TOTAL = registry.register(Counter(
+    "transport_solves_total", "Resoluciones atendidas", ("method", "detail", "cache")
+))
+TIES_TOTAL = registry.register(Counter(
+    "transport_ties_detected_total", "Empates detectados por los algoritmos", ("method",)
+))
+ALTERNATIVES_TOTAL = registry.register(Counter(
+    "transport_alternative_solutions_total", "Soluciones alternativas exploradas", ("method",)
+))
+DB_QUERY_DURATION = registry.register(Histogram(
+    "transport_db_query_duration_seconds", "Duración de las consultas a la base de datos",
+    ("operation",), buckets=DB_LATENCY_BUCKETS
+))
+SOLVE_PEAK_MEMORY = registry.register(Histogram(
+    "transport_solve_peak_memory_bytes", "Memoria pico de las resoluciones medidas con ?memory=true",
+    ("method", "size_bucket"), buckets=MEMORY_BUCKETS
+))
+ADMISSIONS_TOTAL = registry.register(Counter(
+    "transport_solve_admissions_total", "Decisiones del control de admisión por memoria",
+    ("method", "outcome")
+))
+RESPONSE_SIZE = registry.register(Histogram(
+    "transport_http_response_size_bytes", "Tamaño del cuerpo de las respuestas HTTP",
+    ("route", "status"), buckets=BYTES_BUCKETS
+))
+
+
+def register_cache_metrics(cache) -> None:
+    """Exporta las estadísticas de la caché de resoluciones"""
+    for field, documentation in (
+        ("hits", "Aciertos de la caché (memoria + base de datos)"),
+        ("misses", "Fallos de la caché"),
+    ):
+        registry.register(CallbackCounter(
+            f"transport_cache_{field}_total", documentation,
+            lambda field=field: cache.stats()[field]
+        ))
+    for field, documentation in (
+        ("hit_ratio", "Proporción de aciertos de la caché"),
+        ("entries", "Entradas en la caché en memoria"),
+    ):
+        registry.register(CallbackGauge(
+            f"transport_cache_{field}", documentation,
+            lambda field=field: cache.stats()[field]
+        ))
+
+
+def register_writer_metrics(writer) -> None:
+    """Exporta el estado de la escritura diferida de ejecuciones"""
+    for field, documentation in (
+        ("written", "Ejecuciones escritas por la escritura diferida"),
+        ("dropped", "Ejecuciones descartadas por violar una restricción"),
+        ("failed_flushes", "Lotes que fallaron y se reintentarán"),
+    ):
+        registry.register(CallbackCounter(
+            f"transport_execution_writer_{field}_total", documentation,
+            lambda field=field: writer.stats()[field]
+        ))
+    registry.register(CallbackGauge(
+        "transport_execution_writer_pending", "Ejecuciones encoladas sin escribir",
+        lambda: writer.stats()['pending']
+    ))
+
+
+def register_solver_pool_metrics(pool) -> None:
+    """Exporta el estado del pool de resolución"""
+    for field, documentation in (
+        ("completed", "Resoluciones terminadas en el pool"),
+        ("rejected", "Resoluciones rechazadas con 503 por cola llena o espera excesiva"),
+    ):
+        registry.register(CallbackCounter(
+            f"transport_solver_pool_{field}_total", documentation,
+            lambda field=field: pool.stats()[field]
+        ))
+    for field, documentation in (
+        ("in_flight", "Resoluciones en curso o en cola"),
+        ("estimated_wait_s", "Espera estimada en cola para una resolución nueva"),
+    ):
+        registry.register(CallbackGauge(
+            f"transport_solver_pool_{field}", documentation,
+            lambda field=field: pool.stats()[field]
+        ))
+
+
+def record_solve(method: str, detail: str, cache_hit: bool, m: int, n: int,
+                 execution_time: float, outcome: dict = None, phase_timings: dict = None,
+                 memory_profile: dict = None) -> None:
+    """
+    Registra una resolución; outcome (resultado de run_solve) y phase_timings
+    solo existen cuando no hubo acierto de caché
+    """
+    SOLVES_TOTAL.inc(method, detail, "hit" if cache_hit else "miss")
+    if cache_hit:
+        return
+    SOLVE_DURATION.observe(execution_time, method, size_bucket(m, n))
+    if memory_profile is not None:
+        SOLVE_PEAK_MEMORY.observe(memory_profile['peak_bytes'], method, size_bucket(m, n))
+    for phase, timing in (phase_timings or {}).items():
+        SOLVE_PHASE_DURATION.observe(timing['wall_ms'] / 1000, method, phase)
+    if outcome is not None:
+        if outcome['ties']:
+            TIES_TOTAL.inc(method, amount=outcome['ties'])
+        if outcome['alternatives']:
+            ALTERNATIVES_TOTAL.inc(method, amount=outcome['alternatives'])
+
+
+def record_admission(method: str, decision: dict) -> None:
+    if not decision['admitted']:
+        outcome = "rejected"
+    elif decision['downgraded_from']:
+        outcome = "downgraded"
+    else:
+        outcome = "admitted"
+    ADMISSIONS_TOTAL.inc(method, outcome)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Mide cada consulta SQL del engine, etiquetada por operación (SELECT, INSERT, ...)"""
+
+    # El inicio se guarda en el contexto de la ejecución: una consulta que falla
+    # no llega a after_cursor_execute y su contexto se descarta con ella
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_start
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        DB_QUERY_DURATION.observe(elapsed, operation)
@@ -0,0 +1,236 @@
+# services/problem_import.py
+"""
+Importación masiva de problemas desde archivos.
+
+Formatos (se reconocen por la extensión):
+  - .csv: un problema por archivo, en forma de tabla de transporte. Cada fila
+    tiene los costos de un origen y, en la última columna, su oferta; la última
+    fila tiene la demanda de cada destino (la celda de la esquina se ignora).
+    Una primera fila no numérica se toma como encabezado.
+  - .npy: un problema por archivo, la misma tabla como arreglo 2D de NumPy.
+  - .ndjson / .jsonl: un problema por línea, con los campos de POST /problems/
+    (name, description, supply, demand, costs).
+
+Los archivos se leen de a una fila (o línea) por vez y los costos se guardan
+directo como arreglo de NumPy, sin armar la matriz como objetos de Python ni
+validarla celda por celda con pydantic. Los problemas se insertan en lotes de
+IMPORT_BATCH_SIZE filas, con un commit por lote; los registros inválidos se
+omiten y se informan en la respuesta.
+"""
+import csv
+import io
+import json
+import os
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional; sin él se usa el decodificador estándar
+    orjson = None
+
+import algorithms.balance as balance
+from models.matrix_blob import encode_matrix
+from models.mod_transport import ModelTransportProblem
+from services.solve_cache import problem_content_hash
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+# Errores detallados en la respuesta; el resto solo se cuenta
+MAX_REPORTED_ERRORS = 100
+
+FORMATS = {".csv": "csv", ".npy": "npy", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+class ImportRecordError(ValueError):
+    """Registro inválido dentro de un archivo; no interrumpe la importación"""
+
+
+def detect_format(filename: str) -> Optional[str]:
+    return FORMATS.get(os.path.splitext(filename or "")[1].lower())
+
+
+def _name_from(filename: str) -> str:
+    return os.path.splitext(os.path.basename(filename))[0][:100] or "importado"
+
+
+def _as_quantities(values, label: str) -> List[int]:
+    """Ofertas o demandas: enteros no negativos"""
+    try:
+        array = np.asarray(values, dtype="<f8")
+    except (TypeError, ValueError):
+        raise ImportRecordError(f"{label} debe ser una lista de números")
+    if array.ndim != 1 or array.size == 0:
+        raise ImportRecordError(f"{label} debe ser una lista no vacía")
+    if not np.all(np.isfinite(array)) or np.any(array < 0) or np.any(array != np.floor(array)):
+        raise ImportRecordError(f"{label} debe contener enteros no negativos")
+    return array.astype(np.int64).tolist()
+
+
+def problem_values(name: str, description: Optional[str], supply, demand, costs) -> Dict[str, Any]:
+    """Valida un problema y arma los valores de su fila (costos ya codificados y balanceo calculado)"""
+    if not isinstance(name, str) or not name.strip():
+        raise ImportRecordError("name es obligatorio")
+    if description is not None and not isinstance(description, str):
+        raise ImportRecordError("description debe ser texto")
+    supply = _as_quantities(supply, "supply")
+    demand = _as_quantities(demand, "demand")
+    try:
+        costs = np.asarray(costs, dtype="<f8")
+    except (TypeError, ValueError):
+        raise ImportRecordError("costs debe ser una matriz numérica")
+    if costs.shape != (len(supply), len(demand)):
+        raise ImportRecordError(
+            f"costs debe ser de {len(supply)}x{len(demand)} (recibido {'x'.join(map(str, costs.shape))})"
+        )
+    if not np.all(np.isfinite(costs)):
+        raise ImportRecordError("costs contiene valores no finitos")
+
+    balanced = balance.balance_problem(supply, demand, costs)
+    return {
+        'name': name[:100],
+        'description': description,
+        'supply': supply,
+        'demand': demand,
+        'm': len(supply),
+        'n': len(demand),
+        'costs_blob': encode_matrix(costs),
+        'costs_json': None,
+        'balance_info': balanced.balance_info,
+        'content_hash': problem_content_hash(supply, demand, costs)
+    }
+
+
+def _from_tableau(tableau: np.ndarray, name: str, description: Optional[str]) -> Dict[str, Any]:
+    """Problema a partir de la tabla de transporte (costos | oferta, y la fila de demanda)"""
+    if tableau.ndim != 2 or tableau.shape[0] < 2 or tableau.shape[1] < 2:
+        raise ImportRecordError("La tabla debe tener al menos una fila de costos y la fila de demanda")
+    return problem_values(name, description, tableau[:-1, -1], tableau[-1, :-1], tableau[:-1, :-1])
+
+
+def _parse_csv_row(row: List[str], width: Optional[int]) -> np.ndarray:
+    cells = [cell.strip() for cell in row]
+    if width is not None and len(cells) == width - 1:
+        # Fila de demanda sin la celda de la esquina
+        cells.append("")
+    if width is not None and len(cells) != width:
+        raise ImportRecordError(f"se esperaban {width} columnas y hay {len(cells)}")
+    try:
+        # Una celda vacía queda como NaN (válido solo en la esquina)
+        return np.array([cell or "nan" for cell in cells], dtype="<f8")
+    except ValueError:
+        raise ImportRecordError("hay valores no numéricos")
+
+
+def read_csv(file: IO[bytes], filename: str, description: Optional[str]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        rows = []
+        width = None
+        header_allowed = True
+        for line_number, row in enumerate(csv.reader(text), start=1):
+            if not any(cell.strip() for cell in row):
+                continue
+            try:
+                rows.append(_parse_csv_row(row, width))
+            except ImportRecordError as e:
+                if header_allowed and not rows:
+                    # Encabezado con los nombres de los destinos
+                    header_allowed = False
+                    continue
+                raise ImportRecordError(f"Línea {line_number}: {e}")
+            width = len(rows[-1])
+        if not rows:
+            raise ImportRecordError("El archivo no tiene filas")
+        tableau = np.vstack(rows)
+    finally:
+        # El archivo subido lo cierra quien lo abrió
+        text.detach()
+    yield 1, _from_tableau(tableau, _name_from(filename), description)
+
+
+def read_npy(file: IO[bytes], filename: str, description: Optional[str]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    try:
+        tableau = np.lib.format.read_array(file, allow_pickle=False)
+    except ValueError as e:
+        raise ImportRecordError(f"Archivo .npy inválido: {e}")
+    if tableau.dtype.kind not in "iuf":
+        raise ImportRecordError("El arreglo .npy debe ser numérico")
+    yield 1, _from_tableau(tableau.astype("<f8", copy=False), _name_from(filename), description)
+
+
+def read_ndjson(file: IO[bytes], filename: str, description: Optional[str]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    for line_number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = orjson.loads(line) if orjson is not None else json.loads(line)
+        except ValueError:
+            yield line_number, ImportRecordError("JSON inválido")
+            continue
+        if not isinstance(record, dict):
+            yield line_number, ImportRecordError("Cada línea debe ser un objeto JSON")
+            continue
+        try:
+            yield line_number, problem_values(
+                record.get('name'), record.get('description', description),
+                record.get('supply'), record.get('demand'), record.get('costs')
+            )
+        except ImportRecordError as e:
+            yield line_number, e
+
+
+READERS = {"csv": read_csv, "npy": read_npy, "ndjson": read_ndjson}
+
+
+class ProblemImporter:
+    """Acumula los problemas leídos e inserta cada lote en una transacción"""
+
+    def __init__(self, db: Session, batch_size: int = IMPORT_BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+        self._batch: List[Dict[str, Any]] = []
+        self.imported = 0
+        self.failed = 0
+        self.batches = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def import_file(self, file: IO[bytes], filename: str, description: Optional[str] = None) -> None:
+        file_format = detect_format(filename)
+        if file_format is None:
+            self._error(filename, None, f"Formato no soportado (use {', '.join(sorted(FORMATS))})")
+            return
+        try:
+            for line, values in READERS[file_format](file, filename, description):
+                if isinstance(values, ImportRecordError):
+                    self._error(filename, line, str(values))
+                    continue
+                self._batch.append(values)
+                if len(self._batch) >= self.batch_size:
+                    self.flush()
+        except (ImportRecordError, UnicodeDecodeError, csv.Error) as e:
+            self._error(filename, None, str(e))
+
+    def flush(self) -> None:
+        if not self._batch:
+            return
+        self.db.execute(insert(ModelTransportProblem), self._batch)
+        self.db.commit()
+        self.imported += len(self._batch)
+        self.batches += 1
+        self._batch = []
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'imported': self.imported,
+            'failed': self.failed,
+            'batches': self.batches,
+            'errors': self.errors
+        }
+
+    def _error(self, filename: str, line: Optional[int], detail: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'file': filename, 'line': line, 'detail': detail})
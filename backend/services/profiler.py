@@ -0,0 +1,74 @@
+# services/profiler.py
+import cProfile
+import pstats
+import threading
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+# Cantidad de funciones que se devuelven con ?profile=true
+PROFILE_TOP_N = 25
+# Cantidad de sitios de asignación que se devuelven con ?memory=true
+MEMORY_TOP_N = 10
+
+# tracemalloc es global al proceso: solo una resolución a la vez mide memoria
+_memory_lock = threading.Lock()
+
+
+def run_profiled(func: Callable, *args, top_n: int = PROFILE_TOP_N, **kwargs) -> Tuple[Any, List[Dict[str, Any]]]:
+    """
+    Ejecuta func bajo cProfile y retorna su resultado junto con las top_n funciones
+    ordenadas por tiempo acumulado.
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args, **kwargs)
+
+    stats = pstats.Stats(profiler)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE)
+    entries = []
+    for filename, line, name in stats.fcn_list[:top_n]:
+        primitive_calls, total_calls, total_time, cumulative_time, _ = stats.stats[(filename, line, name)]
+        entries.append({
+            'function': f"{filename}:{line}({name})",
+            'calls': total_calls,
+            'primitive_calls': primitive_calls,
+            'total_ms': round(total_time * 1000, 3),
+            'cumulative_ms': round(cumulative_time * 1000, 3)
+        })
+    return result, entries
+
+
+def run_memory_tracked(func: Callable, *args, top_n: int = MEMORY_TOP_N, **kwargs) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Ejecuta func con tracemalloc activo y retorna su resultado junto con la memoria
+    pico (bytes sobre la memoria al iniciar) y los top_n sitios que retienen más
+    memoria al terminar. Las asignaciones de otros hilos durante la ejecución
+    también se cuentan.
+    """
+    with _memory_lock:
+        already_tracing = tracemalloc.is_tracing()
+        if not already_tracing:
+            tracemalloc.start()
+        try:
+            baseline, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            result = func(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            if not already_tracing:
+                tracemalloc.stop()
+
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ))
+    top_allocations = [
+        {
+            'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            'size_bytes': stat.size,
+            'count': stat.count
+        }
+        for stat in snapshot.statistics("lineno")[:top_n]
+    ]
+    return result, {'peak_bytes': peak - baseline, 'top_allocations': top_allocations}
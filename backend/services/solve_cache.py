@@ -0,0 +1,196 @@
+# services/solve_cache.py
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from models.mod_transport import ModelSolveCache
+from models.step_blob import encode_json
+
+# Incrementar cuando cambie la salida de los algoritmos para invalidar entradas viejas
+CACHE_VERSION = 3
+
+
+def problem_content_hash(supply: List[int], demand: List[int], costs) -> str:
+    """
+    Huella del contenido del problema (oferta, demanda y costos canonicalizados).
+    Se guarda en la fila al crear o importar el problema, para que la clave de
+    caché no tenga que recorrer la matriz en cada resolución.
+
+    Los costos se normalizan a float64 little-endian, de modo que 5 y 5.0
+    producen la misma huella.
+    """
+    digest = hashlib.sha256()
+    digest.update(np.asarray(supply, dtype="<i8").tobytes())
+    digest.update(b"|")
+    digest.update(np.asarray(demand, dtype="<i8").tobytes())
+    digest.update(b"|")
+    cost_array = np.asarray(costs, dtype="<f8")
+    digest.update(np.asarray(cost_array.shape, dtype="<i8").tobytes())
+    digest.update(np.ascontiguousarray(cost_array).tobytes())
+    return digest.hexdigest()
+
+
+def make_cache_key(content_hash: str, method: str, options: Optional[Dict[str, Any]] = None) -> str:
+    """Genera la clave de caché a partir de la huella del problema, el método y las opciones"""
+    digest = hashlib.sha256()
+    digest.update(f"v{CACHE_VERSION}|{method}|".encode())
+    digest.update(json.dumps(options or {}, sort_keys=True, separators=(",", ":")).encode())
+    digest.update(f"|{content_hash}".encode())
+    return digest.hexdigest()
+
+
+# INSERT ... ON CONFLICT de cada motor
+INSERT_BY_DIALECT = {
+    'postgresql': postgresql_insert,
+    'sqlite': sqlite_insert,
+}
+
+
+class SolveCache:
+    """
+    Caché de resultados en dos niveles: LRU en memoria + tabla persistente.
+
+    La tabla guarda el resultado comprimido y se acota por antigüedad (db_ttl_s:
+    las entradas vencidas no se usan) y por cantidad de filas (db_max_rows). La
+    poda borra las vencidas y las más viejas que excedan el límite; corre dentro
+    de put cada prune_every escrituras, en la misma transacción.
+    """
+
+    def __init__(self, max_entries: int = 256, db_max_rows: int = 10000,
+                 db_ttl_s: int = 7 * 24 * 3600, prune_every: int = 100):
+        self.max_entries = max_entries
+        self.db_max_rows = db_max_rows
+        self.db_ttl_s = db_ttl_s
+        self.prune_every = prune_every
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts_since_prune = 0
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.db_pruned = 0
+
+    def get(self, key: str, db: Session) -> Optional[Dict[str, Any]]:
+        """Busca un resultado primero en memoria y luego en la base de datos"""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return payload
+
+        row = (db.query(ModelSolveCache)
+               .filter(ModelSolveCache.key == key, ModelSolveCache.created_at >= self._expiry_cutoff())
+               .first())
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        payload = row.get_result()
+        with self._lock:
+            self.db_hits += 1
+            self._remember(key, payload)
+        return payload
+
+    def put(self, key: str, method: str, payload: Dict[str, Any], db: Session) -> None:
+        """
+        Guarda un resultado en ambos niveles.
+        La fila se agrega a la transacción de db: el commit lo hace quien llama.
+        """
+        with self._lock:
+            self._remember(key, payload)
+
+        codec, blob, raw_size = encode_json(payload)
+        values = {'key': key, 'method': method, 'codec': codec, 'payload': blob, 'raw_size': raw_size}
+        insert = INSERT_BY_DIALECT.get(db.get_bind().dialect.name)
+        # Si la clave ya existe (otra petición guardó el mismo problema o quedó una entrada
+        # vencida) se reemplaza el resultado y se renueva created_at
+        refreshed = {'codec': codec, 'payload': blob, 'raw_size': raw_size, 'result': None,
+                     'created_at': func.now()}
+        if insert is not None:
+            db.execute(insert(ModelSolveCache).values(**values)
+                       .on_conflict_do_update(index_elements=['key'], set_=refreshed))
+        else:
+            existing = db.get(ModelSolveCache, key)
+            if existing is None:
+                db.add(ModelSolveCache(**values))
+            else:
+                for column, value in refreshed.items():
+                    setattr(existing, column, value)
+
+        with self._lock:
+            self._puts_since_prune += 1
+            prune = self._puts_since_prune >= self.prune_every
+            if prune:
+                self._puts_since_prune = 0
+        if prune:
+            self.prune(db)
+
+    def prune(self, db: Session) -> int:
+        """
+        Borra de la tabla las entradas vencidas y las más viejas por encima de
+        db_max_rows. Se agrega a la transacción de db; retorna las filas borradas.
+        """
+        removed = db.execute(
+            delete(ModelSolveCache).where(ModelSolveCache.created_at < self._expiry_cutoff())
+        ).rowcount
+        overflow = (select(ModelSolveCache.key)
+                    .order_by(ModelSolveCache.created_at.desc(), ModelSolveCache.key)
+                    .offset(self.db_max_rows)
+                    .scalar_subquery())
+        removed += db.execute(
+            delete(ModelSolveCache).where(ModelSolveCache.key.in_(overflow))
+        ).rowcount
+        with self._lock:
+            self.db_pruned += removed
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.memory_hits + self.db_hits
+            lookups = hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "hits": hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "db_pruned": self.db_pruned,
+                "hit_ratio": hits / lookups if lookups else 0.0
+            }
+
+    def _expiry_cutoff(self) -> datetime:
+        return datetime.now(timezone.utc) - timedelta(seconds=self.db_ttl_s)
+
+    def _remember(self, key: str, payload: Dict[str, Any]) -> None:
+        """Inserta en el LRU expulsando la entrada menos usada (llamar con el lock tomado)"""
+        self._entries[key] = payload
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+solve_cache = SolveCache(
+    max_entries=int(os.getenv("SOLVE_CACHE_MAX_ENTRIES", "256")),
+    db_max_rows=int(os.getenv("SOLVE_CACHE_DB_MAX_ROWS", "10000")),
+    db_ttl_s=int(os.getenv("SOLVE_CACHE_DB_TTL_S", str(7 * 24 * 3600)))
+)
@@ -0,0 +1,119 @@
+# services/solve_runner.py
+"""
+Una resolución completa (balanceo, algoritmo y armado del payload validado).
+
+Es el trabajo que se envía a los procesos del pool de resolución: no depende de
+la base de datos ni de la aplicación, y todo lo que recibe y retorna se puede
+serializar con pickle.
+"""
+import time
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+import algorithms.balance as balance
+import algorithms.min_cost as min_cost
+import algorithms.northwest_corner as northwest
+import algorithms.vogel as vogel
+from algorithms.phase_timer import MemoryPhaseTimer, PhaseTimer
+from config.logging_config import bind_request
+from schemas.schema_transport import SolutionPayload
+from services.profiler import run_memory_tracked, run_profiled
+
+# Métodos disponibles
+SOLVERS = {
+    "northwest": northwest.northwest_corner,
+    "vogel": vogel.vogel_approximation,
+    "min_cost": min_cost.min_cost_method
+}
+
+
+# Campos del payload que cada nivel de detalle agrega sobre el anterior
+ANALYSIS_FIELDS = (
+    'basic_variables', 'non_basic_variables', 'is_balanced', 'total_supply', 'total_demand',
+    'degeneracy_info', 'm', 'n', 'required_basic_variables', 'actual_basic_variables',
+    'has_degeneracy', 'transport_summary'
+)
+
+
+def build_solution_payload(result: dict, detail: str) -> dict:
+    """Arma y valida el payload de la respuesta con los campos calculados según el nivel de detalle"""
+    data = {
+        'main_solution': result['main_solution'],
+        'total_cost': result['total_cost']
+    }
+    if detail != "minimal":
+        # Nueva información de análisis
+        for field in ANALYSIS_FIELDS:
+            data[field] = result[field]
+    if detail == "full":
+        data.update({
+            'step_by_step': result['steps'],
+            'alternative_solutions': result.get('alternative_solutions', []),
+            'has_multiple_solutions': result.get('has_multiple_solutions', False),
+            'tie_scenarios': result.get('tie_scenarios', []),
+            'final_conclusion': result['final_conclusion']
+        })
+
+    validated = SolutionPayload.model_validate(data)
+    return validated.model_dump(mode="json", include=set(data))
+
+
+def _run_solver(run: Callable, profile: bool):
+    """Ejecuta la resolución, bajo cProfile si se pidió; retorna (resultado, estadísticas de cProfile)"""
+    if profile:
+        return run_profiled(run)
+    return run(), None
+
+
+def run_solve(method: str, supply: List[int], demand: List[int], cost_array: np.ndarray,
+              balance_info: Optional[dict], detail: str, profile: bool = False,
+              memory: bool = False, log_context: Optional[tuple] = None) -> Dict[str, Any]:
+    """
+    Resuelve un problema y retorna el payload ya validado, el tiempo de ejecución
+    (algoritmo + validación), los tiempos por fase y, si se pidieron, las
+    estadísticas de cProfile y de memoria. log_context es el (request_id,
+    debug_sampled) de la petición, para que los logs del proceso del pool se correlacionen.
+    """
+    if log_context is not None:
+        bind_request(*log_context)
+    timer = MemoryPhaseTimer() if memory else PhaseTimer()
+    profile_stats = None
+    memory_profile = None
+
+    # Recuperar el problema balanceado guardado al crearlo
+    # (los registros antiguos sin balance_info se balancean en memoria)
+    with timer.phase("balance"):
+        # Única conversión a listas de la resolución (y solo si no hubo acierto de caché).
+        # Los métodos son Python puro y leen celda por celda (pasos, variables básicas):
+        # sobre el arreglo, cada acceso crea un escalar de NumPy (3 a 6 veces más lento)
+        # que además llegaría al payload. tolist() recorre la matriz una vez en C
+        # (≈60 ms en 1000x1000). Las búsquedas con NumPy leen el mismo cost_array,
+        # sin reconstruirlo desde las listas.
+        costs = cost_array.tolist()
+        balanced = balance.load_balanced_problem(supply, demand, costs, balance_info, cost_array)
+
+    start_time = time.time()
+    run = partial(SOLVERS[method], supply, demand, costs, balanced=balanced, detail=detail, timer=timer)
+    with timer.phase("solve"):
+        if memory:
+            (result, profile_stats), memory_profile = run_memory_tracked(_run_solver, run, profile)
+        else:
+            result, profile_stats = _run_solver(run, profile)
+
+    # Validar una sola vez; lo que se guarda en caché ya está validado y listo para JSON.
+    # Solo se incluyen los campos que el nivel de detalle calculó.
+    with timer.phase("validation"):
+        payload = build_solution_payload(result, detail)
+
+    ties = result.get('tie_scenarios') or result.get('all_ties_detected') or []
+    return {
+        'payload': payload,
+        'execution_time': time.time() - start_time,
+        'phase_timings': timer.as_dict(),
+        'profile': profile_stats,
+        'memory_profile': memory_profile,
+        'ties': len(ties),
+        'alternatives': len(result.get('alternative_solutions') or [])
+    }
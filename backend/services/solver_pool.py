@@ -0,0 +1,205 @@
+# services/solver_pool.py
+"""
+Pool de procesos para las resoluciones, con cola acotada.
+
+Los algoritmos usan CPU y retienen el GIL: ejecutados en el proceso de la API
+frenan a todos los demás endpoints. Aquí corren en SOLVER_WORKERS procesos
+aparte. Como máximo SOLVER_QUEUE_SIZE resoluciones esperan detrás de las que
+están en curso; si la cola está llena, o si la espera estimada supera
+SOLVER_MAX_WAIT_S, la resolución se rechaza con SolverBusy (503 con Retry-After).
+
+La espera se estima con el trabajo pendiente: cada resolución cuesta
+aproximadamente k · m·n·(m+n) segundos (la forma del costo de Vogel), con k por
+método y nivel de detalle ajustado con las duraciones observadas. En "full" el
+trabajo crece además con (m+n) y con los empates de costos (ver work_units).
+Con SOLVER_WORKERS=0 se resuelve en el mismo proceso (con la misma cola acotada).
+"""
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config.logging_config import setup_logging
+
+SOLVER_WORKERS = int(os.getenv("SOLVER_WORKERS", str(os.cpu_count() or 1)))
+SOLVER_QUEUE_SIZE = int(os.getenv("SOLVER_QUEUE_SIZE", "16"))
+SOLVER_MAX_WAIT_S = float(os.getenv("SOLVER_MAX_WAIT_S", "30"))
+
+# Segundos por unidad de trabajo m·n·(m+n) de partida, medidos con benchmarks/baseline.json
+DEFAULT_SECONDS_PER_UNIT = {"northwest": 1e-8, "vogel": 4e-7, "min_cost": 1e-7}
+# Factor de standard sobre minimal
+DETAIL_FACTOR = {"minimal": 1.0, "standard": 1.2}
+# Segundos por unidad de trabajo de "full" de partida, medidos con benchmarks/generator.py
+# (de 10x10 a 40x40, incluidas las instancias con empates); redondeados hacia arriba para
+# no admitir de más mientras el promedio móvil no tiene datos
+FULL_SECONDS_PER_UNIT = {"northwest": 1e-8, "vogel": 6e-7, "min_cost": 6e-7}
+# Métodos que en "full" buscan soluciones alternativas a partir de los empates
+EXPLORES_ALTERNATIVES = frozenset({"vogel", "min_cost"})
+# Peso de cada observación en el promedio móvil del costo por unidad
+EWMA_ALPHA = 0.2
+
+
+def work_units(method: str, m: int, n: int, detail: str = "minimal",
+               tie_group: Optional[int] = None) -> float:
+    """
+    Trabajo aproximado de resolver un problema m x n.
+    En "full" cada uno de los m + n pasos copia la matriz, y cada solución alternativa
+    repite ese historial; las alternativas salen de los empates, así que se usa el
+    tamaño del grupo de costos iguales más grande (tie_group, como en services/admission.py;
+    sin él se asume el peor caso).
+    """
+    cells = m * n
+    if detail != "full":
+        return cells * (m + n)
+    units = (m + n) ** 2 * cells
+    if method in EXPLORES_ALTERNATIVES:
+        group = cells if tie_group is None else min(tie_group, cells)
+        units += (m + n) ** 2 * math.sqrt(cells) * group ** 1.5
+    return units
+
+
+def _timed_call(func: Callable, args: tuple, kwargs: dict) -> Tuple[Any, float]:
+    """Se ejecuta en el proceso del pool: retorna (resultado, segundos de ejecución)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+class SolverBusy(Exception):
+    """La resolución no entra en la cola; retry_after son los segundos sugeridos para reintentar"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class SolverPool:
+    """Ejecuta resoluciones en un pool de procesos con admisión por cola y por espera estimada"""
+
+    def __init__(self, workers: int = SOLVER_WORKERS, queue_size: int = SOLVER_QUEUE_SIZE,
+                 max_wait_s: float = SOLVER_MAX_WAIT_S):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_wait_s = max_wait_s
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Segundos estimados de cada resolución admitida y todavía no terminada
+        self._pending: Dict[int, float] = {}
+        self._next_ticket = 0
+        self._seconds_per_unit: Dict[Tuple[str, str], float] = {}
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        """Resoluciones admitidas a la vez: las que corren más las que esperan"""
+        return max(self.workers, 1) + self.queue_size
+
+    def estimate_seconds(self, method: str, detail: str, m: int, n: int,
+                         tie_group: Optional[int] = None) -> float:
+        rate = self._seconds_per_unit.get((method, detail))
+        if rate is None:
+            if detail == "full":
+                rate = FULL_SECONDS_PER_UNIT.get(method, 6e-7)
+            else:
+                rate = DEFAULT_SECONDS_PER_UNIT.get(method, 4e-7) * DETAIL_FACTOR.get(detail, 1.0)
+        return rate * work_units(method, m, n, detail, tie_group)
+
+    def estimated_wait(self) -> float:
+        """Segundos estimados hasta que una resolución nueva empiece a ejecutarse"""
+        with self._lock:
+            return self._estimated_wait_locked()
+
+    def execute(self, func: Callable, *args, method: str, detail: str, m: int, n: int,
+                tie_group: Optional[int] = None, learn: bool = True, **kwargs) -> Tuple[Any, float]:
+        """
+        Ejecuta func(*args, **kwargs) en el pool y espera el resultado.
+        Retorna (resultado, segundos de espera en cola). Lanza SolverBusy si no hay lugar.
+        tie_group es el grupo de costos iguales más grande (solo cuenta en "full").
+        Con learn=False la duración no ajusta la estimación (p. ej. corridas con cProfile).
+        """
+        units = work_units(method, m, n, detail, tie_group)
+        estimate = self.estimate_seconds(method, detail, m, n, tie_group)
+        with self._lock:
+            wait = self._estimated_wait_locked()
+            if len(self._pending) >= self.capacity:
+                self.rejected += 1
+                raise SolverBusy("La cola de resoluciones está llena", self._retry_after(wait))
+            if self._pending and wait > self.max_wait_s:
+                self.rejected += 1
+                raise SolverBusy(f"La espera estimada ({wait:.1f} s) supera el máximo de "
+                                 f"{self.max_wait_s:.0f} s", self._retry_after(wait))
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._pending[ticket] = estimate
+
+        start = time.perf_counter()
+        try:
+            if self.workers > 0:
+                result, run_seconds = self._get_executor().submit(_timed_call, func, args, kwargs).result()
+            else:
+                result, run_seconds = _timed_call(func, args, kwargs)
+        except BrokenProcessPool:
+            # Un proceso murió (p. ej. por memoria): el próximo pedido crea un pool nuevo
+            with self._lock:
+                self._executor = None
+            raise
+        finally:
+            with self._lock:
+                del self._pending[ticket]
+        queue_seconds = max(0.0, time.perf_counter() - start - run_seconds)
+
+        with self._lock:
+            self.completed += 1
+            if not learn:
+                return result, queue_seconds
+            observed = run_seconds / max(units, 1)
+            previous = self._seconds_per_unit.get((method, detail))
+            self._seconds_per_unit[(method, detail)] = (
+                observed if previous is None else previous + EWMA_ALPHA * (observed - previous)
+            )
+        return result, queue_seconds
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'capacity': self.capacity,
+                'in_flight': len(self._pending),
+                'estimated_wait_s': round(self._estimated_wait_locked(), 3),
+                'completed': self.completed,
+                'rejected': self.rejected
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: los procesos no heredan los hilos ni las conexiones de la API.
+                # Tampoco heredan la configuración de logging: se repite al iniciar cada
+                # proceso (LOG_LEVEL, LOG_FORMAT, etc. llegan por el entorno)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=setup_logging
+                )
+            return self._executor
+
+    def _estimated_wait_locked(self) -> float:
+        # El trabajo pendiente se reparte entre los procesos
+        return sum(self._pending.values()) / max(self.workers, 1)
+
+    @staticmethod
+    def _retry_after(wait: float) -> int:
+        return max(1, math.ceil(wait))
+
+
+solver_pool = SolverPool()
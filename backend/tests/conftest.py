@@ -0,0 +1,25 @@
+# tests/conftest.py
+import os
+import tempfile
+
+import pytest
+
+# main crea sus engines al importarse: las pruebas de la API usan una base SQLite
+# temporal (nunca la del entorno) y resuelven en el proceso, sin pool
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'api.db')}"
+os.environ["SOLVER_WORKERS"] = "0"
+
+
+@pytest.fixture
+def api():
+    """Cliente de la API; al terminar vacía las tablas y la caché en memoria"""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as client:
+        yield client
+    main.solve_cache.clear()
+    with main.engine.begin() as connection:
+        for table in reversed(main.Base.metadata.sorted_tables):
+            connection.execute(table.delete())
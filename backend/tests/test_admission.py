@@ -0,0 +1,50 @@
+# tests/test_admission.py
+import numpy as np
+import pytest
+
+from benchmarks.generator import generate_instance
+from services.admission import (
+    SOLVE_MEMORY_POLICY, balanced_tie_profile, check_admission, estimate_solve_memory
+)
+from services.solve_runner import SOLVERS, run_solve
+
+# (tipo de instancia, tamaño): cubren empates, la línea ficticia y el crecimiento con m + n
+CASES = [("random", 5), ("random", 10), ("random", 20), ("ties", 5), ("ties", 10),
+         ("unbalanced_supply", 10), ("unbalanced_demand", 10), ("degenerate", 15)]
+
+
+@pytest.mark.parametrize("detail", ["minimal", "standard", "full"])
+@pytest.mark.parametrize("method", sorted(SOLVERS))
+@pytest.mark.parametrize("kind,size", CASES)
+def test_estimate_covers_the_measured_peak(kind, size, method, detail):
+    instance = generate_instance(kind, size, size)
+    cost_array = np.asarray(instance['costs'])
+    outcome = run_solve(method, instance['supply'], instance['demand'], cost_array,
+                        None, detail, memory=True)
+    m, n, tie_group = balanced_tie_profile(instance['supply'], instance['demand'], cost_array)
+    assert estimate_solve_memory(m, n, method, detail, tie_group) >= outcome['memory_profile']['peak_bytes']
+
+
+def test_tie_profile_counts_the_dummy_line_as_zero_cost():
+    costs = np.array([[0, 5], [5, 5], [7, 0]])
+    assert balanced_tie_profile([10, 10, 10], [10, 10], costs) == (3, 3, 5)
+    assert balanced_tie_profile([10, 10, 10], [15, 15], costs) == (3, 2, 3)
+    assert balanced_tie_profile([10, 10, 10], [15, 15]) == (3, 2, None)
+
+
+def test_unknown_ties_assume_the_worst_case():
+    assert estimate_solve_memory(20, 20, "vogel", "full") > estimate_solve_memory(20, 20, "vogel", "full", 10)
+
+
+def test_default_policy_rejects_instead_of_downgrading():
+    assert SOLVE_MEMORY_POLICY == "reject"
+    decision = check_admission(40, 40, "min_cost", "full", tie_group=400, budget_mb=64)
+    assert not decision['admitted']
+    assert decision['detail'] == "full"
+
+
+def test_downgrade_reports_the_requested_detail():
+    decision = check_admission(40, 40, "min_cost", "full", tie_group=400, budget_mb=64, policy="downgrade")
+    assert decision['admitted']
+    assert decision['detail'] == "standard"
+    assert decision['downgraded_from'] == "full"
@@ -0,0 +1,86 @@
+# tests/test_execution_export.py
+import csv
+import io
+import json
+
+import pytest
+
+import services.execution_export as execution_export
+
+# Oferta 50 > demanda 21: columna ficticia 2 con demanda 29
+PROBLEM = {'name': "P", 'supply': [10, 13, 27], 'demand': [11, 10], 'costs': [[4, 8], [16, 24], [8, 16]]}
+METHODS = ("northwest", "vogel", "min_cost")
+
+
+@pytest.fixture
+def solved(api):
+    """Problema desbalanceado resuelto con los tres métodos; retorna (id, soluciones por método)"""
+    problem_id = api.post("/problems/", json=PROBLEM).json()['id']
+    solutions = {}
+    for method in METHODS:
+        response = api.post(f"/problems/{problem_id}/solve", json={'method': method, 'detail': "minimal"})
+        solutions[method] = response.json()['main_solution']
+    return problem_id, solutions
+
+
+def _export(api, problem_id, export_format):
+    response = api.get(f"/problems/{problem_id}/executions/export", params={'format': export_format})
+    assert response.status_code == 200
+    return response
+
+
+def _expected_rows(solutions):
+    """(método, origen, destino, cantidad, costo unitario, ficticia) de cada celda con cantidad"""
+    rows = []
+    for method in METHODS:
+        for i, row in enumerate(solutions[method]):
+            for j, quantity in enumerate(row):
+                if quantity:
+                    ficticious = j == len(PROBLEM['demand'])
+                    unit_cost = 0.0 if ficticious else float(PROBLEM['costs'][i][j])
+                    rows.append((method, i, j, quantity, unit_cost, ficticious))
+    return rows
+
+
+def test_ndjson_has_one_row_per_assigned_cell(api, solved):
+    problem_id, solutions = solved
+    rows = [json.loads(line) for line in _export(api, problem_id, "ndjson").text.splitlines()]
+
+    assert [(row['method'], row['origin'], row['destination'], row['quantity'], row['unit_cost'], row['ficticious'])
+            for row in rows] == _expected_rows(solutions)
+    assert all(row['cost'] == row['unit_cost'] * row['quantity'] for row in rows)
+    assert all(row['problem_id'] == problem_id for row in rows)
+    # Una ejecución por método, con su uid en todas sus celdas
+    assert len({row['execution_uid'] for row in rows}) == len(METHODS)
+
+
+def test_csv_marks_the_dummy_column(api, solved):
+    problem_id, solutions = solved
+    response = _export(api, problem_id, "csv")
+    assert response.headers['content-disposition'] == f'attachment; filename="executions_problem_{problem_id}.csv"'
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+
+    assert list(rows[0]) == list(execution_export.COLUMNS)
+    ficticious = [row for row in rows if row['ficticious'] == "True"]
+    assert ficticious and all(row['destination'] == "2" and float(row['cost']) == 0 for row in ficticious)
+    assert len(rows) == len(_expected_rows(solutions))
+
+
+def test_parquet_stream_ends_with_the_footer(api, solved, monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    # Una ejecución por tanda: cada una es un row group
+    monkeypatch.setattr(execution_export, "EXPORT_YIELD_PER", 1)
+    problem_id, solutions = solved
+    body = _export(api, problem_id, "parquet").content
+
+    assert body[:4] == b"PAR1" and body[-4:] == b"PAR1"
+    parquet = pq.ParquetFile(io.BytesIO(body))
+    assert parquet.num_row_groups == len(METHODS)
+    table = parquet.read()
+    assert table.schema.field("executed_at").type.tz == "UTC"
+    assert table.num_rows == len(_expected_rows(solutions))
+    assert sum(table.column("ficticious").to_pylist()) == sum(row[-1] for row in _expected_rows(solutions))
+
+
+def test_export_of_a_missing_problem_is_a_404(api):
+    assert api.get("/problems/999/executions/export").status_code == 404
@@ -0,0 +1,168 @@
+# tests/test_execution_writer.py
+import glob
+
+import pytest
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from config.db_conexion import Base
+from models.mod_transport import ModelExecutionSteps, ModelProblemExecution
+from services.execution_writer import ExecutionWriter, insert_executions, new_execution_uid
+
+# El hilo solo escribe al llegar a batch_size o al detenerse
+NEVER_MS = 60_000
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'executions.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def spill_path(tmp_path):
+    return str(tmp_path / "executions.spill.jsonl")
+
+
+def _records(count):
+    # Uno de cada dos registros trae historial de pasos
+    return [{
+        'uid': new_execution_uid(),
+        'problem_id': 1,
+        'method': "vogel",
+        'execution_time': 0.01,
+        'solution_matrix': [[index]],
+        'total_cost': float(index),
+        'step_by_step': [{'step_number': 1, 'description': f"Paso {index}"}] if index % 2 == 0 else None
+    } for index in range(count)]
+
+
+def _counts(session_factory):
+    db = session_factory()
+    try:
+        executions = db.query(func.count(ModelProblemExecution.id)).scalar()
+        distinct = db.query(func.count(func.distinct(ModelProblemExecution.uid))).scalar()
+        steps = db.query(func.count(ModelExecutionSteps.execution_id)).scalar()
+    finally:
+        db.close()
+    return executions, distinct, steps
+
+
+def _spill_files(spill_path):
+    return glob.glob(glob.escape(spill_path) + "*")
+
+
+def _crash(writer):
+    """Detiene el hilo sin cerrar ni borrar el respaldo, como una caída del proceso"""
+    with writer._condition:
+        writer._stopping = True
+        writer._condition.notify()
+    writer._thread.join()
+    writer._thread = None
+    writer._spill.close()
+
+
+def _failing_write(batch):
+    raise ConnectionError("base no disponible")
+
+
+def test_flush_writes_in_batches_and_removes_the_spill(session_factory, spill_path):
+    writer = ExecutionWriter(session_factory, batch_size=5, interval_ms=NEVER_MS, spill_path=spill_path)
+    writer.start()
+    for record in _records(4):
+        writer.enqueue(record)
+    assert writer.flush() == 4
+
+    for record in _records(8):
+        writer.enqueue(record)
+    writer.stop()
+
+    assert _counts(session_factory) == (12, 12, 6)
+    assert writer.stats()['written'] == 12
+    assert writer.stats()['pending'] == 0
+    assert _spill_files(spill_path) == []
+
+
+def test_failed_flush_keeps_the_records_for_the_next_one(session_factory, spill_path, monkeypatch):
+    writer = ExecutionWriter(session_factory, batch_size=100, interval_ms=NEVER_MS, spill_path=spill_path)
+    writer.start()
+    for record in _records(3):
+        writer.enqueue(record)
+
+    monkeypatch.setattr(writer, "_write", _failing_write)
+    assert writer.flush() == 0
+    assert writer.failed_flushes == 1
+    monkeypatch.undo()
+
+    writer.stop()
+    assert _counts(session_factory) == (3, 3, 2)
+    assert _spill_files(spill_path) == []
+
+
+def test_recovers_leftover_spill_segments_after_a_crash(session_factory, spill_path, monkeypatch):
+    crashed = ExecutionWriter(session_factory, batch_size=5, interval_ms=NEVER_MS, spill_path=spill_path)
+    monkeypatch.setattr(crashed, "_write", _failing_write)
+    crashed.start()
+    for record in _records(12):
+        crashed.enqueue(record)
+    _crash(crashed)
+
+    # 12 registros en segmentos de 5: quedan tres archivos, el último con una línea cortada
+    segments = sorted(_spill_files(spill_path))
+    assert len(segments) == 3
+    with open(segments[-1], "a", encoding="utf-8") as spill:
+        spill.write('{"uid": "cortado"')
+
+    writer = ExecutionWriter(session_factory, batch_size=5, interval_ms=NEVER_MS, spill_path=spill_path)
+    writer.start()
+    writer.stop()
+
+    assert _counts(session_factory) == (12, 12, 6)
+    assert _spill_files(spill_path) == []
+
+
+def test_recovery_skips_uids_already_in_the_database(session_factory, spill_path, monkeypatch):
+    records = _records(12)
+    crashed = ExecutionWriter(session_factory, batch_size=5, interval_ms=NEVER_MS, spill_path=spill_path)
+    monkeypatch.setattr(crashed, "_write", _failing_write)
+    crashed.start()
+    for record in records:
+        crashed.enqueue(record)
+    _crash(crashed)
+
+    # Caída entre el commit del primer lote y el borrado de su segmento
+    db = session_factory()
+    insert_executions(db, records[:5])
+    db.commit()
+    db.close()
+
+    writer = ExecutionWriter(session_factory, batch_size=5, interval_ms=NEVER_MS, spill_path=spill_path)
+    writer.start()
+    assert writer.stats()['pending'] == 7
+    writer.stop()
+
+    assert _counts(session_factory) == (12, 12, 6)
+    assert writer.dropped == 0
+    assert _spill_files(spill_path) == []
+
+
+def test_constraint_violation_drops_only_the_offending_record(session_factory, spill_path):
+    records = _records(6)
+    db = session_factory()
+    insert_executions(db, records[:1])
+    db.commit()
+    db.close()
+
+    writer = ExecutionWriter(session_factory, batch_size=100, interval_ms=NEVER_MS, spill_path=spill_path)
+    writer.start()
+    # El primero repite un uid ya escrito: el lote falla y se reintenta fila por fila
+    for record in records:
+        writer.enqueue(record)
+    assert writer.flush() == 5
+    writer.stop()
+
+    assert writer.dropped == 1
+    assert _counts(session_factory) == (6, 6, 3)
+    assert _spill_files(spill_path) == []
@@ -0,0 +1,82 @@
+# tests/test_keyset_cursors.py
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from config.db_conexion import SessionLocal
+from main import decode_cursor, encode_cursor
+from models.mod_transport import ModelProblemExecution
+
+PROBLEM = {'name': "P", 'supply': [10, 20], 'demand': [15, 15], 'costs': [[1, 2], [3, 4]]}
+
+
+def _create_problems(api, count):
+    return [api.post("/problems/", json=dict(PROBLEM, name=f"P{index}")).json()['id'] for index in range(count)]
+
+
+def _pages(api, url, limit):
+    """Recorre el listado siguiendo X-Next-Cursor; retorna los ids de cada página"""
+    pages, cursor = [], None
+    while True:
+        params = {'limit': limit, **({'cursor': cursor} if cursor else {})}
+        response = api.get(url, params=params)
+        assert response.status_code == 200
+        pages.append([item['id'] for item in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+def _add_executions(problem_id, executed_at):
+    db = SessionLocal()
+    try:
+        executions = [ModelProblemExecution(problem_id=problem_id, method="vogel", executed_at=moment)
+                      for moment in executed_at]
+        db.add_all(executions)
+        db.commit()
+        return [(execution.executed_at, execution.id) for execution in executions]
+    finally:
+        db.close()
+
+
+def test_cursor_round_trips_its_values():
+    cursor = encode_cursor("2026-10-19T12:00:00", 42)
+    assert decode_cursor(cursor, 2) == ["2026-10-19T12:00:00", 42]
+    # Opaco y seguro para la URL
+    assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_=")
+
+
+@pytest.mark.parametrize("cursor", ["no es base64", encode_cursor(1, 2), "bnVsbA==", encode_cursor()])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, 1)
+    assert error.value.status_code == 400
+
+
+def test_problem_pages_cover_every_row_once(api):
+    ids = _create_problems(api, 7)
+    assert _pages(api, "/problems/", 3) == [ids[:3], ids[3:6], ids[6:]]
+
+
+def test_bad_cursor_is_a_400(api):
+    problem_id, = _create_problems(api, 1)
+    assert api.get("/problems/", params={'cursor': "%%%"}).status_code == 400
+    # Cursor de otro listado (un solo valor) o con una fecha inválida
+    executions = f"/problems/{problem_id}/executions"
+    assert api.get(executions, params={'cursor': encode_cursor(5)}).status_code == 400
+    assert api.get(executions, params={'cursor': encode_cursor("ayer", 5)}).status_code == 400
+
+
+def test_execution_pages_break_ties_on_executed_at_by_id(api):
+    problem_id, other_id = _create_problems(api, 2)
+    moment = datetime(2026, 10, 19, 12, 0, 0)
+    # Cinco ejecuciones en el mismo segundo, entre una anterior y una posterior
+    rows = _add_executions(problem_id, [moment - timedelta(minutes=1)] + [moment] * 5 + [moment + timedelta(minutes=1)])
+    _add_executions(other_id, [moment] * 2)
+
+    expected = [execution_id for _, execution_id in sorted(rows, reverse=True)]
+    for limit in (1, 2, 3):
+        pages = _pages(api, f"/problems/{problem_id}/executions", limit)
+        assert [execution_id for page in pages for execution_id in page] == expected
+        assert all(len(page) == limit for page in pages[:-1])
@@ -0,0 +1,46 @@
+# tests/test_matrix_blob.py
+import numpy as np
+import pytest
+
+from models.matrix_blob import decode_matrix, encode_matrix
+from services.solve_runner import run_solve
+
+SUPPLY = [13, 21, 2]
+DEMAND = [3, 27]
+COSTS = [[4, 8], [16, 24], [8, 16]]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_integer_matrix_round_trips_as_integers(compress):
+    costs = np.arange(4096).reshape(64, 64).tolist()
+    decoded = decode_matrix(encode_matrix(costs, compress=compress))
+    assert decoded.dtype.kind == "i"
+    assert decoded.tolist() == costs
+    assert all(type(value) is int for value in decoded.tolist()[0])
+
+
+def test_integral_floats_and_large_integers_decode_as_integers():
+    assert decode_matrix(encode_matrix([[8.0, 6.0], [9.0, 12.0]])).tolist() == [[8, 6], [9, 12]]
+    large = [[2 ** 40, 1], [3, 4]]
+    decoded = decode_matrix(encode_matrix(large))
+    assert decoded.dtype == np.dtype("<i8")
+    assert decoded.tolist() == large
+
+
+@pytest.mark.parametrize("costs", [
+    [[1.5, 2.25], [3.0, 4.5]],          # exacto en float32
+    [[0.1, 2.0], [3.0, 1e-9]],          # requiere float64
+])
+def test_non_integer_matrix_round_trips_exactly(costs):
+    decoded = decode_matrix(encode_matrix(costs))
+    assert decoded.dtype.kind == "f"
+    assert decoded.tolist() == costs
+
+
+def test_integer_costs_keep_integer_text_in_the_solution():
+    cost_array = decode_matrix(encode_matrix(COSTS))
+    payload = run_solve("vogel", SUPPLY, DEMAND, cost_array, None, "full")['payload']
+    summary = payload['transport_summary']
+    assert summary['total_cost_calculation'] == "8×13 + 16×3 + 24×12 + 0×6 + 16×2 = 472"
+    explanations = " ".join(step['explanation'] for step in payload['step_by_step'])
+    assert ".0" not in explanations
@@ -0,0 +1,123 @@
+# tests/test_problem_import.py
+import io
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from config.db_conexion import Base
+from models.mod_transport import ModelTransportProblem
+from services.problem_import import ImportRecordError, ProblemImporter, read_csv, read_ndjson
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'import.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _csv(text):
+    return io.BytesIO(text.encode("utf-8"))
+
+
+def _read_csv(text):
+    (line, values), = read_csv(_csv(text), "tabla.csv", None)
+    return line, values
+
+
+def _ndjson(records):
+    lines = [record if isinstance(record, str) else json.dumps(record) for record in records]
+    return io.BytesIO(("\n".join(lines) + "\n").encode("utf-8"))
+
+
+def _problem(index):
+    return {'name': f"P{index}", 'supply': [10, 20], 'demand': [15, 15], 'costs': [[1, 2], [3, index]]}
+
+
+def test_csv_with_header_and_corner_cell():
+    line, values = _read_csv("D1,D2,oferta\n4,8,13\n16,24,21\n3,27,0\n")
+    assert line == 1
+    assert values['name'] == "tabla"
+    assert values['supply'] == [13, 21]
+    assert values['demand'] == [3, 27]
+    assert (values['m'], values['n']) == (2, 2)
+
+
+def test_csv_without_header():
+    _, values = _read_csv("4,8,13\n16,24,17\n3,27,\n")
+    assert values['supply'] == [13, 17]
+    assert values['demand'] == [3, 27]
+
+
+def test_csv_demand_row_without_the_corner_cell():
+    _, values = _read_csv("D1,D2,oferta\n4,8,13\n16,24,17\n\n3,27\n")
+    assert values['supply'] == [13, 17]
+    assert values['demand'] == [3, 27]
+    assert not values['balance_info']['balanced']
+
+
+def test_csv_malformed_middle_row_reports_its_line():
+    with pytest.raises(ImportRecordError, match="Línea 3: se esperaban 3 columnas y hay 4"):
+        _read_csv("D1,D2,oferta\n4,8,13\n16,24,17,9\n3,27\n")
+    with pytest.raises(ImportRecordError, match="Línea 2: hay valores no numéricos"):
+        _read_csv("4,8,13\n16,x,17\n3,27\n")
+
+
+def test_csv_only_the_first_row_can_be_a_header():
+    with pytest.raises(ImportRecordError, match="Línea 2"):
+        _read_csv("D1,D2,oferta\nO1,O2,O3\n4,8,13\n3,27\n")
+
+
+def test_ndjson_invalid_lines_are_yielded_as_errors():
+    file = _ndjson([_problem(1), "{no es json", "[1, 2]", {'name': "mal", 'supply': [1], 'demand': [1]},
+                    "", _problem(2)])
+    results = list(read_ndjson(file, "lote.ndjson", "desc"))
+
+    assert [line for line, _ in results] == [1, 2, 3, 4, 6]
+    errors = {line: str(value) for line, value in results if isinstance(value, ImportRecordError)}
+    assert errors.pop(2) == "JSON inválido"
+    assert errors.pop(3) == "Cada línea debe ser un objeto JSON"
+    assert errors.pop(4).startswith("costs debe ser de 1x1")
+    assert not errors
+    valid = [value for _, value in results if not isinstance(value, ImportRecordError)]
+    assert [value['name'] for value in valid] == ["P1", "P2"]
+    assert all(value['description'] == "desc" for value in valid)
+
+
+def test_importer_counts_invalid_ndjson_lines_and_keeps_going(db):
+    importer = ProblemImporter(db, batch_size=10)
+    importer.import_file(_ndjson([_problem(1), "{no es json", _problem(2)]), "lote.ndjson")
+    importer.flush()
+
+    summary = importer.summary()
+    assert (summary['imported'], summary['failed'], summary['batches']) == (2, 1, 1)
+    assert summary['errors'] == [{'file': "lote.ndjson", 'line': 2, 'detail': "JSON inválido"}]
+    assert db.query(ModelTransportProblem).count() == 2
+
+
+def test_importer_inserts_in_batches_of_batch_size(db):
+    importer = ProblemImporter(db, batch_size=3)
+    importer.import_file(_ndjson([_problem(index) for index in range(7)]), "lote.jsonl")
+    # Dos lotes completos ya escritos; el resto espera al flush final
+    assert (importer.imported, importer.batches) == (6, 2)
+    importer.import_file(_csv("4,8,13\n16,24,17\n3,27\n"), "tabla.csv")
+    importer.flush()
+
+    assert importer.summary()['imported'] == 8
+    assert importer.batches == 3
+    names = [name for name, in db.query(ModelTransportProblem.name).order_by(ModelTransportProblem.id)]
+    assert names == [f"P{index}" for index in range(7)] + ["tabla"]
+    problem = db.query(ModelTransportProblem).filter_by(name="P6").one()
+    assert problem.costs == [[1, 2], [3, 6]]
+
+
+def test_importer_reports_unsupported_files(db):
+    importer = ProblemImporter(db)
+    importer.import_file(io.BytesIO(b""), "datos.xlsx")
+    assert importer.failed == 1
+    assert importer.errors[0]['line'] is None
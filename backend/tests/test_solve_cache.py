@@ -0,0 +1,125 @@
+# tests/test_solve_cache.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, func, update
+from sqlalchemy.orm import sessionmaker
+
+import services.solve_cache as solve_cache_module
+from config.db_conexion import Base
+from models.mod_transport import ModelSolveCache
+from services.solve_cache import SolveCache, make_cache_key, problem_content_hash
+
+CONTENT_HASH = problem_content_hash([10, 20], [15, 15], [[1, 2], [3, 4]])
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'cache.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _key(index):
+    return make_cache_key(CONTENT_HASH, "vogel", {"detail": "minimal", "index": index})
+
+
+def _payload(index):
+    return {'main_solution': [[index]], 'total_cost': float(index)}
+
+
+def _age_rows(db, hours):
+    db.execute(update(ModelSolveCache).values(created_at=datetime.now(timezone.utc) - timedelta(hours=hours)))
+    db.commit()
+
+
+def _rows(db):
+    return db.query(func.count(ModelSolveCache.key)).scalar()
+
+
+def test_content_hash_ignores_the_cost_type():
+    assert problem_content_hash([10, 20], [15, 15], [[1.0, 2.0], [3.0, 4.0]]) == CONTENT_HASH
+    assert problem_content_hash([10, 20], [15, 15], [[1, 2], [3, 5]]) != CONTENT_HASH
+    # Mismos valores con otra forma
+    assert problem_content_hash([10, 20], [15, 15], [[1, 2, 3, 4]]) != CONTENT_HASH
+
+
+def test_database_tier_serves_after_the_memory_tier_is_cleared(db):
+    cache = SolveCache()
+    cache.put(_key(1), "vogel", _payload(1), db)
+    db.commit()
+    cache.clear()
+
+    assert cache.get(_key(1), db) == _payload(1)
+    assert (cache.memory_hits, cache.db_hits, cache.misses) == (0, 1, 0)
+    # El acierto en la base vuelve a la memoria
+    assert cache.get(_key(1), db) == _payload(1)
+    assert cache.memory_hits == 1
+
+
+def test_expired_rows_are_not_served(db):
+    cache = SolveCache(db_ttl_s=3600)
+    cache.put(_key(1), "vogel", _payload(1), db)
+    db.commit()
+    cache.clear()
+    _age_rows(db, hours=2)
+
+    assert cache.get(_key(1), db) is None
+    assert cache.misses == 1
+
+
+def test_put_on_an_existing_key_replaces_the_result_and_renews_it(db):
+    SolveCache().put(_key(1), "vogel", _payload(1), db)
+    db.commit()
+    _age_rows(db, hours=2)
+
+    # Otra instancia (otro worker) guarda el mismo problema: ON CONFLICT DO UPDATE
+    SolveCache().put(_key(1), "vogel", _payload(2), db)
+    db.commit()
+
+    assert _rows(db) == 1
+    cache = SolveCache(db_ttl_s=3600)
+    assert cache.get(_key(1), db) == _payload(2)
+
+
+def test_prune_runs_every_prune_every_puts(db):
+    cache = SolveCache(max_entries=1, db_max_rows=10, db_ttl_s=3600, prune_every=100)
+    for index in range(99):
+        cache.put(_key(index), "vogel", _payload(index), db)
+    db.commit()
+    assert _rows(db) == 99
+    assert cache.db_pruned == 0
+
+    cache.put(_key(99), "vogel", _payload(99), db)
+    db.commit()
+    assert _rows(db) == 10
+    assert cache.db_pruned == 90
+
+
+def test_prune_removes_expired_rows_first(db):
+    cache = SolveCache(db_max_rows=10, db_ttl_s=3600)
+    for index in range(3):
+        cache.put(_key(index), "vogel", _payload(index), db)
+    db.commit()
+    _age_rows(db, hours=2)
+    cache.put(_key(3), "vogel", _payload(3), db)
+
+    assert cache.prune(db) == 3
+    db.commit()
+    assert [key for key, in db.query(ModelSolveCache.key)] == [_key(3)]
+
+
+def test_cache_version_bump_invalidates_stored_results(db, monkeypatch):
+    cache = SolveCache()
+    key = make_cache_key(CONTENT_HASH, "vogel", {"detail": "full"})
+    cache.put(key, "vogel", _payload(1), db)
+    db.commit()
+    cache.clear()
+
+    monkeypatch.setattr(solve_cache_module, "CACHE_VERSION", solve_cache_module.CACHE_VERSION + 1)
+    new_key = make_cache_key(CONTENT_HASH, "vogel", {"detail": "full"})
+    assert new_key != key
+    assert cache.get(new_key, db) is None
@@ -0,0 +1,44 @@
+# tests/test_solver_pool.py
+import threading
+
+import pytest
+
+from services.solver_pool import SolverBusy, SolverPool, work_units
+
+
+def test_full_detail_work_grows_with_size_and_ties():
+    assert work_units("vogel", 40, 40, "full", 26) > 16 * work_units("vogel", 20, 20, "full", 10)
+    assert work_units("min_cost", 20, 20, "full", 104) > work_units("min_cost", 20, 20, "full", 10)
+    # Sin el grupo de empates se asume el peor caso
+    assert work_units("min_cost", 20, 20, "full") >= work_units("min_cost", 20, 20, "full", 400)
+    # La esquina noroeste no busca alternativas
+    assert work_units("northwest", 20, 20, "full", 10) == work_units("northwest", 20, 20, "full", 400)
+
+
+def test_default_full_estimate_covers_a_long_solve():
+    # vogel "full" en 40x40 aleatorio (grupo de empates de 26 celdas) tarda de 5 a 30 s según la máquina
+    pool = SolverPool(workers=0)
+    assert pool.estimate_seconds("vogel", "full", 40, 40, tie_group=26) >= 20
+    assert pool.estimate_seconds("vogel", "minimal", 40, 40) < 1
+
+
+def test_queued_full_solve_is_rejected_before_any_observation():
+    pool = SolverPool(workers=0, queue_size=16, max_wait_s=20)
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_solve():
+        started.set()
+        release.wait(5)
+
+    first = threading.Thread(target=pool.execute, args=(blocking_solve,),
+                             kwargs={'method': "vogel", 'detail': "full", 'm': 40, 'n': 40, 'tie_group': 26})
+    first.start()
+    started.wait(5)
+    try:
+        with pytest.raises(SolverBusy) as busy:
+            pool.execute(lambda: None, method="vogel", detail="full", m=40, n=40, tie_group=26)
+        assert busy.value.retry_after > 20
+    finally:
+        release.set()
+        first.join()
+    assert pool.rejected == 1
@@ -0,0 +1,66 @@
+# tests/test_unbalanced_analysis.py
+import numpy as np
+import pytest
+
+import algorithms.balance as balance
+from services.solve_runner import SOLVERS
+
+# Oferta 36 > demanda 30: se agrega una columna ficticia con demanda 6
+SUPPLY = [13, 21, 2]
+DEMAND = [3, 27]
+COSTS = [[4, 8], [16, 24], [8, 16]]
+
+
+def _solve(method):
+    balanced = balance.balance_problem(SUPPLY, DEMAND, COSTS)
+    return SOLVERS[method](SUPPLY, DEMAND, COSTS, balanced=balanced, detail="full")
+
+
+def test_northwest_unbalanced_is_not_degenerate():
+    result = _solve("northwest")
+    assert result['main_solution'] == [[3, 10, 0], [0, 17, 4], [0, 0, 2]]
+    assert (result['m'], result['n']) == (3, 3)
+    assert result['required_basic_variables'] == 5
+    assert result['actual_basic_variables'] == 5
+    assert not result['has_degeneracy']
+    assert result['degeneracy_info'] == "Solución no degenerada: 5 variables básicas = 5 requeridas"
+    summary = result['transport_summary']
+    assert summary['basic_variables_list'] == "A1=3, A2=10, B2=17, B3=4, C3=2"
+    assert summary['degenerated_variables_count'] == 0
+
+
+@pytest.mark.parametrize("method", sorted(SOLVERS))
+def test_counts_match_the_balanced_matrix(method):
+    result = _solve(method)
+    solution = result['main_solution']
+    assert (result['m'], result['n']) == (len(solution), len(solution[0]))
+    assert result['required_basic_variables'] == result['m'] + result['n'] - 1
+    assert result['actual_basic_variables'] == len(result['basic_variables'])
+    assert result['actual_basic_variables'] == sum(value > 0 for row in solution for value in row)
+
+
+@pytest.mark.parametrize("method", sorted(SOLVERS))
+def test_totals_are_those_of_the_balanced_matrix(method):
+    # Demanda 21 < oferta 50: la columna ficticia (demanda 29) es un destino más
+    supply, demand = [10, 13, 27], [11, 10]
+    costs = [[4, 8], [16, 24], [8, 16]]
+    balanced = balance.balance_problem(supply, demand, costs)
+    result = SOLVERS[method](supply, demand, costs, balanced=balanced, detail="full")
+    assert (result['total_supply'], result['total_demand'], result['is_balanced']) == (50, 50, True)
+    assert result['balance_info']['ficticious_col'] == 2
+    # Las mismas salidas que al resolver la matriz balanceada directamente
+    plain = SOLVERS[method](list(balanced.supply), list(balanced.demand),
+                            [row + [0] for row in costs], detail="full")
+    for field in ('main_solution', 'basic_variables', 'transport_summary',
+                  'alternative_solutions', 'final_conclusion'):
+        assert result[field] == plain[field]
+
+
+def test_padded_view_reuses_the_decoded_array():
+    cost_array = np.asarray(COSTS, dtype=np.float64)
+    balanced = balance.balance_problem(SUPPLY, DEMAND, cost_array.tolist(), cost_array)
+    assert balanced.costs.array is cost_array
+    # Un arreglo entero se convierte una vez, sin pasar por las listas
+    balanced = balance.load_balanced_problem(SUPPLY, DEMAND, COSTS, balanced.balance_info, np.asarray(COSTS))
+    assert balanced.costs.array.dtype == np.float64
+    assert balanced.costs.submatrix(np.arange(3), np.arange(3)).tolist() == [[4, 8, 0], [16, 24, 0], [8, 16, 0]]
@@ -6,6 +6,7 @@ import SolutionResults from './SolutionResults';
 
 const Home = () => {
   const [problems, setProblems] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [selectedProblem, setSelectedProblem] = useState(null);
   const [solution, setSolution] = useState(null);
   const [loading, setLoading] = useState(false);
@@ -14,10 +15,12 @@ const Home = () => {
     loadProblems();
   }, []);
 
-  const loadProblems = async () => {
+  // Sin cursor carga la primera página; con cursor agrega la siguiente
+  const loadProblems = async (cursor = null) => {
     try {
-      const data = await transportAPI.getProblems();
-      setProblems(data);
+      const page = await transportAPI.getProblems(cursor);
+      setProblems(current => cursor ? [...current, ...page.problems] : page.problems);
+      setNextCursor(page.nextCursor);
     } catch (error) {
       console.error('Error loading problems:', error);
     }
@@ -82,8 +85,11 @@ const Home = () => {
               <h2 className="text-xl font-bold mb-4">Problemas Existentes</h2>
               <select
                 value={selectedProblem?.id || ''}
-                onChange={(e) => {
-                  const problem = problems.find(p => p.id === parseInt(e.target.value));
+                onChange={async (e) => {
+                  // El listado no trae los costos: se pide el problema completo
+                  const problem = e.target.value
+                    ? await transportAPI.getProblem(parseInt(e.target.value))
+                    : null;
                   setSelectedProblem(problem);
                   setSolution(null);
                 }}
@@ -96,6 +102,14 @@ const Home = () => {
                   </option>
                 ))}
               </select>
+              {nextCursor && (
+                <button
+                  onClick={() => loadProblems(nextCursor)}
+                  className="mt-2 text-blue-600 hover:underline"
+                >
+                  Cargar más problemas
+                </button>
+              )}
 
               {/* Métodos de solución */}
               {selectedProblem && (
@@ -1,9 +1,20 @@
 const API_BASE = import.meta.env.VITE_API_BASE_URL;
 
 export const transportAPI = {
-  // Obtener todos los problemas
-  getProblems: async () => {
-    const response = await fetch(`${API_BASE}/problems`);
+  // Obtener una página de problemas (sin costos); nextCursor es null en la última página
+  getProblems: async (cursor = null, limit = 50) => {
+    const params = new URLSearchParams({ limit });
+    if (cursor) params.set('cursor', cursor);
+    const response = await fetch(`${API_BASE}/problems?${params}`);
+    return {
+      problems: await response.json(),
+      nextCursor: response.headers.get('X-Next-Cursor')
+    };
+  },
+
+  // Obtener un problema completo (con la matriz de costos)
+  getProblem: async (problemId) => {
+    const response = await fetch(`${API_BASE}/problems/${problemId}`);
     return await response.json();
   },
 